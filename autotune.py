@@ -0,0 +1,204 @@
+"""
+autotune.py
+
+自动调整扫描进程数和复制线程数。
+
+固定的并发数（扫描为 CPU 核数，复制为 CPU 核数的两倍）对不同的存储差别很大：
+往 U 盘复制时线程越多越慢，本地 NVMe 或高延迟的网络共享上则需要更多的并发。
+ConcurrencyTuner 测量吞吐量（复制按短时间窗口统计字节数 / 秒；扫描以根目录为单位回报，
+每完成一个根目录按其条目数和耗时估算一次条目数 / 秒），
+用爬山法调整并发数：没有记录时先成倍增加（慢启动），吞吐量不再上升后改为沿原方向逐个增加（或减少），
+增加并发后吞吐量下降时按比例回退（AIMD），变化不明显时保持不变，隔几个窗口再试探一次。
+
+调整结果按（查找根目录，目标文件夹）记录在 settings.json 中（TuningStore），
+下一次任务从记录的值开始。本模块只依赖标准库，命令行和图形界面共用。
+"""
+import os
+import json
+import time
+
+# 复制线程数的上限（未指定 copy_workers 时）
+MAX_COPY_WORKERS = 64
+# 复制吞吐量测量窗口的最短时长（秒）
+COPY_WINDOW = 0.25
+# 吞吐量变化超过该比例才视为上升或下降
+TOLERANCE = 0.05
+# 增加并发后吞吐量下降时，并发数乘以该系数
+DECREASE_FACTOR = 0.75
+# 吞吐量持平多少个窗口后再试探一次
+PROBE_AFTER = 4
+# 同一并发数多次测量时的平滑系数
+SMOOTHING = 0.5
+# 至少测量了多少个窗口才记录调整结果
+MIN_WINDOWS = 2
+# settings.json 中的字段名，以及最多记录的（根目录，目标文件夹）组合数
+SETTINGS_KEY = 'autotune'
+MAX_ENTRIES = 50
+
+
+class ConcurrencyTuner:
+    """
+    单个并发数的爬山调整器。调用方每完成一份工作调用一次 record（或自行估算吞吐量后调用 observe），
+    并随时按 limit 控制同时进行的任务数。
+    """
+
+    def __init__(self, initial, minimum=1, maximum=MAX_COPY_WORKERS, window=COPY_WINDOW, slow_start=True,
+                 clock=time.monotonic):
+        """
+        Args:
+            initial (int): 初始并发数（上一次记录的值或默认值）
+            minimum / maximum (int): 并发数的范围
+            window (float): 测量窗口的最短时长（秒）
+            slow_start (bool): 吞吐量上升时先成倍增加；从上一次记录的值开始时不需要
+            clock: 计时函数，测试时可替换
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = self._clamp(initial)
+        self.window = window
+        self.windows = 0
+        # {并发数: 平滑后的吞吐量}
+        self.rates = {}
+        self._clock = clock
+        self._window_start = clock()
+        self._amount = 0
+        self._last_rate = None
+        self._direction = 1
+        self._flat = 0
+        self._slow_start = slow_start
+
+    def _clamp(self, value):
+        return min(self.maximum, max(self.minimum, int(value)))
+
+    def record(self, amount):
+        """
+        记录一份完成的工作（条目数或字节数）。窗口结束时调整并发数。
+
+        Returns:
+            int: 当前的并发数
+        """
+        self._amount += amount
+        now = self._clock()
+        elapsed = now - self._window_start
+        if elapsed >= self.window:
+            rate = self._amount / elapsed
+            self._window_start = now
+            self._amount = 0
+            self.observe(rate)
+        return self.limit
+
+    def observe(self, rate):
+        """
+        按一次吞吐量测量（一个窗口，或调用方自行估算的值）调整并发数。
+
+        Returns:
+            int: 调整后的并发数
+        """
+        self.windows += 1
+        previous = self.rates.get(self.limit)
+        self.rates[self.limit] = rate if previous is None else previous + SMOOTHING * (rate - previous)
+        last, self._last_rate = self._last_rate, rate
+
+        if last is None or rate > last * (1 + TOLERANCE):
+            # 第一个窗口先试探着增加；吞吐量上升时沿原方向继续
+            self._flat = 0
+            if self._slow_start:
+                self.limit = self._clamp(self.limit * 2)
+            else:
+                self._step(self._direction)
+        elif rate < last * (1 - TOLERANCE):
+            self._flat = 0
+            self._slow_start = False
+            if self._direction > 0:
+                # 增加并发反而变慢：按比例回退，之后逐个减少
+                self._direction = -1
+                self.limit = self._clamp(min(self.limit - 1, self.limit * DECREASE_FACTOR))
+            else:
+                self._direction = 1
+                self._step(1)
+        else:
+            self._slow_start = False
+            self._flat += 1
+            if self._flat >= PROBE_AFTER:
+                self._flat = 0
+                self._step(self._direction)
+        return self.limit
+
+    def _step(self, direction):
+        """沿 direction 调整一步，到达范围边界时掉头。"""
+        target = self.limit + direction
+        if target < self.minimum or target > self.maximum:
+            self._direction = -direction
+            target = self.limit - direction
+        self.limit = self._clamp(target)
+
+    @property
+    def best(self):
+        """测量到的吞吐量最高的并发数；测量窗口太少时为 None。"""
+        if self.windows < MIN_WINDOWS:
+            return None
+        return max(self.rates, key=self.rates.get)
+
+
+def tuning_key(roots, target_dir):
+    """（查找根目录，目标文件夹）组合在 settings.json 中的键。"""
+    roots_text = '|'.join(sorted(os.path.normcase(os.path.abspath(root)) for root in roots))
+    return f"{roots_text} -> {os.path.normcase(os.path.abspath(target_dir))}"
+
+
+class TuningStore:
+    """
+    settings.json 中记录的调整结果：
+        {"autotune": {键: {"scan_workers": 6, "copy_workers": 12, "updated": 时间戳}, ...}}
+    写入时保留文件中的其他设置（语言、索引服务地址等）。
+    """
+
+    def __init__(self, path='settings.json'):
+        """
+        Args:
+            path (str): 设置文件路径，与图形界面的 settings.json 相同
+        """
+        self.path = path
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return config if isinstance(config, dict) else {}
+
+    def lookup(self, roots, target_dir):
+        """
+        Returns:
+            dict: 上一次记录的 {'scan_workers': n, 'copy_workers': m}（可能缺少某一项），没有记录时为空字典
+        """
+        entry = self._load().get(SETTINGS_KEY, {}).get(tuning_key(roots, target_dir))
+        return dict(entry) if isinstance(entry, dict) else {}
+
+    def remember(self, roots, target_dir, **values):
+        """
+        记录调整结果，值为 None 的项保留原来的记录。
+
+        Raises:
+            OSError: 无法写入设置文件
+        """
+        values = {name: value for name, value in values.items() if value is not None}
+        if not values:
+            return
+        config = self._load()
+        entries = config.get(SETTINGS_KEY)
+        if not isinstance(entries, dict):
+            entries = {}
+        key = tuning_key(roots, target_dir)
+        entry = dict(entries.pop(key, None) or {})
+        entry.update(values, updated=time.time())
+        entries[key] = entry
+        # 只保留最近使用的组合
+        recent = sorted(entries.items(), key=lambda item: item[1].get('updated', 0))[-MAX_ENTRIES:]
+        config[SETTINGS_KEY] = dict(recent)
+
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=4)
+        os.replace(temp_path, self.path)
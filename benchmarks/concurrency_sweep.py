@@ -0,0 +1,135 @@
+"""
+concurrency_sweep.py
+
+在模拟的高延迟存储（fs_backend.LatencyFS）上比较不同的扫描进程数和复制线程数，
+用于在普通 Linux 机器上为网络共享调整并发设置。
+
+扫描：以合成目录树的各个一级子目录作为查找根目录，经 ScanPool 并行扫描；
+复制：用 SearchEngine 的多线程复制把一批文件复制到空目录。
+自动调整：连续几次以 autotune 复制同一批文件，显示每次从记录的值开始调整后的线程数和耗时。
+
+用法:
+    python benchmarks/concurrency_sweep.py [--latency-ms 5] [--bandwidth-mbps 50] [--workers 1,2,4,8,16]
+                                           [--auto-tune-runs 3]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import TreeSpec, ensure_tree, make_name_list  # noqa: E402
+from fs_backend import LatencyFS  # noqa: E402
+
+
+def sweep_scan(fs, roots, names, worker_counts):
+    """返回 [(进程数, 耗时, 扫描目录数)]。"""
+    from scan_pool import ScanPool
+    spec = {'names': frozenset(names), 'mode': 'exact', 'fs': fs}
+    rows = []
+    for workers in worker_counts:
+        pool = ScanPool(workers)
+        try:
+            pool.warm_up(min(workers, len(roots)))
+            start = time.perf_counter()
+            dirs = sum(stats['dirs'] for _, _, error, stats in pool.scan(spec, roots) if error is None)
+            rows.append((workers, time.perf_counter() - start, dirs))
+        finally:
+            pool.shutdown()
+    return rows
+
+
+def _find_all(root, names):
+    from scan_worker import CompiledSpec, scan_root
+    return {name: candidates[0][0] for name, candidates in
+            scan_root(root, CompiledSpec({'names': frozenset(names), 'mode': 'exact'})).items()}
+
+
+def _timed_copy(fs, root, names, found, work_dir, **kwargs):
+    """复制到空的目标文件夹，返回 (引擎, 耗时)。"""
+    from file_operations import SearchEngine
+    target = os.path.join(work_dir, 'copy_target')
+    shutil.rmtree(target, ignore_errors=True)
+    os.makedirs(target)
+    engine = SearchEngine(None, target, [root], None, names=names, fs=fs,
+                          log_path=os.path.join(work_dir, 'copy.log'), **kwargs)
+    start = time.perf_counter()
+    engine._copy_files(names, found)
+    return engine, time.perf_counter() - start
+
+
+def sweep_copy(fs, root, names, work_dir, worker_counts):
+    """返回 [(线程数, 耗时, 复制的字节数)]。"""
+    found = _find_all(root, names)
+    rows = []
+    for workers in worker_counts:
+        engine, seconds = _timed_copy(fs, root, names, found, work_dir, copy_workers=workers)
+        rows.append((workers, seconds, engine.metrics.counters.get('bytes_copied', 0)))
+    return rows
+
+
+def sweep_autotune(fs, root, names, work_dir, runs):
+    """返回 [(第几次, 耗时, 结束时的线程数, 记录的线程数)]。"""
+    from autotune import TuningStore
+    found = _find_all(root, names)
+    store = TuningStore(os.path.join(work_dir, 'settings.json'))
+    rows = []
+    for run in range(1, runs + 1):
+        engine, seconds = _timed_copy(fs, root, names, found, work_dir, autotune=store)
+        engine._save_tuning()
+        rows.append((run, seconds, engine._copy_tuner.limit, engine._copy_tuner.best))
+    return rows
+
+
+def _print_table(title, unit, rows):
+    best = min(rows, key=lambda row: row[1])
+    print(title)
+    for workers, seconds, amount in rows:
+        mark = '  <- 最快' if workers == best[0] else ''
+        print(f"  {workers:>4} {unit}  {seconds:8.3f} s  ({amount:,}){mark}")
+
+
+def main(argv=None):
+    """运行比较，返回退出码。"""
+    parser = argparse.ArgumentParser(description='在模拟的高延迟存储上比较并发设置。')
+    parser.add_argument('--latency-ms', type=float, default=5, help='每次元数据调用的延迟（毫秒）')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='延迟的随机抖动（毫秒）')
+    parser.add_argument('--bandwidth-mbps', type=float, default=50, help='读取带宽上限（MB/s），0 表示不限')
+    parser.add_argument('--workers', default='1,2,4,8,16', help='要比较的并发数，逗号分隔')
+    parser.add_argument('--copy', type=int, default=200, help='复制的文件数')
+    parser.add_argument('--auto-tune-runs', type=int, default=3, help='自动调整连续复制的次数，0 表示不比较')
+    parser.add_argument('--depth', type=int, default=3, help='合成目录树层数')
+    parser.add_argument('--fanout', type=int, default=8, help='每个目录的子目录数')
+    parser.add_argument('--files-per-dir', type=int, default=20, help='每个目录的文件数')
+    parser.add_argument('--file-size', type=int, default=64 * 1024, help='每个文件的字节数')
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'dmt_benchmarks'),
+                        help='合成目录树的缓存目录')
+    args = parser.parse_args(argv)
+
+    worker_counts = [int(value) for value in args.workers.split(',') if value.strip()]
+    spec = TreeSpec(depth=args.depth, fanout=args.fanout, files_per_dir=args.files_per_dir,
+                    file_size=args.file_size)
+    root, filenames = ensure_tree(args.cache_dir, spec)
+    roots = sorted(entry.path for entry in os.scandir(root) if entry.is_dir())
+    fs = LatencyFS(args.latency_ms / 1000, args.bandwidth_mbps * 1e6 or None, args.jitter_ms / 1000, seed=1)
+    print(f"目录树: {root} ({len(filenames)} 个文件，{len(roots)} 个根目录)")
+    print(f"模拟存储: 延迟 {args.latency_ms:g} ms ± {args.jitter_ms:g} ms，带宽 {args.bandwidth_mbps or '不限'} MB/s")
+
+    # 查找一个不存在的名称，保证每次都完整遍历所有目录
+    _print_table('扫描', '进程', sweep_scan(fs, roots, ['__not_in_tree__'], worker_counts))
+    with tempfile.TemporaryDirectory(prefix='dmt_sweep_') as work_dir:
+        names = make_name_list(filenames, args.copy, missing_ratio=0)
+        _print_table('复制', '线程', sweep_copy(fs, root, names, work_dir, worker_counts))
+        if args.auto_tune_runs > 0:
+            print('自动调整')
+            for run, seconds, limit, best in sweep_autotune(fs, root, names, work_dir, args.auto_tune_runs):
+                print(f"  第 {run} 次  {seconds:8.3f} s  结束时 {limit} 线程，记录 {best or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
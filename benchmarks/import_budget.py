@@ -0,0 +1,62 @@
+"""
+import_budget.py
+
+启动导入预算检查：在全新的解释器中导入界面入口和命令行入口，
+确认重量级模块没有在导入阶段被加载，并且导入耗时不超过预算。
+任何一项超标时以非零退出码结束，可直接用于 CI。
+
+用法:
+    python benchmarks/import_budget.py [--budget 秒]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (入口模块, 导入阶段禁止出现的模块)
+CHECKS = [
+    ('ui_elements', ['pandas', 'openpyxl', 'fuzzywuzzy', 'numpy']),
+    ('cli', ['PyQt5', 'pandas', 'openpyxl', 'fuzzywuzzy', 'numpy']),
+]
+
+# 在子进程中执行的探测脚本：导入入口模块并报告耗时和已加载的禁用模块
+_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, forbidden):
+    """在独立的解释器中导入模块，返回 (耗时秒数, 已加载的禁用模块列表)。"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(module=module, forbidden=forbidden)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['elapsed'], result['loaded']
+
+
+def main(argv=None):
+    """执行全部检查，返回退出码。"""
+    parser = argparse.ArgumentParser(description='检查启动导入耗时和重量级模块的延迟加载。')
+    parser.add_argument('--budget', type=float, default=1.0, help='每个入口模块的导入耗时上限（秒）')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module, forbidden in CHECKS:
+        elapsed, loaded = measure(module, forbidden)
+        ok = elapsed <= args.budget and not loaded
+        failed = failed or not ok
+        print(f"{'OK  ' if ok else 'FAIL'} import {module}: {elapsed * 1000:.0f} ms"
+              + (f", 提前加载了 {', '.join(loaded)}" if loaded else ''))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
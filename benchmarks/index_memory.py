@@ -0,0 +1,91 @@
+"""
+index_memory.py
+
+文件索引内存占用检查：在内存中构造一个合成目录树（不读写磁盘），
+比较原先的索引结构（目录 -> 文件名元组，文件名 -> 完整路径字符串集合）
+与 path_store.PathStore 的内存占用，
+并测量 PathStore 的 pickle 大小和往返耗时。
+
+用法:
+    python benchmarks/index_memory.py [--files 5000000] [--per-dir 10] [--min-ratio 3]
+"""
+import os
+import sys
+import time
+import pickle
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from path_store import PathStore  # noqa: E402
+
+# 合成路径的公共前缀，模拟网络共享上较深的目录结构
+PREFIX = os.path.join(os.sep, 'mnt', 'share', 'projects', 'archive')
+
+
+def synthetic_tree(file_count, per_dir):
+    """产出 (目录路径, 文件名列表, 子目录名列表)，共 file_count 个文件。"""
+    dir_count = max(file_count // per_dir, 1)
+    for dir_index in range(dir_count):
+        dirpath = os.path.join(PREFIX, f'dept_{dir_index % 97:02d}', f'batch_{dir_index // 97:06d}')
+        filenames = [f'document_{dir_index:07d}_{file_index:03d}.pdf' for file_index in range(per_dir)]
+        yield dirpath, filenames, []
+
+
+def measure(build):
+    """返回 (构建结果, 占用的内存字节数)。"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def build_full_paths(file_count, per_dir):
+    """对照组：原先的索引结构，每个文件保存一个完整路径字符串。"""
+    dirs, by_name = {}, {}
+    for dirpath, filenames, subdirs in synthetic_tree(file_count, per_dir):
+        dirs[dirpath] = (tuple(filenames), tuple(subdirs))
+        for filename in filenames:
+            by_name.setdefault(filename, {})[os.path.join(dirpath, filename)] = None
+    return dirs, by_name
+
+
+def build_store(file_count, per_dir):
+    """PathStore：目录表 + (目录编号, 文件名) 记录。"""
+    store = PathStore()
+    for dirpath, filenames, subdirs in synthetic_tree(file_count, per_dir):
+        store.set_dir(dirpath, filenames, subdirs)
+    return store
+
+
+def main(argv=None):
+    """执行检查，返回退出码。"""
+    parser = argparse.ArgumentParser(description='比较文件索引的内存占用。')
+    parser.add_argument('--files', type=int, default=1000000, help='合成文件数')
+    parser.add_argument('--per-dir', type=int, default=10, help='每个目录的文件数')
+    parser.add_argument('--min-ratio', type=float, default=3.0, help='要求 PathStore 至少节省的倍数')
+    args = parser.parse_args(argv)
+
+    full, full_size = measure(lambda: build_full_paths(args.files, args.per_dir))
+    del full
+    store, store_size = measure(lambda: build_store(args.files, args.per_dir))
+
+    start = time.perf_counter()
+    data = pickle.dumps(store, protocol=pickle.HIGHEST_PROTOCOL)
+    dumped = time.perf_counter()
+    restored = pickle.loads(data)
+    loaded = time.perf_counter()
+    assert restored.entry_count == store.entry_count
+
+    ratio = full_size / max(store_size, 1)
+    print(f"{args.files} 个文件：完整路径 {full_size / 2**20:.0f} MiB，PathStore {store_size / 2**20:.0f} MiB，"
+          f"节省 {ratio:.1f} 倍")
+    print(f"pickle {len(data) / 2**20:.0f} MiB，序列化 {dumped - start:.2f} s，反序列化 {loaded - dumped:.2f} s")
+    ok = ratio >= args.min_ratio
+    print('OK' if ok else 'FAIL')
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+run_benchmarks.py
+
+可重复的性能基准：在确定性的合成目录树上测量
+    scan_exact / scan_fuzzy / scan_regex / scan_glob
+                                           各匹配模式的目录扫描（scan_worker.scan_root）
+    copy                                   复制吞吐量（SearchEngine._copy_files）
+    report_xlsx / report_csv / report_json 结果报告写入
+    model_load / model_paste               结果表模型的加载与批量粘贴（需要 PyQt5 和 pandas）
+每项运行多次取中位数，结果保存为 JSON，可与之前提交保存的结果比较。
+指定 --latency-ms / --bandwidth-mbps 时扫描和复制经过 fs_backend.LatencyFS，模拟网络共享。
+
+用法:
+    python benchmarks/run_benchmarks.py [--preset small] [--only scan] [--save results.json]
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json [--tolerance 0.2]
+
+比较时任何一项比基准慢 tolerance 以上即以退出码 1 结束，可直接用于 CI。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import TreeSpec, ensure_tree, make_name_list, NAME_DISTRIBUTIONS  # noqa: E402
+
+# 预设规模：small 适合 CI，large 接近实际的共享目录
+PRESETS = {
+    'small': {'tree': dict(depth=3, fanout=5, files_per_dir=40),
+              'names': 2000, 'fuzzy_names': 20, 'copy': 300, 'rows': 5000},
+    'large': {'tree': dict(depth=4, fanout=8, files_per_dir=60),
+              'names': 20000, 'fuzzy_names': 200, 'copy': 2000, 'rows': 100000},
+}
+
+
+class Context:
+    """一次基准运行共享的数据。"""
+
+    def __init__(self, root, filenames, preset, work_dir, fs=None):
+        self.root = root
+        self.filenames = filenames
+        self.preset = preset
+        self.work_dir = work_dir
+        self.fs = fs
+
+
+def _timed(func, repeat):
+    """运行 func repeat 次，返回 (每次耗时列表, 最后一次的返回值)。"""
+    runs, value = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        runs.append(time.perf_counter() - start)
+    return runs, value
+
+
+# ---------------- 各项基准 ----------------
+
+def bench_scan(mode):
+    """生成某一匹配模式的扫描基准。"""
+    def bench(ctx, repeat):
+        from scan_worker import CompiledSpec, new_scan_stats, scan_root
+        # 模糊匹配逐对计算相似度，名称数单独设置，避免单项耗时过长
+        names = make_name_list(ctx.filenames, ctx.preset['fuzzy_names' if mode == 'fuzzy' else 'names'], mode=mode)
+        compiled = CompiledSpec({'names': frozenset(names), 'mode': mode, 'min_fuzzy_score': 85, 'fs': ctx.fs})
+        stats = new_scan_stats()
+        runs, found = _timed(lambda: scan_root(ctx.root, compiled, None, stats), repeat)
+        entries = stats['entries'] / repeat
+        return runs, {'names': len(names), 'found': len(found), 'entries': int(entries),
+                      'throughput': entries / statistics.median(runs), 'unit': 'entries/s'}
+    return bench
+
+
+def bench_copy(ctx, repeat):
+    """复制吞吐量：把一批已找到的文件复制到空目录。"""
+    from file_operations import SearchEngine
+    from scan_worker import CompiledSpec, scan_root
+    names = make_name_list(ctx.filenames, ctx.preset['copy'], missing_ratio=0)
+    found = {name: candidates[0][0] for name, candidates in
+             scan_root(ctx.root, CompiledSpec({'names': frozenset(names), 'mode': 'exact'})).items()}
+    target = os.path.join(ctx.work_dir, 'copy_target')
+    total_bytes = sum(os.path.getsize(path) for path in found.values())
+
+    def run():
+        shutil.rmtree(target, ignore_errors=True)
+        os.makedirs(target)
+        engine = SearchEngine(None, target, [ctx.root], None, names=names, fs=ctx.fs,
+                              log_path=os.path.join(ctx.work_dir, 'copy.log'))
+        return engine._copy_files(names, found)
+
+    runs, _ = _timed(run, repeat)
+    return runs, {'files': len(found), 'bytes': total_bytes,
+                  'throughput': len(found) / statistics.median(runs), 'unit': 'files/s'}
+
+
+def bench_report(report_format):
+    """生成某一报告格式的写入基准。"""
+    def bench(ctx, repeat):
+        from file_operations import SearchEngine
+        names = [f"name_{index:07d}" for index in range(ctx.preset['rows'])]
+        results = [{'name': name, 'status': 'success' if index % 3 else 'failed', 'message': ''}
+                   for index, name in enumerate(names)]
+        path = os.path.join(ctx.work_dir, f'report.{report_format}')
+        engine = SearchEngine(None, ctx.work_dir, [], path, report_format=report_format,
+                              log_path=os.path.join(ctx.work_dir, 'report.log'))
+
+        def run():
+            if os.path.exists(path):
+                os.remove(path)
+            engine._finalize_report(path, names, results)
+
+        runs, _ = _timed(run, repeat)
+        return runs, {'rows': len(names), 'throughput': len(names) / statistics.median(runs), 'unit': 'rows/s'}
+    return bench
+
+
+def _model_rows(ctx):
+    return [[f"name_{index:07d}", "✅ 已找到" if index % 3 else "❌ 未找到"] for index in range(ctx.preset['rows'])]
+
+
+def bench_model_load(ctx, repeat):
+    """从 xlsx 加载结果表模型。"""
+    import pandas as pd
+    from excel_model import ExcelTableModel
+    path = os.path.join(ctx.work_dir, 'model.xlsx')
+    if not os.path.exists(path):
+        pd.DataFrame(_model_rows(ctx), columns=['文件名', '状态']).to_excel(path, index=False)
+    model = ExcelTableModel(is_read_only=True)
+    runs, _ = _timed(lambda: model.load(path), repeat)
+    return runs, {'rows': ctx.preset['rows'], 'throughput': ctx.preset['rows'] / statistics.median(runs),
+                  'unit': 'rows/s'}
+
+
+def bench_model_paste(ctx, repeat):
+    """向可编辑模型批量粘贴一整列。"""
+    from excel_model import ExcelTableModel
+    rows = _model_rows(ctx)
+    model = ExcelTableModel(is_read_only=False)
+
+    def run():
+        model.set_rows([['', ''] for _ in rows], ['文件名', '状态'])
+        model.set_block(0, 0, rows)
+
+    runs, _ = _timed(run, repeat)
+    return runs, {'cells': len(rows) * 2, 'throughput': len(rows) * 2 / statistics.median(runs), 'unit': 'cells/s'}
+
+
+BENCHMARKS = {
+    'scan_exact': bench_scan('exact'),
+    'scan_fuzzy': bench_scan('fuzzy'),
+    'scan_regex': bench_scan('regex'),
+    'scan_glob': bench_scan('glob'),
+    'copy': bench_copy,
+    'report_xlsx': bench_report('xlsx'),
+    'report_csv': bench_report('csv'),
+    'report_json': bench_report('json'),
+    'model_load': bench_model_load,
+    'model_paste': bench_model_paste,
+}
+
+
+# ---------------- 结果保存与比较 ----------------
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """
+    与基准结果比较，打印每项的变化。
+
+    Returns:
+        bool: 是否有任何一项变慢超过 tolerance
+    """
+    regressed = False
+    for name, result in results.items():
+        old = baseline.get('results', {}).get(name)
+        if not old or 'seconds' not in result or 'seconds' not in old:
+            continue
+        ratio = result['seconds'] / old['seconds']
+        slower = ratio > 1 + tolerance
+        regressed = regressed or slower
+        print(f"{'SLOWER' if slower else 'ok    '} {name:<12} {old['seconds']:.4f} s -> {result['seconds']:.4f} s "
+              f"({(ratio - 1) * 100:+.1f}%)")
+    return regressed
+
+
+def main(argv=None):
+    """运行基准，返回退出码。"""
+    parser = argparse.ArgumentParser(description='在合成目录树上运行性能基准。')
+    parser.add_argument('--preset', default='small', choices=sorted(PRESETS), help='数据规模')
+    parser.add_argument('--names', default='mixed', choices=NAME_DISTRIBUTIONS, help='文件名分布')
+    parser.add_argument('--depth', type=int, default=None, help='覆盖预设的目录层数')
+    parser.add_argument('--fanout', type=int, default=None, help='覆盖预设的每个目录的子目录数')
+    parser.add_argument('--files-per-dir', type=int, default=None, help='覆盖预设的每个目录的文件数')
+    parser.add_argument('--seed', type=int, default=2024, help='随机种子')
+    parser.add_argument('--repeat', type=int, default=3, help='每项运行次数，取中位数')
+    parser.add_argument('--only', action='append', default=None,
+                        help='只运行名称以此开头的基准，可重复指定（例如 --only scan）')
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'dmt_benchmarks'),
+                        help='合成目录树的缓存目录')
+    parser.add_argument('--save', default=None, help='把结果保存为 JSON')
+    parser.add_argument('--compare', default=None, help='与之前保存的 JSON 结果比较')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='比较时允许变慢的比例')
+    parser.add_argument('--latency-ms', type=float, default=0, help='模拟网络共享：每次元数据调用的延迟（毫秒）')
+    parser.add_argument('--bandwidth-mbps', type=float, default=0, help='模拟网络共享：读取带宽上限（MB/s）')
+    args = parser.parse_args(argv)
+
+    preset = PRESETS[args.preset]
+    tree = dict(preset['tree'])
+    for key in ('depth', 'fanout', 'files_per_dir'):
+        if getattr(args, key) is not None:
+            tree[key] = getattr(args, key)
+    spec = TreeSpec(names=args.names, seed=args.seed, **tree)
+
+    start = time.perf_counter()
+    root, filenames = ensure_tree(args.cache_dir, spec)
+    print(f"目录树: {root} ({len(filenames)} 个文件，准备耗时 {time.perf_counter() - start:.1f} s)")
+
+    fs = None
+    if args.latency_ms or args.bandwidth_mbps:
+        from fs_backend import LatencyFS
+        fs = LatencyFS(args.latency_ms / 1000, args.bandwidth_mbps * 1e6 or None)
+        print(f"模拟网络共享: 延迟 {args.latency_ms:g} ms，带宽 {args.bandwidth_mbps or '不限'} MB/s")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='dmt_bench_') as work_dir:
+        ctx = Context(root, filenames, preset, work_dir, fs)
+        for name, bench in BENCHMARKS.items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            try:
+                runs, info = bench(ctx, args.repeat)
+            except ImportError as e:
+                results[name] = {'skipped': f"缺少依赖: {e.name}"}
+                print(f"skip   {name:<12} 缺少依赖: {e.name}")
+                continue
+            results[name] = dict(info, seconds=statistics.median(runs), runs=runs)
+            print(f"       {name:<12} {results[name]['seconds']:.4f} s  {info['throughput']:,.0f} {info['unit']}")
+
+    data = {
+        'meta': {'commit': _git_commit(), 'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                 'python': platform.python_version(), 'platform': platform.platform(),
+                 'cpu_count': os.cpu_count(), 'preset': args.preset, 'tree': spec.to_dict(),
+                 'repeat': args.repeat, 'latency_ms': args.latency_ms, 'bandwidth_mbps': args.bandwidth_mbps},
+        'results': results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        old_meta = baseline.get('meta', {})
+        if (old_meta.get('tree') != data['meta']['tree']
+                or old_meta.get('latency_ms', 0) != args.latency_ms
+                or old_meta.get('bandwidth_mbps', 0) != args.bandwidth_mbps):
+            print("⚠️ 基准结果使用的目录树或存储模拟参数不同，比较结果仅供参考")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
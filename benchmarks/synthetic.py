@@ -0,0 +1,180 @@
+"""
+synthetic.py
+
+基准测试使用的确定性合成数据：目录树生成器和文件名列表生成器。
+相同的参数和随机种子总是生成完全相同的目录树和列表，便于在不同提交之间比较。
+
+文件名分布:
+    ascii  由固定音节表拼成的英文名
+    cjk    2~6 个常用汉字
+    mixed  两者各占一半，并混入少量中英混合名
+"""
+import os
+import json
+import random
+import hashlib
+
+# 英文名使用的音节表
+_SYLLABLES = ['an', 'bo', 'ca', 'de', 'fi', 'go', 'ha', 'ji', 'ko', 'lu', 'ma', 'ne', 'po', 'ra', 'si',
+              'ta', 'vu', 'we', 'xi', 'yo', 'zen']
+# 文件扩展名及其出现权重
+_EXTENSIONS = [('.pdf', 5), ('.xlsx', 3), ('.dwg', 2), ('.jpg', 4), ('.txt', 1)]
+# 常用汉字区间
+_CJK_START, _CJK_END = 0x4E00, 0x9FA5
+NAME_DISTRIBUTIONS = ('ascii', 'cjk', 'mixed')
+# 生成完成的目录树中保存清单的文件名
+MANIFEST = '.bench_manifest.json'
+
+
+class TreeSpec:
+    """合成目录树的参数。"""
+
+    def __init__(self, depth=3, fanout=6, files_per_dir=40, names='mixed', file_size=1024, seed=2024):
+        """
+        Args:
+            depth (int): 目录层数（根目录为第 0 层）
+            fanout (int): 每个目录的子目录数
+            files_per_dir (int): 每个目录的文件数
+            names (str): 文件名分布，取值见 NAME_DISTRIBUTIONS
+            file_size (int): 每个文件的字节数
+            seed (int): 随机种子
+        """
+        if names not in NAME_DISTRIBUTIONS:
+            raise ValueError(f"未知的文件名分布: {names}")
+        self.depth = depth
+        self.fanout = fanout
+        self.files_per_dir = files_per_dir
+        self.names = names
+        self.file_size = file_size
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @property
+    def key(self):
+        """参数的短摘要，用作缓存目录名。"""
+        return hashlib.sha1(json.dumps(self.to_dict(), sort_keys=True).encode()).hexdigest()[:12]
+
+    @property
+    def file_count(self):
+        dirs = sum(self.fanout ** level for level in range(self.depth + 1))
+        return dirs * self.files_per_dir
+
+
+def _ascii_stem(rng):
+    return ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 5)))
+
+
+def _cjk_stem(rng):
+    return ''.join(chr(rng.randint(_CJK_START, _CJK_END)) for _ in range(rng.randint(2, 6)))
+
+
+def _stem(rng, names):
+    if names == 'ascii':
+        return _ascii_stem(rng)
+    if names == 'cjk':
+        return _cjk_stem(rng)
+    roll = rng.random()
+    if roll < 0.45:
+        return _ascii_stem(rng)
+    if roll < 0.9:
+        return _cjk_stem(rng)
+    return _cjk_stem(rng) + '_' + _ascii_stem(rng)
+
+
+def _extension(rng):
+    return rng.choices([ext for ext, _ in _EXTENSIONS], weights=[weight for _, weight in _EXTENSIONS])[0]
+
+
+def generate_tree(root, spec):
+    """
+    在 root 下生成合成目录树。文件名带全局序号，保证在整棵树中唯一。
+
+    Returns:
+        list[str]: 所有文件名（按生成顺序）
+    """
+    rng = random.Random(spec.seed)
+    content = bytes(rng.getrandbits(8) for _ in range(min(spec.file_size, 4096)))
+    content = (content * (spec.file_size // max(len(content), 1) + 1))[:spec.file_size]
+    filenames = []
+
+    stack = [(root, 0)]
+    while stack:
+        dirpath, level = stack.pop()
+        os.makedirs(dirpath, exist_ok=True)
+        for _ in range(spec.files_per_dir):
+            name = f"{_stem(rng, spec.names)}_{len(filenames):07d}{_extension(rng)}"
+            with open(os.path.join(dirpath, name), 'wb') as f:
+                f.write(content)
+            filenames.append(name)
+        if level < spec.depth:
+            for index in range(spec.fanout):
+                stack.append((os.path.join(dirpath, f"{_stem(rng, spec.names)}_{level + 1}_{index}"), level + 1))
+    return filenames
+
+
+def ensure_tree(cache_dir, spec):
+    """
+    返回与 spec 对应的目录树（已存在且清单完整时直接复用）。
+
+    Returns:
+        tuple: (目录树根路径, 文件名列表)
+    """
+    root = os.path.join(cache_dir, spec.key)
+    manifest_path = os.path.join(root, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return root, json.load(f)['filenames']
+
+    filenames = generate_tree(root, spec)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'spec': spec.to_dict(), 'filenames': filenames}, f, ensure_ascii=False)
+    return root, filenames
+
+
+def _perturb(rng, name):
+    """对名称做一次字符替换，模拟模糊匹配场景中的笔误。"""
+    if len(name) < 4:
+        return name
+    index = rng.randrange(1, len(name) - 1)
+    return name[:index] + rng.choice('abcdefghijklmnopqrstuvwxyz') + name[index + 1:]
+
+
+def make_name_list(filenames, count, mode='exact', missing_ratio=0.1, seed=7):
+    """
+    从目录树的文件名中生成待查找的名称列表。
+
+    Args:
+        filenames (list[str]): 目录树中的文件名
+        count (int): 列表长度
+        mode (str): 'exact' 使用不带扩展名的文件名；'fuzzy' 在完整文件名上做一次字符替换；
+                    'regex' 生成以文件名前缀开头、匹配任意扩展名的正则表达式；
+                    'glob' 交替生成 “前缀.*” 和 “*序号.扩展名” 两种通配符模式
+        missing_ratio (float): 不存在于目录树中的名称所占比例
+        seed (int): 随机种子
+
+    Returns:
+        list[str]: 名称列表（不重复）
+    """
+    import re
+    rng = random.Random(seed)
+    missing = int(count * missing_ratio)
+    picked = rng.sample(filenames, min(count - missing, len(filenames)))
+    names = []
+    for filename in picked:
+        stem = os.path.splitext(filename)[0]
+        if mode == 'fuzzy':
+            names.append(_perturb(rng, filename))
+        elif mode == 'regex':
+            names.append('^' + re.escape(stem) + r'\.\w+$')
+        elif mode == 'glob':
+            if len(names) % 2:
+                names.append('*' + filename[filename.rindex('_'):])
+            else:
+                names.append(stem + '.*')
+        else:
+            names.append(stem)
+    for index in range(missing):
+        names.append(f"missing_{_ascii_stem(rng)}_{index:06d}")
+    return list(dict.fromkeys(names))
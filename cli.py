@@ -0,0 +1,314 @@
+"""
+cli.py
+
+命令行 / 批处理入口。直接驱动 file_operations.SearchEngine，
+不导入 PyQt5，可以在没有图形界面的服务器上运行。
+
+示例:
+    python main_app.py --list names.xlsx --root /mnt/share --target ./out --mode exact --format csv
+    python main_app.py --serve --root /mnt/share --port 8765
+    python main_app.py --list names.xlsx --root /mnt/share --target ./out --index-url http://127.0.0.1:8765
+    python main_app.py --list names.xlsx --root /mnt/share --target ./out --plan plan.json
+    python main_app.py --from-plan plan.json
+"""
+import os
+import sys
+import argparse
+from pathlib import Path
+from file_operations import SearchEngine, SearchEvents, REPORT_FORMATS
+from log_sink import BatchedLogSink
+from run_metrics import format_metrics
+from file_filters import FileFilter
+from copy_plan import CopyPlan
+from autotune import TuningStore
+from index_service import IndexClient, IndexService, DEFAULT_PORT, DEFAULT_REFRESH_INTERVAL, token_path_for
+
+# 退出码
+EXIT_OK = 0             # 所有文件均已找到并复制
+EXIT_INCOMPLETE = 1     # 部分文件未找到或复制失败
+EXIT_USAGE = 2          # 参数错误（与 argparse 保持一致）
+EXIT_ERROR = 3          # 读取列表、保存报告等过程出错
+EXIT_INTERRUPTED = 130  # 用户中断 (Ctrl+C)
+
+# main_app.py 中显式要求命令行模式的参数（不传给参数解析器）
+CLI_FLAG = '--cli'
+
+
+class ConsoleEvents(SearchEvents):
+    """把引擎的进度和日志输出到终端。"""
+
+    def __init__(self, quiet=False):
+        """
+        Args:
+            quiet (bool): 为 True 时只输出失败日志
+        """
+        self.quiet = quiet
+        self.engine = None
+        self._last_message = None
+
+    def on_progress(self, current, total, message):
+        """输出进度，同时取走积攒的日志。"""
+        self.flush_logs()
+        if not self.quiet and message != self._last_message:
+            self._last_message = message
+            print(f"[{current * 100 // max(total, 1):3d}%] {message}", file=sys.stderr)
+
+    def flush_logs(self):
+        """成功日志输出到标准输出，失败日志输出到标准错误。"""
+        if self.engine is None:
+            return
+        batches, _ = self.engine.log_sink.drain()
+        if not self.quiet and batches.get(BatchedLogSink.SUCCESS):
+            print("\n".join(batches[BatchedLogSink.SUCCESS]))
+        if batches.get(BatchedLogSink.FAILED):
+            print("\n".join(batches[BatchedLogSink.FAILED]), file=sys.stderr)
+
+
+def wants_cli(argv):
+    """
+    启动参数是否请求命令行模式：包含 --cli，或包含本模块识别的选项（例如 --list、--serve、--help）。
+    其他参数（Qt 的 -style 等、系统传入的文件路径）仍启动图形界面。
+    """
+    if CLI_FLAG in argv:
+        return True
+    options = build_parser().options
+    return any(arg.split('=', 1)[0] in options for arg in argv if arg.startswith('-'))
+
+
+class CliParser(argparse.ArgumentParser):
+    """在添加参数时记录全部选项字符串（包括参数组中的选项），供 wants_cli 判断启动参数。"""
+
+    def __init__(self, *args, **kwargs):
+        self.options = set()
+        super().__init__(*args, **kwargs)
+
+    def add_argument(self, *args, **kwargs):
+        """添加参数并记录其选项字符串。"""
+        action = super().add_argument(*args, **kwargs)
+        self.options.update(action.option_strings)
+        return action
+
+    def add_argument_group(self, *args, **kwargs):
+        """参数组的 add_argument 同样记录选项字符串。"""
+        group = super().add_argument_group(*args, **kwargs)
+        group_add_argument = group.add_argument
+
+        def add_argument(*arg_args, **arg_kwargs):
+            action = group_add_argument(*arg_args, **arg_kwargs)
+            self.options.update(action.option_strings)
+            return action
+
+        group.add_argument = add_argument
+        return group
+
+
+def build_parser():
+    """构建命令行参数解析器。"""
+    parser = CliParser(
+        prog='main_app.py',
+        description='按文件名列表在一个或多个根目录中查找文件，并复制到目标文件夹。')
+    parser.add_argument('--list', dest='list_path',
+                        help='文件名列表：.xlsx/.csv 取第一列并跳过表头，其他文本文件每行一个文件名')
+    parser.add_argument('--root', action='append', dest='roots',
+                        help='查找根目录，可重复指定多个')
+    parser.add_argument('--target', help='复制目标文件夹；使用 --from-plan 时默认为计划中的目标文件夹')
+    parser.add_argument('--mode', default='exact', choices=['exact', 'fuzzy', 'regex', 'glob'],
+                        help='匹配模式；glob 为通配符（* ? [...]），与整个文件名比较')
+    parser.add_argument('--min-score', type=int, default=85, help='模糊匹配的最低分数 (0-100)')
+    parser.add_argument('--scan-workers', type=int, default=None, help='扫描进程数，默认为 CPU 核数')
+    parser.add_argument('--copy-workers', type=int, default=None, help='复制线程数，默认为 CPU 核数的两倍')
+    parser.add_argument('--auto-tune', action='store_true',
+                        help='按吞吐量自动调整扫描进程数和复制线程数（此时 --scan-workers / --copy-workers 为上限），'
+                             '结果按根目录和目标文件夹记录在 --settings 中，下次从记录的值开始')
+    parser.add_argument('--settings', default='settings.json',
+                        help='记录自动调整结果的设置文件，默认与图形界面共用当前目录下的 settings.json')
+    parser.add_argument('--format', default='xlsx', choices=REPORT_FORMATS, dest='report_format',
+                        help='结果报告格式')
+    parser.add_argument('--report', default=None,
+                        help='结果报告路径，默认为列表文件旁的 <列表名>_updated.<格式>')
+    parser.add_argument('--retry-misses', action='store_true',
+                        help='读取上一次的结果报告（--report 指定的路径），沿用已找到的名称，只重新查找其余名称')
+    parser.add_argument('--log', default=None, help='完整日志文件路径，默认写入 logs/ 目录')
+    parser.add_argument('--metrics', default=None,
+                        help='运行摘要 JSON（各阶段耗时与计数）路径，默认写入日志旁的 .metrics.json')
+    parser.add_argument('--profile', action='store_true', help='用 cProfile 记录任务线程，结果保存在日志旁的 .prof')
+    parser.add_argument('-q', '--quiet', action='store_true', help='只输出失败信息')
+    parser.add_argument('--follow-links', action='store_true',
+                        help='跟随指向目录的符号链接，按 inode 去重，每个物理目录只扫描一次')
+    parser.add_argument('--normalize', action='store_true',
+                        help='忽略大小写、全角 / 半角、Unicode 组合形式和多余空白的差异')
+    parser.add_argument('--top-k', type=int, default=1,
+                        help='每个名称保留的候选数；大于 1 时报告中每个候选增加一列')
+    parser.add_argument('--copy-all', action='store_true',
+                        help='把每个名称的全部候选复制到目标文件夹下以名称命名的子文件夹中')
+
+    filters = parser.add_argument_group('筛选条件', '对所有名称生效；列表文件中的同名附加列只对所在行生效')
+    filters.add_argument('--ext', action='append', default=None,
+                         help='只匹配这些扩展名，可重复指定或用逗号分隔，例如 --ext pdf,xlsx')
+    filters.add_argument('--min-size', default=None, help='最小文件大小，例如 10KB、1.5MB')
+    filters.add_argument('--max-size', default=None, help='最大文件大小')
+    filters.add_argument('--modified-from', default=None, help='修改时间不早于该日期 (YYYY-MM-DD[ HH:MM])')
+    filters.add_argument('--modified-to', default=None, help='修改时间不晚于该日期（只有日期时包含当天）')
+
+    plan = parser.add_argument_group('复制计划', '先试运行检查空间和重名，再按计划复制')
+    plan.add_argument('--plan', default=None, dest='plan_path',
+                      help='试运行：扫描后不复制任何文件，把复制计划（源文件、大小、目标路径）保存到该 JSON 文件，'
+                           '并报告总字节数、文件数、重名和目标卷的剩余空间')
+    plan.add_argument('--from-plan', default=None,
+                      help='按 --plan 保存的计划复制，不读取列表、不扫描（--list / --root 可省略）')
+    plan.add_argument('--skip-space-check', action='store_true',
+                      help='复制前不检查目标卷的剩余空间（默认空间不足时不复制任何文件）')
+
+    parser.add_argument('--index-url', default=None,
+                        help='文件索引服务地址（例如 http://127.0.0.1:8765），先查询索引再扫描未覆盖的目录')
+
+    service = parser.add_argument_group('索引服务模式')
+    service.add_argument('--serve', action='store_true',
+                         help='以守护进程方式运行：为 --root 建立内存索引并在本机提供查询服务')
+    service.add_argument('--port', type=int, default=DEFAULT_PORT, help='服务监听端口（仅监听 127.0.0.1）')
+    service.add_argument('--refresh-interval', type=float, default=None,
+                         help=f'整体重建索引的间隔（秒），0 表示不自动重建；'
+                              f'默认监视目录变化时不重建，使用 --no-watch 时为 {DEFAULT_REFRESH_INTERVAL} 秒')
+    service.add_argument('--allow-target', dest='allowed_targets', action='append', default=[], metavar='DIR',
+                         help='允许 /copy 请求写入的目标目录（含子目录），可重复指定；未指定时服务不执行复制')
+    service.add_argument('--no-watch', action='store_true',
+                         help='不监视目录变化（默认使用 inotify，不可用时轮询目录修改时间）')
+    return parser
+
+
+def serve(args):
+    """运行索引服务，直到 Ctrl+C。"""
+    try:
+        service = IndexService(args.roots, port=args.port, refresh_interval=args.refresh_interval,
+                               watch=not args.no_watch, token_path=token_path_for(args.settings),
+                               allowed_targets=args.allowed_targets)
+    except OSError as e:
+        print(f"❌ 无法启动索引服务（端口 {args.port}）: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    host, port = service.address
+    print(f"🗂️ 正在为 {len(args.roots)} 个目录建立索引，服务地址 http://{host}:{port}", file=sys.stderr)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        service.shutdown()
+    return EXIT_OK
+
+
+def main(argv=None):
+    """
+    命令行入口。
+
+    Returns:
+        int: 进程退出码，见本模块顶部的 EXIT_* 常量
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        if not args.roots:
+            parser.error("--serve 需要指定 --root")
+        return serve(args)
+    from_plan = None
+    if args.from_plan:
+        if args.plan_path:
+            parser.error("--plan 和 --from-plan 不能同时使用")
+        try:
+            from_plan = CopyPlan.load(args.from_plan)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ 无法读取复制计划: {e}", file=sys.stderr)
+            return EXIT_USAGE
+    elif not args.list_path or not args.target or not args.roots:
+        parser.error("必须指定 --list、--root 和 --target（或使用 --serve / --from-plan）")
+    elif not os.path.isfile(args.list_path):
+        print(f"❌ 列表文件不存在: {args.list_path}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.scan_workers is not None and args.scan_workers < 1 or \
+            args.copy_workers is not None and args.copy_workers < 1:
+        print("❌ 进程数 / 线程数必须大于 0", file=sys.stderr)
+        return EXIT_USAGE
+    if args.top_k < 1:
+        print("❌ --top-k 必须大于 0", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        file_filter = FileFilter.from_fields(','.join(args.ext or ()), args.min_size, args.max_size,
+                                             args.modified_from, args.modified_to)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    report_path = args.report
+    if not report_path:
+        list_path = args.list_path
+        if not list_path:
+            # 按计划复制时沿用生成计划时的列表文件名，没有列表文件时以计划文件命名
+            list_path = from_plan.settings.get('list_path') or args.from_plan
+        list_path = Path(list_path)
+        report_path = str(list_path.with_name(f"{list_path.stem}_updated.{args.report_format}"))
+
+    events = ConsoleEvents(quiet=args.quiet)
+    engine = SearchEngine(
+        excel_path=args.list_path,
+        target_dir=args.target,
+        roots=args.roots,
+        updated_excel_path=report_path,
+        match_mode=args.mode,
+        min_fuzzy_score=args.min_score,
+        events=events,
+        scan_workers=args.scan_workers,
+        copy_workers=args.copy_workers,
+        report_format=args.report_format,
+        log_path=args.log,
+        index=IndexClient(args.index_url, token_path=token_path_for(args.settings)) if args.index_url else None,
+        follow_links=args.follow_links,
+        metrics_path=args.metrics,
+        profile=args.profile,
+        top_k=args.top_k,
+        copy_all=args.copy_all,
+        file_filter=file_filter,
+        normalize=args.normalize,
+        retry_from=report_path if args.retry_misses else None,
+        autotune=TuningStore(args.settings) if args.auto_tune else None,
+        plan_path=args.plan_path,
+        from_plan=from_plan,
+        space_check=not args.skip_space_check,
+    )
+    events.engine = engine
+
+    try:
+        summary = engine.run()
+    except KeyboardInterrupt:
+        engine.stop()
+        events.flush_logs()
+        return EXIT_INTERRUPTED
+    events.flush_logs()
+
+    plan_totals = summary['plan']
+    if plan_totals is not None:
+        if summary['error']:
+            return EXIT_ERROR
+        if not args.quiet:
+            print(f"复制计划: {args.plan_path}（未复制任何文件，按计划复制: --from-plan {args.plan_path}）",
+                  file=sys.stderr)
+        return EXIT_OK if plan_totals['fits'] and not plan_totals['missing'] else EXIT_INCOMPLETE
+
+    if not args.quiet:
+        print(f"共 {summary['total']} 个，找到 {summary['found']} 个，复制成功 {summary['copied']} 个，"
+              f"失败 {summary['failed']} 个。报告: {report_path}", file=sys.stderr)
+        if summary['carried']:
+            print(f"其中 {summary['carried']} 个沿用上一次的结果。", file=sys.stderr)
+        if summary['dirs_scanned'] or summary['duplicate_dirs']:
+            print(f"扫描目录 {summary['dirs_scanned']} 个，跳过重复目录 {summary['duplicate_dirs']} 个。", file=sys.stderr)
+        print(format_metrics(engine.metrics.to_dict()), file=sys.stderr)
+
+    if summary['error']:
+        return EXIT_ERROR
+    if summary['stopped']:
+        return EXIT_INTERRUPTED
+    if summary['failed']:
+        return EXIT_INCOMPLETE
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+copy_plan.py
+
+复制计划：在写入任何数据之前，确定每个名称要复制哪些源文件、复制到哪里、一共需要多少空间。
+
+- build_plan 在扫描结束后读取每个源文件的大小（目录逐个统计其中的文件），
+  统计总字节数和文件数、目标路径的重名、目标文件夹中已存在（将被覆盖）的文件，
+  以及目标所在卷的剩余空间；
+- 计划保存为 JSON（CopyPlan.save），之后可以直接按计划复制，无需重新扫描
+  （SearchEngine 的 from_plan）；
+- needed_bytes 供正常复制前的空间检查使用：只用复制调度时已读取的 stat 结果，不额外访问源文件。
+
+目标路径的命名规则（destinations）由本模块统一给出，复制时使用同一规则。
+本模块只依赖标准库。
+"""
+import os
+import json
+import stat
+import shutil
+import datetime
+from copy_scheduler import stat_sources
+from run_metrics import format_bytes
+
+# 计划文件的格式版本
+PLAN_VERSION = 1
+# 复制全部候选时，子文件夹名中不允许出现的字符
+_UNSAFE_DIR_CHARS = '<>:"/\\|?*'
+
+
+def plan_path_for(report_path):
+    """与结果报告同名的复制计划路径：xxx_updated.xlsx -> xxx_updated.plan.json。"""
+    return os.path.splitext(report_path)[0] + '.plan.json'
+
+
+def candidate_dir_name(name):
+    """把名称（可能是正则表达式）转换成可用作文件夹名的字符串。"""
+    safe = ''.join('_' if char in _UNSAFE_DIR_CHARS or ord(char) < 32 else char for char in name).strip(' .')
+    return safe or '_'
+
+
+def destinations(name, sources, copy_all=False):
+    """
+    源路径在目标文件夹中对应的相对路径，与 sources 一一对应。
+
+    只复制最佳候选时与源文件同名；复制全部候选时放在以名称命名的子文件夹中，
+    候选之间文件名重复时，排序靠后的候选加上序号前缀（2_、3_……）。
+    """
+    if not copy_all:
+        return [os.path.basename(path) for path in sources]
+    subdir = candidate_dir_name(name)
+    used, result = set(), []
+    for index, path in enumerate(sources, start=1):
+        dst_name = os.path.basename(path)
+        if dst_name in used:
+            dst_name = f"{index}_{dst_name}"
+        used.add(dst_name)
+        result.append(os.path.join(subdir, dst_name))
+    return result
+
+
+def free_space(path):
+    """path 所在卷的剩余字节数；path 尚不存在时查看最近的已存在的上级目录，无法获取时为 None。"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+def _existing_size(path):
+    """目标路径上已有的普通文件的大小（覆盖后会释放），其他情况为 0。"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return 0
+    return st.st_size if stat.S_ISREG(st.st_mode) else 0
+
+
+def needed_bytes(copies, target_dir):
+    """
+    复制所需的目标空间：各普通文件的大小减去目标位置上将被覆盖的同名文件。
+    目录的大小不在复制调度时读取，不计入（结果为下限）。
+
+    Args:
+        copies: [(目标相对路径, 源文件 stat 结果或 None)]
+        target_dir (str): 目标文件夹
+    """
+    total = 0
+    for dest, st in copies:
+        if st is not None and stat.S_ISREG(st.st_mode):
+            total += st.st_size - _existing_size(os.path.join(target_dir, dest))
+    return max(0, total)
+
+
+def tree_size(fs, path):
+    """统计目录中的文件数和总字节数，返回 (文件数, 字节数)。"""
+    files = size = 0
+    for dirpath, _, filenames in fs.walk(path):
+        for filename in filenames:
+            try:
+                size += fs.stat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                continue
+            files += 1
+    return files, size
+
+
+class CopyPlan:
+    """
+    一次任务的复制计划：
+        names       全部名称（列表顺序）
+        candidates  {名称: [候选路径, ...]}，从好到差排列，用于生成报告；计划中的路径都是绝对路径，
+                    从其他工作目录按计划复制时仍然有效
+        copies      {名称: [{'source', 'dest', 'size', 'files', 'dir', 'exists'}, ...]}，
+                    实际要复制的源文件；dest 为相对目标文件夹的路径，读取失败的源文件 size 为 None
+        carried     {名称: [候选路径, ...]}，沿用上一次报告结果、不需要复制的名称
+        collisions  {目标相对路径: [名称, ...]}，多个名称将复制到同一目标路径
+        totals      统计，见 build_plan
+        settings    生成计划时的任务设置（target_dir、roots、match_mode、top_k、copy_all、list_path 等）
+    """
+
+    def __init__(self, names, candidates, copies, carried, collisions, totals, settings):
+        self.names = names
+        self.candidates = candidates
+        self.copies = copies
+        self.carried = carried
+        self.collisions = collisions
+        self.totals = totals
+        self.settings = settings
+
+    @property
+    def target_dir(self):
+        return self.settings.get('target_dir')
+
+    @property
+    def fits(self):
+        """目标卷的剩余空间是否足够（无法获取剩余空间时视为足够）。"""
+        return self.totals['fits']
+
+    def summary_lines(self):
+        """计划的统计，整理成多行文本。"""
+        totals = self.totals
+        lines = [f"名称 {totals['names']} 个：找到 {totals['found']} 个，未找到 {totals['missing']} 个"
+                 + (f"，沿用上一次结果 {totals['carried']} 个" if totals['carried'] else ''),
+                 f"将复制 {totals['files']:,} 个文件（其中目录 {totals['dirs']} 个），共 {format_bytes(totals['bytes'])}"]
+        if totals['overwrites']:
+            lines.append(f"目标文件夹中已存在 {totals['overwrites']} 个同名项，将被覆盖")
+        if totals['unreadable']:
+            lines.append(f"{totals['unreadable']} 个源文件无法读取")
+        for dest, names in list(self.collisions.items())[:10]:
+            lines.append(f"重名: {dest} <- {', '.join(names)}")
+        if len(self.collisions) > 10:
+            lines.append(f"……共 {len(self.collisions)} 处重名")
+        free = totals['free_bytes']
+        free_text = format_bytes(free) if free is not None else '未知'
+        lines.append(f"需要 {format_bytes(totals['needed_bytes'])}，目标卷剩余 {free_text}"
+                     + ('' if self.fits else '，空间不足'))
+        return lines
+
+    def to_dict(self):
+        """转换为可写入 JSON 的字典。"""
+        return {'version': PLAN_VERSION, 'settings': self.settings, 'totals': self.totals,
+                'names': self.names, 'candidates': self.candidates, 'copies': self.copies,
+                'carried': self.carried, 'collisions': self.collisions}
+
+    def save(self, path):
+        """把计划写入 JSON 文件。"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """
+        读取 save 保存的计划。
+
+        Raises:
+            OSError: 无法读取文件
+            ValueError: 不是有效的计划文件
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('version') != PLAN_VERSION:
+            raise ValueError(f"不是有效的复制计划文件（需要版本 {PLAN_VERSION}）: {path}")
+        return cls(data['names'], data['candidates'], data['copies'], data.get('carried') or {},
+                   data.get('collisions') or {}, data['totals'], data['settings'])
+
+    def sources(self):
+        """计划中要复制的全部源路径。"""
+        return [entry['source'] for entries in self.copies.values() for entry in entries]
+
+
+def build_plan(names, candidates, target_dir, fs, copy_all=False, carried=None, workers=8, **settings):
+    """
+    生成复制计划，不写入任何数据。
+
+    Args:
+        names (list[str]): 全部名称（列表顺序）
+        candidates (dict): {名称: [候选路径, ...]}，未找到的名称可以不出现
+        target_dir (str): 复制目标文件夹
+        fs: 读取源文件使用的文件系统后端（fs_backend）
+        copy_all (bool): 复制全部候选，否则只复制最佳候选
+        carried (dict): {名称: [候选路径, ...]}，沿用上一次结果、不需要复制的名称
+        workers (int): 并行读取元数据的线程数
+        **settings: 一并记录的任务设置（roots、match_mode、top_k 等）
+
+    Returns:
+        CopyPlan: totals 包含 names、found、missing、carried、files、dirs、bytes、overwrites、
+                  overwrite_bytes、needed_bytes、free_bytes、fits、unreadable、collisions
+    """
+    # 根目录为相对路径时扫描结果也是相对路径，保存前转换成绝对路径
+    candidates = {name: [os.path.abspath(path) for path in paths] for name, paths in candidates.items()}
+    carried = {name: [os.path.abspath(path) for path in paths] for name, paths in (carried or {}).items()}
+    planned = {}
+    for name in names:
+        paths = candidates.get(name) or []
+        if name not in carried and paths:
+            sources = paths if copy_all else paths[:1]
+            planned[name] = list(zip(sources, destinations(name, sources, copy_all)))
+    stats = stat_sources([source for pairs in planned.values() for source, _ in pairs], fs, workers)
+
+    copies, targets = {}, {}
+    totals = dict.fromkeys(('files', 'dirs', 'bytes', 'overwrites', 'overwrite_bytes', 'unreadable'), 0)
+    for name, pairs in planned.items():
+        entries = []
+        for source, dest in pairs:
+            st = stats.get(source)
+            dest_path = os.path.join(target_dir, dest)
+            entry = {'source': source, 'dest': dest, 'size': None, 'files': 0,
+                     'dir': bool(st is not None and stat.S_ISDIR(st.st_mode)), 'exists': os.path.lexists(dest_path)}
+            if st is None:
+                totals['unreadable'] += 1
+            elif entry['dir']:
+                entry['files'], entry['size'] = tree_size(fs, source)
+                totals['dirs'] += 1
+            else:
+                entry['files'], entry['size'] = 1, st.st_size
+            if entry['size'] is not None:
+                totals['files'] += entry['files']
+                totals['bytes'] += entry['size']
+            if entry['exists']:
+                totals['overwrites'] += 1
+                totals['overwrite_bytes'] += _existing_size(dest_path)
+            targets.setdefault(os.path.normcase(dest), []).append(name)
+            entries.append(entry)
+        copies[name] = entries
+
+    collisions = {dest: sorted(set(owners)) for dest, owners in targets.items() if len(set(owners)) > 1}
+    totals.update(names=len(names), found=len(planned) + len(carried), carried=len(carried),
+                  missing=len(names) - len(planned) - len(carried), collisions=len(collisions),
+                  needed_bytes=max(0, totals['bytes'] - totals['overwrite_bytes']),
+                  free_bytes=free_space(target_dir))
+    totals['fits'] = totals['free_bytes'] is None or totals['needed_bytes'] <= totals['free_bytes']
+    settings.update(target_dir=os.path.abspath(target_dir), copy_all=copy_all,
+                    created=datetime.datetime.now().isoformat(timespec='seconds'))
+    if settings.get('roots'):
+        settings['roots'] = [os.path.abspath(root) for root in settings['roots']]
+    return CopyPlan(list(names), candidates, copies, carried, collisions, totals, settings)
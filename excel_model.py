@@ -5,11 +5,47 @@ excel_model.py
 负责数据的加载、保存、显示和编辑功能。
 """
 import sys
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from PyQt5.QtCore import QAbstractTableModel, Qt, QModelIndex, QVariant
+from PyQt5.QtCore import QAbstractTableModel, QAbstractProxyModel, Qt, QModelIndex, QVariant, QObject, pyqtSignal
 from PyQt5.QtWidgets import QTableView, QApplication, QHeaderView, QAbstractItemView
 from PyQt5.QtGui import QKeySequence
-import pandas as pd
+
+# pandas 导入耗时较长，在第一次真正需要 DataFrame 时才导入，见 _pandas()
+pd = None
+
+
+def _pandas():
+    """按需导入 pandas 并返回该模块。"""
+    global pd
+    if pd is None:
+        import pandas
+        pd = pandas
+    return pd
+
+
+def read_excel_frame(excel_path):
+    """
+    读取 Excel 文件为 DataFrame（可在后台线程调用）。
+    文件不存在、读取失败或为空时返回只包含默认列的一行空表。
+    """
+    _pandas()
+    try:
+        if Path(excel_path).exists():
+            df = pd.read_excel(excel_path)
+            # 确保至少有一列
+            if df.empty or len(df.columns) == 0:
+                return pd.DataFrame({'文件名': ['']})
+            # 填充NaN值为空字符串
+            return df.fillna('')
+    except Exception as e:
+        print(f"加载Excel文件失败: {e}")
+    return pd.DataFrame({'文件名': ['']})
+
+# 结果表中记录查找状态的列名（由 file_operations 生成报告时写入）
+STATUS_COLUMN = '状态'
+STATUS_FOUND_PREFIX = '✅'
+STATUS_MISSING_PREFIX = '❌'
 
 
 class ExcelTableModel(QAbstractTableModel):
@@ -27,16 +63,44 @@ class ExcelTableModel(QAbstractTableModel):
             parent: 父对象
         """
         super().__init__(parent)
-        self.df = pd.DataFrame()
+        self._df = None  # 首次访问 df 时才创建，避免启动时导入 pandas
         self.is_read_only = is_read_only
+        # 自上次清理以来被编辑过的行号，cleanup_empty_rows 只检查这些行
+        self._dirty_rows = set()
+        # cleanup_empty_rows 逐段发出删除信号期间已删除的区间（原行号，升序），其余时间为 None
+        self._removed_ranges = None
+
+    @property
+    def df(self):
+        """模型的数据 DataFrame"""
+        if self._df is None:
+            self._df = _pandas().DataFrame()
+        return self._df
+
+    @df.setter
+    def df(self, value):
+        _pandas()
+        self._df = value
 
     def rowCount(self, parent=QModelIndex()):
         """返回行数"""
-        return len(self.df)
+        if self._df is None:
+            return 0
+        if self._removed_ranges:
+            return len(self._df) - sum(last - first + 1 for first, last in self._removed_ranges)
+        return len(self._df)
+
+    def _df_row(self, row):
+        """视图行号对应的 DataFrame 行号（清理空行发出删除信号期间跳过已删除的区间）"""
+        if self._removed_ranges:
+            for first, last in self._removed_ranges:
+                if row >= first:
+                    row += last - first + 1
+        return row
 
     def columnCount(self, parent=QModelIndex()):
         """返回列数"""
-        return len(self.df.columns) if not self.df.empty else 0
+        return len(self._df.columns) if self._df is not None and not self._df.empty else 0
 
     def data(self, index, role=Qt.DisplayRole):
         """获取指定索引位置的数据"""
@@ -45,7 +109,7 @@ class ExcelTableModel(QAbstractTableModel):
 
         if role == Qt.DisplayRole or role == Qt.EditRole:
             try:
-                value = self.df.iloc[index.row(), index.column()]
+                value = self.df.iloc[self._df_row(index.row()), index.column()]
                 return str(value) if pd.notna(value) else ""
             except (IndexError, KeyError):
                 return ""
@@ -60,6 +124,7 @@ class ExcelTableModel(QAbstractTableModel):
         if role == Qt.EditRole:
             try:
                 self.df.iloc[index.row(), index.column()] = value
+                self._dirty_rows.add(index.row())
                 self.dataChanged.emit(index, index, [Qt.DisplayRole])
                 return True
             except (IndexError, KeyError):
@@ -67,6 +132,65 @@ class ExcelTableModel(QAbstractTableModel):
         
         return False
 
+    def set_block(self, top, left, values):
+        """
+        批量写入一个二维数据块，只触发一次 dataChanged。
+
+        Args:
+            top (int): 数据块左上角的行号
+            left (int): 数据块左上角的列号
+            values (list[list]): 按行排列的单元格值；值为 None 的单元格保持原值不变，
+                                 超出现有列范围的部分会被忽略
+
+        Returns:
+            bool: 是否写入成功
+        """
+        if self.is_read_only or not values or top < 0 or left < 0:
+            return False
+
+        bottom = min(top + len(values), len(self.df)) - 1
+        right = min(left + max(len(row) for row in values), len(self.df.columns)) - 1
+        if bottom < top or right < left:
+            return False
+
+        # 先取出原有数据块，再在内存中覆盖，最后一次性写回 DataFrame
+        block = self.df.iloc[top:bottom + 1, left:right + 1].to_numpy(dtype=object, copy=True)
+        for row_offset, row_values in enumerate(values[:bottom - top + 1]):
+            for col_offset, value in enumerate(row_values[:right - left + 1]):
+                if value is not None:
+                    block[row_offset, col_offset] = value
+
+        # 字符串写入数值列时需先转为 object，避免 pandas 的类型不兼容错误
+        for col in range(left, right + 1):
+            if self.df.dtypes.iloc[col] != object:
+                self.df[self.df.columns[col]] = self.df[self.df.columns[col]].astype(object)
+
+        self.df.iloc[top:bottom + 1, left:right + 1] = block
+        self._dirty_rows.update(range(top, bottom + 1))
+        self.dataChanged.emit(self.index(top, left), self.index(bottom, right), [Qt.DisplayRole])
+        return True
+
+    def clear_cells(self, indexes):
+        """
+        清空一组单元格（可以是不连续的选区），通过 set_block 一次性写入。
+
+        Args:
+            indexes (list[QModelIndex]): 需要清空的单元格索引
+        """
+        cells = [(index.row(), index.column()) for index in indexes if index.isValid()]
+        if not cells:
+            return False
+
+        top = min(row for row, _ in cells)
+        left = min(col for _, col in cells)
+        bottom = max(row for row, _ in cells)
+        right = max(col for _, col in cells)
+
+        values = [[None] * (right - left + 1) for _ in range(bottom - top + 1)]
+        for row, col in cells:
+            values[row - top][col - left] = ""
+        return self.set_block(top, left, values)
+
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         """获取表头数据"""
         if role == Qt.DisplayRole:
@@ -94,9 +218,10 @@ class ExcelTableModel(QAbstractTableModel):
             
         self.beginInsertRows(parent, row, row + count - 1)
         
-        # 创建新的空行数据
-        new_rows = pd.DataFrame([['' for _ in range(len(self.df.columns))] for _ in range(count)], 
-                                columns=self.df.columns)
+        # 创建新的空行数据（访问 self.df 时会按需导入 pandas）
+        columns = self.df.columns
+        new_rows = pd.DataFrame([['' for _ in range(len(columns))] for _ in range(count)], 
+                                columns=columns)
         
         # 分割原数据框并插入新行
         if row == 0:
@@ -108,6 +233,8 @@ class ExcelTableModel(QAbstractTableModel):
             bottom_part = self.df.iloc[row:]
             self.df = pd.concat([top_part, new_rows, bottom_part], ignore_index=True)
         
+        # 插入点之后的脏行号整体后移
+        self._dirty_rows = {r + count if r >= row else r for r in self._dirty_rows}
         self.endInsertRows()
         return True
 
@@ -121,6 +248,8 @@ class ExcelTableModel(QAbstractTableModel):
             
         self.beginRemoveRows(parent, row, row + count - 1)
         self.df = self.df.drop(self.df.index[row:row + count]).reset_index(drop=True)
+        self._dirty_rows = {r - count if r >= row + count else r
+                            for r in self._dirty_rows if not row <= r < row + count}
         self.endRemoveRows()
         return True
 
@@ -130,67 +259,97 @@ class ExcelTableModel(QAbstractTableModel):
             return False
         return self.insertRows(len(self.df), 1)
     
-    def cleanup_empty_rows(self):
+    def set_rows(self, rows, columns):
         """
-        [新增] 实时清理所有空行并重新排列数据
+        直接用内存中的数据替换整张表（例如任务结束时移交的结果），无需读写文件
+
+        Args:
+            rows (list[list]): 按行排列的数据
+            columns (list[str]): 表头
+        """
+        self.set_dataframe(_pandas().DataFrame(rows, columns=columns, dtype=object))
+
+    def append_rows(self, rows):
         """
-        if self.df.empty:
+        在末尾追加一批行，用于任务运行过程中实时展示结果（只读模型也可调用）
+
+        Args:
+            rows (list[list]): 按行排列的数据，列顺序与当前表头一致
+        """
+        if not rows:
             return
+        first = len(self.df)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        new_rows = pd.DataFrame(rows, columns=self.df.columns, dtype=object)
+        self.df = pd.concat([self.df, new_rows], ignore_index=True) if first else new_rows
+        self.endInsertRows()
 
-        initial_row_count = len(self.df)
+    def cleanup_empty_rows(self, full=False):
+        """
+        清理空行。默认只检查自上次清理以来被编辑过的行，
+        所有空行一次性从 DataFrame 中删除，并按连续区间发出 beginRemoveRows / endRemoveRows。
 
-        # 1. 将空字符串临时替换为 NaN，以便使用 dropna
-        temp_df = self.df.replace('', pd.NA)
-        
-        # 2. 移除所有单元格都为 NaN 的行，并重置索引
-        self.df = temp_df.dropna(how='all').reset_index(drop=True)
-        
-        # 3. 如果数据框变为空，创建一个默认行
-        if self.df.empty:
-            self.df = pd.DataFrame({'文件名': ['']})
-        else:
-            # 4. 再次填充 NaN 为空字符串，以保持数据一致性
-            self.df = self.df.fillna('')
+        Args:
+            full (bool): 为 True 时检查整张表（例如保存前的最终清理）
+        """
+        if full:
+            self._dirty_rows = set(range(len(self.df)))
+        rows = sorted(r for r in self._dirty_rows if r < len(self.df))
+        self._dirty_rows = set()
+        if not rows or self.df.empty:
+            return
 
-        final_row_count = len(self.df)
+        # 只取出被编辑过的行判断是否整行为空
+        candidate = self.df.iloc[rows]
+        is_empty = (candidate.isna() | (candidate == '')).all(axis=1).to_numpy()
+        empty_rows = [row for row, empty in zip(rows, is_empty) if empty]
 
-        if initial_row_count != final_row_count:
-            # 如果行数发生变化，通知视图重置模型以更新显示
-            self.beginResetModel()
-            self.endResetModel()
+        # 至少保留一行，方便继续编辑
+        if len(empty_rows) == len(self.df):
+            empty_rows = empty_rows[1:]
+        if not empty_rows:
+            return
+
+        # 将空行合并为连续区间
+        ranges = []
+        for row in empty_rows:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+
+        # 新的 DataFrame 只构造一次；删除信号按区间从下往上逐段发出，保留视图的选区和滚动位置。
+        # 从下往上删除时，尚未删除的区间行号不变，期间 rowCount / data 按 _removed_ranges 跳过已删除的行
+        keep = [True] * len(self.df)
+        for row in empty_rows:
+            keep[row] = False
+        compacted = self.df.iloc[keep].reset_index(drop=True)
+        self._removed_ranges = []
+        try:
+            for first, last in reversed(ranges):
+                self.beginRemoveRows(QModelIndex(), first, last)
+                self._removed_ranges.insert(0, (first, last))
+                self.endRemoveRows()
+        finally:
+            self._removed_ranges = None
+            self.df = compacted
+
+    def set_dataframe(self, df):
+        """用已经读取好的 DataFrame 替换整张表（例如后台线程读取的结果）"""
+        self.beginResetModel()
+        self.df = df
+        self._dirty_rows = set()
+        self.endResetModel()
 
     def load(self, excel_path):
         """从 Excel 文件加载数据"""
-        try:
-            path = Path(excel_path)
-            if path.exists():
-                self.beginResetModel()
-                self.df = pd.read_excel(excel_path)
-                
-                # 确保至少有一列
-                if self.df.empty or len(self.df.columns) == 0:
-                    self.df = pd.DataFrame({'文件名': ['']})
-                
-                # 填充NaN值为空字符串
-                self.df = self.df.fillna('')
-                
-                self.endResetModel()
-            else:
-                # 文件不存在时创建默认的DataFrame
-                self.beginResetModel()
-                self.df = pd.DataFrame({'文件名': ['']})
-                self.endResetModel()
-        except Exception as e:
-            print(f"加载Excel文件失败: {e}")
-            self.beginResetModel()
-            self.df = pd.DataFrame({'文件名': ['']})
-            self.endResetModel()
+        self.set_dataframe(read_excel_frame(excel_path))
 
     def save(self, excel_path):
         """将数据保存到 Excel 文件"""
         try:
             # 在保存前也进行一次最终清理，确保保存结果干净
-            self.cleanup_empty_rows()
+            self.cleanup_empty_rows(full=True)
             
             # 创建目录（如果不存在）
             path = Path(excel_path)
@@ -204,6 +363,322 @@ class ExcelTableModel(QAbstractTableModel):
             return False
 
 
+class ExcelLoadWorker(QObject):
+    """
+    在后台线程中创建缺失的默认 Excel 文件并读取表格，
+    读取完成后通过 loaded 信号把 DataFrame 交给界面线程中的模型。
+    """
+    loaded = pyqtSignal(object, object)  # (ExcelTableModel, DataFrame)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, jobs, setup=None):
+        """
+        Args:
+            jobs (list[tuple]): [(模型, Excel 路径), ...]
+            setup (callable): 读取前先执行的初始化函数（例如创建默认文件），可为 None
+        """
+        super().__init__()
+        self.jobs = jobs
+        self.setup = setup
+
+    def run(self):
+        """依次读取所有表格。"""
+        try:
+            if self.setup:
+                self.setup()
+            for model, excel_path in self.jobs:
+                self.loaded.emit(model, read_excel_frame(excel_path))
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.finished.emit()
+
+
+class TableFilterProxyModel(QAbstractProxyModel):
+    """
+    带索引的筛选代理模型。
+
+    首次筛选时为源模型的每一行预先构建一份小写的整行文本索引，
+    之后每次按键只在索引上做子串匹配；当新的关键字是上一次关键字的延伸时，
+    只在上一次的结果中继续筛选，因此连续输入时每次按键只需毫秒级。
+    结果表还支持按状态列（已找到 / 未找到）进行分面筛选。
+    """
+
+    FACET_ALL = 'all'
+    FACET_FOUND = 'found'
+    FACET_MISSING = 'missing'
+
+    def __init__(self, parent=None):
+        """初始化代理模型"""
+        super().__init__(parent)
+        self._rows = None  # 筛选后保留的源行号（升序），None 表示不筛选
+        self._texts = None  # 每一行的小写文本索引，None 表示尚未构建或已失效
+        self._status = None  # 每一行的状态：True 已找到 / False 未找到 / None 无状态
+        self._query = ''
+        self._facet = self.FACET_ALL
+        self._pending_reset = False
+        self._pending_remove = None  # 筛选时正在删除的代理行范围 (lo, hi)
+
+    # ---------------- 源模型连接 ----------------
+
+    def setSourceModel(self, model):
+        """设置源模型并监听其结构变化"""
+        self.beginResetModel()
+        old_model = self.sourceModel()
+        if old_model is not None:
+            for signal, slot in self._source_connections(old_model):
+                signal.disconnect(slot)
+        super().setSourceModel(model)
+        for signal, slot in self._source_connections(model):
+            signal.connect(slot)
+        self._invalidate_index()
+        self._rows = None
+        self.endResetModel()
+
+    def _source_connections(self, model):
+        """源模型信号与本模型槽函数的对应关系"""
+        return [
+            (model.dataChanged, self._on_source_data_changed),
+            (model.modelAboutToBeReset, self._on_source_about_to_change),
+            (model.modelReset, self._on_source_changed),
+            (model.layoutAboutToBeChanged, self._on_source_about_to_change),
+            (model.layoutChanged, self._on_source_changed),
+            (model.rowsAboutToBeInserted, self._on_source_rows_about_to_be_inserted),
+            (model.rowsInserted, self._on_source_rows_inserted),
+            (model.rowsAboutToBeRemoved, self._on_source_rows_about_to_be_removed),
+            (model.rowsRemoved, self._on_source_rows_removed),
+            (model.columnsAboutToBeInserted, self._on_source_about_to_change),
+            (model.columnsInserted, self._on_source_changed),
+            (model.columnsAboutToBeRemoved, self._on_source_about_to_change),
+            (model.columnsRemoved, self._on_source_changed),
+        ]
+
+    def _on_source_about_to_change(self, *args):
+        """源模型即将发生整体变化"""
+        if not self._pending_reset:
+            self._pending_reset = True
+            self.beginResetModel()
+
+    def _on_source_changed(self, *args):
+        """源模型整体变化完成后重建索引并重新筛选"""
+        self._invalidate_index()
+        self._apply_filter(incremental=False)
+        if self._pending_reset:
+            self._pending_reset = False
+            self.endResetModel()
+
+    def _on_source_rows_about_to_be_inserted(self, parent, first, last):
+        """未筛选时直接转发插入行，保持视图的选区和滚动位置；筛选时等插入完成后再判断新行是否保留"""
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _on_source_rows_inserted(self, parent, first, last):
+        """源模型插入行之后：筛选时只为新行建立索引、按当前条件筛选，保留的行插入到对应位置"""
+        if self._rows is None:
+            self._invalidate_index()
+            self.endInsertRows()
+            return
+
+        count = last - first + 1
+        if self._texts is None:
+            self._ensure_index()
+        else:
+            texts, status = self._row_index(first, last + 1)
+            self._texts[first:first] = texts
+            self._status[first:first] = status
+        # 插入位置之后的行号整体后移，它们在代理中的位置不变
+        pos = bisect_left(self._rows, first)
+        self._rows[pos:] = [row + count for row in self._rows[pos:]]
+
+        matches = self._filter_rows(range(first, last + 1))
+        if matches:
+            self.beginInsertRows(QModelIndex(), pos, pos + len(matches) - 1)
+            self._rows[pos:pos] = matches
+            self.endInsertRows()
+
+    def _on_source_rows_about_to_be_removed(self, parent, first, last):
+        """未筛选时直接转发删除行；筛选时只删除其中保留在结果中的行"""
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            return
+        lo, hi = bisect_left(self._rows, first), bisect_right(self._rows, last)
+        self._pending_remove = (lo, hi)
+        if lo < hi:
+            self.beginRemoveRows(QModelIndex(), lo, hi - 1)
+
+    def _on_source_rows_removed(self, parent, first, last):
+        """源模型删除行之后：筛选时删除对应的索引，之后的行号整体前移"""
+        if self._rows is None:
+            self._invalidate_index()
+            self.endRemoveRows()
+            return
+
+        count = last - first + 1
+        lo, hi = self._pending_remove
+        self._pending_remove = None
+        if self._texts is not None:
+            del self._texts[first:last + 1]
+            del self._status[first:last + 1]
+        self._rows[lo:] = [row - count for row in self._rows[hi:]]
+        if lo < hi:
+            self.endRemoveRows()
+
+    def _on_source_data_changed(self, top_left, bottom_right, roles=()):
+        """单元格内容变化时只更新受影响行的索引，不改变当前的筛选结果"""
+        first, last = top_left.row(), bottom_right.row()
+        if self._texts is not None:
+            texts, status = self._row_index(first, last + 1)
+            self._texts[first:last + 1] = texts
+            self._status[first:last + 1] = status
+
+        if self._rows is None:
+            proxy_first, proxy_last = first, last
+        else:
+            proxy_first = bisect_left(self._rows, first)
+            proxy_last = bisect_right(self._rows, last) - 1
+            if proxy_first > proxy_last:
+                return
+        self.dataChanged.emit(self.index(proxy_first, top_left.column()),
+                              self.index(proxy_last, bottom_right.column()), roles)
+
+    # ---------------- 索引 ----------------
+
+    def _invalidate_index(self):
+        """标记索引失效，下次筛选时重新构建"""
+        self._texts = None
+        self._status = None
+
+    def _row_index(self, start, stop):
+        """为源模型 [start, stop) 行构建小写文本和状态索引"""
+        df = self.sourceModel().df.iloc[start:stop]
+        if df.empty:
+            return [], []
+
+        lowered = None
+        for col in df.columns:
+            column_text = df[col].astype(str).str.lower()
+            lowered = column_text if lowered is None else lowered + '\t' + column_text
+
+        if STATUS_COLUMN in df.columns:
+            status_text = df[STATUS_COLUMN].astype(str)
+            found = status_text.str.startswith(STATUS_FOUND_PREFIX).tolist()
+            missing = status_text.str.startswith(STATUS_MISSING_PREFIX).tolist()
+            status = [True if f else (False if m else None) for f, m in zip(found, missing)]
+        else:
+            status = [None] * len(df)
+        return lowered.tolist(), status
+
+    def _ensure_index(self):
+        """按需构建整表索引"""
+        if self._texts is None:
+            self._texts, self._status = self._row_index(0, self.sourceModel().rowCount())
+
+    # ---------------- 筛选 ----------------
+
+    def set_filter(self, text=None, facet=None):
+        """
+        设置筛选条件
+
+        Args:
+            text (str): 关键字，按空白拆分，每个词都必须出现在行内（不区分大小写）
+            facet (str): 状态分面，取值为 FACET_ALL / FACET_FOUND / FACET_MISSING
+        """
+        new_query = self._query if text is None else text.lower().strip()
+        new_facet = self._facet if facet is None else facet
+        if new_query == self._query and new_facet == self._facet:
+            return
+
+        # 关键字是上一次的延伸且分面不变时，结果一定是上一次结果的子集
+        incremental = new_facet == self._facet and new_query.startswith(self._query)
+        self._query = new_query
+        self._facet = new_facet
+
+        self.beginResetModel()
+        self._apply_filter(incremental=incremental)
+        self.endResetModel()
+
+    def _apply_filter(self, incremental):
+        """根据当前条件计算保留的源行号"""
+        tokens = self._query.split()
+        if not tokens and self._facet == self.FACET_ALL:
+            self._rows = None
+            return
+
+        self._ensure_index()
+        if incremental and self._rows is not None:
+            rows = self._rows
+        else:
+            rows = range(len(self._texts))
+        self._rows = self._filter_rows(rows)
+
+    def _filter_rows(self, rows):
+        """返回 rows 中符合当前条件的源行号（保持原有顺序），索引必须已经构建"""
+        tokens = self._query.split()
+        texts, status = self._texts, self._status
+        if self._facet == self.FACET_FOUND:
+            rows = [r for r in rows if status[r] is True]
+        elif self._facet == self.FACET_MISSING:
+            rows = [r for r in rows if status[r] is False]
+
+        for token in tokens:
+            rows = [r for r in rows if token in texts[r]]
+        return list(rows)
+
+    def is_filtered(self):
+        """当前是否处于筛选状态"""
+        return self._rows is not None
+
+    # ---------------- QAbstractProxyModel 接口 ----------------
+
+    def rowCount(self, parent=QModelIndex()):
+        """返回筛选后的行数"""
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        """返回列数"""
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def index(self, row, column, parent=QModelIndex()):
+        """创建代理索引"""
+        if parent.isValid() or not 0 <= row < self.rowCount() or not 0 <= column < self.columnCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        """表格模型没有层级"""
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        """代理索引转换为源模型索引"""
+        if not proxy_index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        row = proxy_index.row() if self._rows is None else self._rows[proxy_index.row()]
+        return self.sourceModel().index(row, proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        """源模型索引转换为代理索引"""
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self._rows is not None:
+            pos = bisect_left(self._rows, row)
+            if pos >= len(self._rows) or self._rows[pos] != row:
+                return QModelIndex()
+            row = pos
+        return self.index(row, source_index.column())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """垂直表头显示源模型中的行号，方便定位"""
+        if orientation == Qt.Vertical and self._rows is not None and 0 <= section < len(self._rows):
+            section = self._rows[section]
+        return self.sourceModel().headerData(section, orientation, role)
+
+
 class CustomTableView(QTableView):
     """
     自定义表格视图，支持复制粘贴、删除等操作
@@ -225,11 +700,11 @@ class CustomTableView(QTableView):
             
         # 处理删除键 (Delete 和 Backspace)
         if event.key() in (Qt.Key_Delete, Qt.Key_Backspace):
-            for index in selected_indexes:
-                self.model().setData(index, "", Qt.EditRole)
+            model, source_indexes = self._source_model(selected_indexes)
+            model.clear_cells(source_indexes)
             
             # [新增] 删除后立即进行空行清理
-            self.model().cleanup_empty_rows()
+            model.cleanup_empty_rows()
                 
         # 处理复制 (Ctrl+C)
         elif event.matches(QKeySequence.Copy):
@@ -242,6 +717,13 @@ class CustomTableView(QTableView):
         else:
             super().keyPressEvent(event)
 
+    def _source_model(self, indexes):
+        """返回底层的数据模型，以及映射到该模型上的索引（视图可能挂在筛选代理上）"""
+        model = self.model()
+        if isinstance(model, QAbstractProxyModel):
+            return model.sourceModel(), [model.mapToSource(index) for index in indexes]
+        return model, indexes
+
     def _copy_selection(self):
         """复制选中的内容到剪贴板"""
         selected_indexes = self.selectedIndexes()
@@ -281,17 +763,16 @@ class CustomTableView(QTableView):
             return
             
         # 获取粘贴起始位置（选中区域的左上角）
-        start_index = min(selected_indexes, key=lambda x: (x.row(), x.column()))
+        model, source_indexes = self._source_model(selected_indexes)
+        start_index = min(source_indexes, key=lambda x: (x.row(), x.column()))
         start_row = start_index.row()
         start_col = start_index.column()
         
-        # 解析剪贴板数据
-        rows_data = clipboard_text.strip().split('\n')
+        # 解析剪贴板数据（兼容 Windows 的 \r\n 换行）
+        rows_data = [row.split('\t') for row in clipboard_text.rstrip('\r\n').splitlines()]
         paste_rows = len(rows_data)
-        paste_cols = max(len(row.split('\t')) for row in rows_data) if rows_data else 0
         
         # 检查是否需要添加新行
-        model = self.model()
         current_rows = model.rowCount()
         required_rows = start_row + paste_rows
         
@@ -300,24 +781,11 @@ class CustomTableView(QTableView):
             rows_to_add = required_rows - current_rows
             model.insertRows(current_rows, rows_to_add)
         
-        # 检查是否需要添加新列（如果模型支持的话）
-        current_cols = model.columnCount()
-        required_cols = start_col + paste_cols
-        
-        # 粘贴数据
-        for row_idx, row_data in enumerate(rows_data):
-            cells = row_data.split('\t')
-            for col_idx, cell_data in enumerate(cells):
-                target_row = start_row + row_idx
-                target_col = start_col + col_idx
-                
-                # 确保不超出列范围
-                if target_col < current_cols:
-                    index = model.index(target_row, target_col)
-                    model.setData(index, cell_data, Qt.EditRole)
+        # 粘贴数据：整个数据块一次性写入模型，超出列范围的部分由模型忽略
+        model.set_block(start_row, start_col, rows_data)
 
         # [新增] 粘贴后立即进行空行清理
-        self.model().cleanup_empty_rows()
+        model.cleanup_empty_rows()
 
 
 # 测试代码
@@ -329,7 +797,7 @@ if __name__ == "__main__":
     model = ExcelTableModel(is_read_only=False)
     
     # 创建测试数据
-    test_df = pd.DataFrame({
+    test_df = _pandas().DataFrame({
         '文件名': ['file1.txt', '', 'file3.txt'],
         '状态': ['待处理', '', '待处理'],
         '备注': ['', '', '']
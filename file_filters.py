@@ -0,0 +1,223 @@
+"""
+file_filters.py
+
+文件元数据筛选条件：扩展名、大小范围和修改时间范围。
+
+筛选条件可以来自任务设置（对所有名称生效），也可以来自名称列表中的附加列（只对该行的名称生效）。
+扫描时按开销从低到高依次检查：先比较扩展名（只需文件名），再读取大小和修改时间；
+os.scandir 返回的 DirEntry 会缓存 stat 结果（Windows 上随目录列表一起返回），
+因此被扩展名排除的文件不会产生任何额外的系统调用，通过的文件也最多 stat 一次。
+
+本模块只依赖标准库，扫描子进程可以直接导入。
+"""
+import re
+import datetime
+
+# 大小单位（按 1024 进位）
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2,
+               'G': 1024 ** 3, 'GB': 1024 ** 3, 'T': 1024 ** 4, 'TB': 1024 ** 4}
+_SIZE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?I?B?)\s*$', re.IGNORECASE)
+# 日期格式：只有日期时表示当天整天
+_DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y%m%d')
+_DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y/%m/%d %H:%M:%S', '%Y/%m/%d %H:%M')
+
+# 名称列表中可作为筛选条件的附加列：{列名（小写）: 字段名}
+LIST_COLUMNS = {
+    '扩展名': 'extensions', 'extension': 'extensions', 'ext': 'extensions',
+    '最小大小': 'min_size', 'min_size': 'min_size',
+    '最大大小': 'max_size', 'max_size': 'max_size',
+    '修改时间起': 'modified_from', 'modified_from': 'modified_from',
+    '修改时间止': 'modified_to', 'modified_to': 'modified_to',
+}
+
+
+def parse_extensions(value):
+    """把 "pdf, .XLSX;dwg" 之类的文本转换成小写、带点的扩展名元组。"""
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = re.split(r'[\s,;，；|]+', value)
+    extensions = []
+    for ext in value:
+        ext = str(ext).strip().lower()
+        if ext:
+            extensions.append(ext if ext.startswith('.') else '.' + ext)
+    return tuple(dict.fromkeys(extensions))
+
+
+def parse_size(value):
+    """
+    把 "10KB"、"1.5 MB"、"2048" 之类的文本转换成字节数，空值返回 None。
+
+    Raises:
+        ValueError: 无法识别的大小
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _SIZE_PATTERN.match(str(value))
+    if not match:
+        raise ValueError(f"无法识别的文件大小: {value}")
+    unit = match.group(2).upper().replace('I', '')
+    return int(float(match.group(1)) * _SIZE_UNITS[unit])
+
+
+def parse_time(value, end=False):
+    """
+    把日期或日期时间转换成时间戳，空值返回 None。
+    只有日期时，end=False 取当天 0 点，end=True 取次日 0 点（即包含当天整天）。
+
+    Raises:
+        ValueError: 无法识别的日期
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    if isinstance(value, datetime.date):
+        value = value.isoformat()
+    text = str(value).strip()
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            pass
+    for fmt in _DATE_FORMATS:
+        try:
+            day = datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if end:
+            day += datetime.timedelta(days=1)
+        return day.timestamp()
+    raise ValueError(f"无法识别的日期: {value}（格式为 YYYY-MM-DD 或 YYYY-MM-DD HH:MM）")
+
+
+class FileFilter:
+    """
+    一组文件元数据筛选条件，各条件之间为“且”的关系。
+    大小范围两端都包含；修改时间范围为 [min_mtime, max_mtime)。
+    """
+
+    __slots__ = ('extensions', 'min_size', 'max_size', 'min_mtime', 'max_mtime')
+
+    def __init__(self, extensions=(), min_size=None, max_size=None, min_mtime=None, max_mtime=None):
+        """
+        Args:
+            extensions (tuple[str]): 允许的扩展名（小写、带点），为空表示不限
+            min_size / max_size (int): 文件大小范围（字节）
+            min_mtime / max_mtime (float): 修改时间范围（时间戳）
+        """
+        self.extensions = tuple(extensions)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_mtime = min_mtime
+        self.max_mtime = max_mtime
+
+    @classmethod
+    def from_fields(cls, extensions=None, min_size=None, max_size=None, modified_from=None, modified_to=None):
+        """
+        由界面、命令行或名称列表中的文本创建筛选条件；没有任何条件时返回 None。
+
+        Raises:
+            ValueError: 文本无法识别，或范围的下限大于上限
+        """
+        file_filter = cls(parse_extensions(extensions), parse_size(min_size), parse_size(max_size),
+                          parse_time(modified_from), parse_time(modified_to, end=True))
+        if file_filter.min_size is not None and file_filter.max_size is not None \
+                and file_filter.min_size > file_filter.max_size:
+            raise ValueError("最小大小不能大于最大大小")
+        if file_filter.min_mtime is not None and file_filter.max_mtime is not None \
+                and file_filter.min_mtime >= file_filter.max_mtime:
+            raise ValueError("修改时间的起始日期不能晚于结束日期")
+        return file_filter if file_filter else None
+
+    def __bool__(self):
+        return bool(self.extensions) or self.needs_stat
+
+    def __eq__(self, other):
+        return isinstance(other, FileFilter) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"FileFilter({self.to_dict()})"
+
+    @property
+    def needs_stat(self):
+        """是否有需要读取文件元数据的条件。"""
+        return any(value is not None for value in (self.min_size, self.max_size, self.min_mtime, self.max_mtime))
+
+    def accepts_name(self, filename):
+        """只根据文件名检查扩展名。"""
+        return not self.extensions or filename.lower().endswith(self.extensions)
+
+    def accepts_stat(self, st):
+        """检查 os.stat_result 的大小和修改时间。"""
+        if self.min_size is not None and st.st_size < self.min_size:
+            return False
+        if self.max_size is not None and st.st_size > self.max_size:
+            return False
+        if self.min_mtime is not None and st.st_mtime < self.min_mtime:
+            return False
+        if self.max_mtime is not None and st.st_mtime >= self.max_mtime:
+            return False
+        return True
+
+    def accepts_entry(self, entry):
+        """检查 os.DirEntry：先比较扩展名，通过后才读取（DirEntry 缓存的）stat。"""
+        if not self.accepts_name(entry.name):
+            return False
+        if not self.needs_stat:
+            return True
+        try:
+            return self.accepts_stat(entry.stat())
+        except OSError:
+            return False
+
+    def combine(self, other):
+        """与另一组条件取交集；other 为 None 时返回自身。"""
+        if other is None:
+            return self
+        if self.extensions and other.extensions:
+            # 两组扩展名没有交集时，用不可能出现在文件名中的扩展名表示不接受任何文件
+            extensions = tuple(ext for ext in self.extensions if ext in other.extensions) or ('\0',)
+        else:
+            extensions = self.extensions or other.extensions
+        return FileFilter(extensions,
+                          _bound(max, self.min_size, other.min_size), _bound(min, self.max_size, other.max_size),
+                          _bound(max, self.min_mtime, other.min_mtime), _bound(min, self.max_mtime, other.max_mtime))
+
+    def to_dict(self):
+        """转换为可 JSON 序列化的字典（用于索引服务请求）。"""
+        return {'extensions': list(self.extensions), 'min_size': self.min_size, 'max_size': self.max_size,
+                'min_mtime': self.min_mtime, 'max_mtime': self.max_mtime}
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict 的逆操作。"""
+        return cls(tuple(data.get('extensions') or ()), data.get('min_size'), data.get('max_size'),
+                   data.get('min_mtime'), data.get('max_mtime'))
+
+
+def _bound(pick, a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return pick(a, b)
+
+
+def combine_filters(job_filter, name_filters, names):
+    """
+    每个名称实际生效的筛选条件：任务设置与该名称所在行的条件取交集。
+
+    Returns:
+        dict: {名称: FileFilter}，不含没有任何条件的名称
+    """
+    combined = {}
+    for name in names:
+        row_filter = name_filters.get(name) if name_filters else None
+        file_filter = job_filter.combine(row_filter) if job_filter else row_filter
+        if file_filter:
+            combined[name] = file_filter
+    return combined
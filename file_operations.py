@@ -3,20 +3,34 @@
 """
 该模块包含所有核心的文件操作逻辑，包括多进程的文件查找、
 多线程的文件复制以及生成 Excel 报告。
+
+本模块不依赖 PyQt5：进度和结果通过 SearchEvents 事件接口回调，
+图形界面（search_worker.py）和命令行（cli.py）分别对其进行适配。
 """
 import sys
 import os
+import csv
+import json
+import stat
+import time
 import shutil
 import traceback
-import re
 from pathlib import Path
+from contextlib import closing
+from collections import deque
 import concurrent.futures
-from PyQt5.QtCore import QObject, pyqtSignal
-from openpyxl import load_workbook, Workbook
-from openpyxl.styles import PatternFill
-from fuzzywuzzy import fuzz
-import pandas as pd
+# openpyxl / fuzzywuzzy 在真正需要时才导入，保证界面和扫描子进程启动迅速
 from utils import resource_path # 注意：需要确保 utils.py 中包含 resource_path 函数
+from log_sink import BatchedLogSink, new_log_path
+from scan_pool import ScanPool
+from scan_worker import merge_ranked, invalid_patterns
+from fs_backend import LocalFS
+from file_filters import FileFilter, LIST_COLUMNS, combine_filters
+from copy_scheduler import schedule_copies, stat_sources, LARGE_LANE_WORKERS
+from autotune import ConcurrencyTuner, MAX_COPY_WORKERS
+from copy_plan import build_plan, destinations, needed_bytes, free_space
+from run_metrics import (RunMetrics, metrics_path_for, profile_path_for, format_bytes,
+                         PHASE_READ_LIST, PHASE_INDEX_LOOKUP, PHASE_SCAN, PHASE_PLAN, PHASE_COPY, PHASE_REPORT)
 
 # ----------------------------------------------------------------------
 # 路径管理 - 在打包后也能够正确找到资源文件
@@ -31,279 +45,929 @@ from utils import resource_path # 注意：需要确保 utils.py 中包含 resou
 # 注意：setup_excel_files 函数已从本模块移除，
 #       因为它属于主进程的初始化任务。请在 main_app.py 中调用此函数。
 
+# 结果表的表头
+REPORT_COLUMNS = ['文件名', '状态']
+# 保留多个候选时，候选路径列的表头前缀（候选1、候选2……）
+CANDIDATE_COLUMN = '候选'
+
+# 支持的报告格式
+REPORT_FORMATS = ('xlsx', 'csv', 'json')
+
+# 实时推送结果行的批量大小和最长间隔（秒）
+ROW_BATCH_SIZE = 500
+ROW_BATCH_INTERVAL = 0.2
+
+
+def _report_status(result):
+    """
+    根据单个文件的处理结果，返回结果表中的状态文本和单元格底色。
+    result 为 None 表示该文件没有被处理。
+    """
+    if result is None:
+        return "❌ 未找到", 'FFFF00'
+    if result['status'] == 'success':
+        return "✅ 已找到", '00FF00'
+    if result['status'] == 'failed':
+        return "❌ 未找到或复制失败", 'FFC0CB'
+    return "", None
+
+
+def report_columns(top_k=1):
+    """结果表的表头：保留多个候选时，在状态列之后每个候选一列。"""
+    if top_k <= 1:
+        return list(REPORT_COLUMNS)
+    return REPORT_COLUMNS + [f"{CANDIDATE_COLUMN}{index}" for index in range(1, top_k + 1)]
+
 
-def _scan_root_process(root_dir, names_to_find_set, match_mode, min_fuzzy_score):
+def read_names(list_path):
     """
-    一个独立的、可被多进程调用的函数，用于在单个根目录中查找文件。
-    该函数只接受可被序列化的参数。
+    读取待查找的文件名列表。
+
+    .xlsx / .xlsm 读取活动工作表的第一列，.csv 读取第一列，二者都跳过表头行；
+    其他扩展名（如 .txt）按每行一个文件名读取。
+    """
+    return read_name_list(list_path)[0]
+
+
+def read_report(report_path):
+    """
+    读取之前生成的结果报告（.xlsx / .csv / .json，格式见 report_columns）。
+
+    Returns:
+        dict: {名称: (状态文本, [候选路径, ...])}；同一名称出现多次时以第一行为准
+    """
+    suffix = Path(report_path).suffix.lower()
+    if suffix == '.json':
+        with open(report_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        header = list(records[0].keys()) if records else []
+        rows = [[record.get(column) for column in header] for record in records]
+    else:
+        if suffix in ('.xlsx', '.xlsm'):
+            from openpyxl import load_workbook
+            wb = load_workbook(report_path, read_only=True)
+            try:
+                rows = [list(row) for row in wb.active.iter_rows(values_only=True)]
+            finally:
+                wb.close()
+        else:
+            with open(report_path, 'r', encoding='utf-8-sig', newline='') as f:
+                rows = list(csv.reader(f))
+        header, rows = (rows[0], rows[1:]) if rows else ([], [])
+
+    candidate_columns = [index for index, title in enumerate(header)
+                         if isinstance(title, str) and title.startswith(CANDIDATE_COLUMN)]
+    previous = {}
+    for row in rows:
+        if not row or row[0] is None or str(row[0]).strip() == '':
+            continue
+        name = str(row[0]).strip()
+        if name in previous:
+            continue
+        status = str(row[1]) if len(row) > 1 and row[1] is not None else ''
+        paths = [str(row[index]) for index in candidate_columns if index < len(row) and row[index]]
+        previous[name] = (status, paths)
+    return previous
+
+
+def read_name_list(list_path):
     """
-    found_files = {}
+    读取待查找的文件名列表，以及逐行给出的筛选条件。
 
-    if not os.path.exists(root_dir):
-        return found_files
+    .xlsx / .xlsm / .csv 中表头为 file_filters.LIST_COLUMNS 中列名的附加列
+    （扩展名、最小大小、最大大小、修改时间起、修改时间止）只对所在行的名称生效；
+    同一名称出现多次时以第一次出现的行为准。
 
-    # 预处理，提高查找效率
-    if match_mode == 'regex':
+    Returns:
+        tuple: ([名称, ...], {名称: file_filters.FileFilter})
+
+    Raises:
+        ValueError: 筛选条件无法识别
+    """
+    suffix = Path(list_path).suffix.lower()
+    if suffix in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+        wb = load_workbook(list_path, read_only=True)
         try:
-            # 预编译所有正则表达式
-            regex_patterns = {name: re.compile(name) for name in names_to_find_set}
-        except re.error:
-            # 如果正则表达式无效，返回空结果
-            return found_files
-
-    for dirpath, _, filenames in os.walk(root_dir):
-        current_dir_files_set = set(filenames)
-
-        if match_mode == 'exact':
-            for name_to_find in names_to_find_set:
-                if name_to_find not in found_files:
-                    for filename in current_dir_files_set:
-                        if name_to_find in filename:
-                            found_files[name_to_find] = str(Path(dirpath) / filename)
-                            break
-        elif match_mode == 'fuzzy':
-            for filename in current_dir_files_set:
-                for name_to_find in names_to_find_set:
-                    if name_to_find not in found_files and fuzz.ratio(name_to_find, filename) >= min_fuzzy_score:
-                        found_files[name_to_find] = str(Path(dirpath) / filename)
-                        break
-        elif match_mode == 'regex':
-            for filename in current_dir_files_set:
-                for name_to_find, pattern in regex_patterns.items():
-                    if name_to_find not in found_files and pattern.search(filename):
-                        found_files[name_to_find] = str(Path(dirpath) / filename)
-                        break
+            rows = list(wb.active.iter_rows(values_only=True))
+        finally:
+            wb.close()
+    elif suffix == '.csv':
+        with open(list_path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))
+    else:
+        with open(list_path, 'r', encoding='utf-8-sig') as f:
+            rows = [[line] for line in f.read().splitlines()]
+        return _names_and_filters(rows, {}, first_row=1)
+
+    header = rows[0] if rows else ()
+    filter_columns = {}
+    for index, title in enumerate(header[1:], 1):
+        field = LIST_COLUMNS.get(str(title).strip().lower()) if title is not None else None
+        if field:
+            filter_columns[index] = field
+    return _names_and_filters(rows[1:], filter_columns, first_row=2)
+
+
+def _names_and_filters(rows, filter_columns, first_row):
+    names, filters = [], {}
+    for row_number, row in enumerate(rows, first_row):
+        if not row or row[0] is None:
+            continue
+        name = str(row[0]).strip()
+        if not name:
+            continue
+        names.append(name)
+        if filter_columns and name not in filters:
+            fields = {field: row[index] for index, field in filter_columns.items()
+                      if index < len(row) and row[index] not in (None, '')}
+            try:
+                file_filter = FileFilter.from_fields(**fields) if fields else None
+            except ValueError as e:
+                raise ValueError(f"第 {row_number} 行的筛选条件有误: {e}") from None
+            if file_filter:
+                filters[name] = file_filter
+    return names, filters
+
+
+class SearchEvents:
+    """
+    搜索引擎的事件接口。默认实现什么也不做，调用方按需重写。
+    成功 / 失败日志不走事件接口，而是写入引擎的 log_sink。
+    """
+
+    def on_progress(self, current, total, message):
+        """进度更新。"""
 
-        # 如果已经找到所有文件，则提前退出
-        if len(found_files) == len(names_to_find_set):
-            break
+    def on_rows(self, rows):
+        """复制过程中分批产生的结果行 [[文件名, 状态], ...]。"""
 
-    return found_files
+    def on_report(self, rows):
+        """任务结束时按列表顺序整理好的完整结果行。"""
 
 
-class SearchWorker(QObject):
+class SearchEngine:
     """
-    一个在独立线程中执行搜索和复制任务的工作者类。
+    执行搜索和复制任务的核心引擎，不依赖任何界面库。
     """
-    finished = pyqtSignal()
-    success = pyqtSignal(str)
-    failed = pyqtSignal(str)
-    progress = pyqtSignal(int, int, str)
-
-    def __init__(self, excel_path, target_dir, roots, updated_excel_path, match_mode='exact', min_fuzzy_score=85):
-        """初始化工作者。"""
-        super().__init__()
+
+    def __init__(self, excel_path, target_dir, roots, updated_excel_path, match_mode='exact', min_fuzzy_score=85,
+                 events=None, scan_workers=None, copy_workers=None, report_format='xlsx', log_path=None,
+                 scan_pool=None, index=None, names=None, follow_links=False, metrics_path=None, profile=False,
+                 fs=None, top_k=1, copy_all=False, file_filter=None, name_filters=None, normalize=False,
+                 retry_from=None, autotune=None, plan_path=None, from_plan=None, space_check=True):
+        """
+        初始化引擎。
+
+        Args:
+            excel_path (str): 文件名列表（.xlsx / .csv / .txt）；提供了 names 或 from_plan 时可以为 None
+            target_dir (str): 复制目标文件夹；按计划复制时可以为 None（使用计划中的目标文件夹）
+            roots (list[str]): 查找根目录；按计划复制时可以为 None
+            updated_excel_path (str): 结果报告路径；为 None 时不写文件，只通过 on_report 回调结果
+            match_mode (str): 匹配模式 'exact' / 'fuzzy' / 'regex' / 'glob'
+            min_fuzzy_score (int): 模糊匹配的最低分数
+            events (SearchEvents): 事件接收者
+            scan_workers (int): 扫描进程数，默认为 CPU 核数
+            copy_workers (int): 复制线程数，默认为 CPU 核数的两倍
+            report_format (str): 报告格式，取值见 REPORT_FORMATS
+            log_path (str): 完整日志文件路径，默认按时间生成
+            scan_pool (ScanPool): 由应用程序长期持有的扫描进程池；为 None 时本次任务临时创建
+            index: 文件索引（index_service.FileIndex 或 IndexClient），先在索引中查找，
+                   只扫描索引没有覆盖的根目录；索引不可用时退回到直接扫描
+            names (list[str]): 直接给出的文件名列表，优先于 excel_path
+            follow_links (bool): 扫描时跟随指向目录的符号链接，每个物理目录只扫描一次
+            metrics_path (str): 运行摘要 JSON 的路径，默认与日志文件同名（.metrics.json）
+            profile (bool): 是否用 cProfile 记录任务线程，结果保存为与日志文件同名的 .prof
+            fs: 读取查找根目录使用的文件系统后端（fs_backend），默认为 LocalFS；
+                基准测试中可换成 LatencyFS 模拟网络共享
+            top_k (int): 每个名称保留的候选数；大于 1 时结果表每个候选增加一列（见 report_columns），
+                         扫描不会在每个名称找到第一个文件后提前结束
+            copy_all (bool): 把每个名称的全部候选复制到目标文件夹下以名称命名的子文件夹中；
+                             否则只复制排序最靠前的候选
+            file_filter (FileFilter): 对所有名称生效的元数据筛选条件（file_filters），扫描时用 DirEntry 检查，
+                                      被排除的文件不参与匹配
+            name_filters (dict): {名称: FileFilter}，只对该名称生效，在文件名匹配后检查；
+                                 从列表文件读取时由列表的附加列给出（见 read_name_list）
+            normalize (bool): 忽略 Unicode 形式（NFC / NFD）、全角 / 半角、大小写和多余空白的差异，
+                              名称和文件名都按 scan_worker.match_key 转换后比较
+            retry_from (str): 上一次的结果报告路径。其中状态为“已找到”的名称沿用原来的结果行，
+                              不再查找和复制，只查找其余名称；新报告仍按列表顺序包含全部名称
+            autotune (TuningStore): 自动调整并发数（autotune）。扫描和复制从上一次为同一组根目录和
+                                    目标文件夹记录的值开始，按吞吐量增减；此时 scan_workers / copy_workers
+                                    为上限（复制默认为 MAX_COPY_WORKERS），任务结束后记录调整结果
+            plan_path (str): 试运行：扫描后不复制，把复制计划（copy_plan.CopyPlan）保存到该路径，
+                             并报告总字节数、文件数、重名和目标卷的剩余空间；不写入报告，也不创建目标文件夹
+            from_plan (CopyPlan): 按之前保存的计划复制，不读取列表、不扫描；名称、候选、copy_all 和 top_k
+                                  均取自计划
+            space_check (bool): 复制前检查目标卷的剩余空间，不足时不复制任何文件
+        """
+        if from_plan is not None:
+            target_dir = target_dir or from_plan.target_dir
+            roots = roots or from_plan.settings.get('roots') or []
+            match_mode = from_plan.settings.get('match_mode', match_mode)
+            top_k = from_plan.settings.get('top_k', top_k)
+            copy_all = from_plan.settings.get('copy_all', copy_all)
         self.excel_path = excel_path
         self.target_dir = target_dir
         self.roots = roots
         self.updated_excel_path = updated_excel_path
         self.match_mode = match_mode
         self.min_fuzzy_score = min_fuzzy_score
+        self.events = events or SearchEvents()
+        self.scan_workers = scan_workers or os.cpu_count() or 4
+        self.copy_workers = copy_workers or (os.cpu_count() or 2) * 2
+        self.autotune = autotune
+        # 自动调整时复制线程数的上限
+        self.max_copy_workers = copy_workers or max(MAX_COPY_WORKERS, self.copy_workers)
+        # 本次任务的并发调整器，由扫描和复制阶段创建
+        self._scan_tuner = None
+        self._copy_tuner = None
+        self.report_format = report_format
+        self.scan_pool = scan_pool
+        self.index = index
+        self.names = names
+        self.follow_links = follow_links
+        self.fs = fs or LocalFS()
+        self.top_k = max(1, top_k)
+        self.copy_all = copy_all
+        self.file_filter = file_filter or None
+        self.name_filters = dict(name_filters or {})
+        self.normalize = normalize
+        self.retry_from = retry_from
+        self.plan_path = plan_path
+        self.from_plan = from_plan
+        self.space_check = space_check
+        # {名称: [候选路径, ...]}，从好到差排列，由 _find_files_in_roots 填写
+        self.candidates = {}
         self._is_stopped = False
-        self._executor = None
+        self._active_scan_pool = None
+        # 成功 / 失败日志写入汇集器，由调用方定时批量取走
+        self.log_sink = BatchedLogSink(log_path or new_log_path())
+        # 各阶段耗时和热点计数，任务结束时写入 metrics_path
+        self.metrics = RunMetrics()
+        self.metrics_path = metrics_path or metrics_path_for(self.log_sink.log_path)
+        self.profile_path = profile_path_for(self.log_sink.log_path) if profile else None
+        # 本次任务的统计结果，由 run 返回
+        # 试运行时 plan 为复制计划的统计（见 copy_plan.build_plan）
+        self.summary = {'total': 0, 'found': 0, 'copied': 0, 'failed': 0, 'stopped': False, 'error': False,
+                        'dirs_scanned': 0, 'duplicate_dirs': 0, 'carried': 0, 'plan': None}
 
     def stop(self):
         """停止当前任务。"""
         self._is_stopped = True
-        self.failed.emit("用户请求取消任务，正在停止...")
-        if self._executor:
-            self._executor.shutdown(wait=False, cancel_futures=True)
+        self.summary['stopped'] = True
+        self.log_sink.failed("用户请求取消任务，正在停止...")
+        if self._active_scan_pool:
+            self._active_scan_pool.cancel()
 
     def run(self):
-        """开始执行任务。"""
+        """
+        开始执行任务（阻塞直到结束）。
+
+        Returns:
+            dict: 本次任务的统计结果，见 self.summary
+        """
+        self.log_sink.open()
+        profiler = None
+        if self.profile_path:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
         try:
             self._work()
         except Exception:
             traceback.print_exc()
-            self.failed.emit("任务执行出错，请检查日志。")
+            self.summary['error'] = True
+            self.log_sink.failed("任务执行出错，请检查日志。")
         finally:
-            self.finished.emit()
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(self.profile_path)
+                self.log_sink.success(f"📈 cProfile 结果: {self.profile_path}")
+            self._save_tuning()
+            self._save_metrics()
+            self.log_sink.close()
+        return self.summary
+
+    def _save_metrics(self):
+        """把运行指标和任务统计写入 JSON 运行摘要。"""
+        try:
+            self.metrics.save(self.metrics_path, summary=self.summary, match_mode=self.match_mode,
+                              roots=list(self.roots))
+            self.log_sink.success(f"📊 运行摘要: {self.metrics_path}")
+        except OSError as e:
+            self.log_sink.failed(f"❌ 无法保存运行摘要: {e}")
+
+    def _new_tuner(self, name, default, maximum):
+        """
+        创建并发调整器：从上一次为本组根目录和目标文件夹记录的值开始，没有记录时从 default 开始慢启动。
+        """
+        try:
+            start = self.autotune.lookup(self.roots, self.target_dir).get(name)
+        except Exception:
+            start = None
+        return ConcurrencyTuner(start or default, maximum=maximum, slow_start=not start)
 
-    def _copy_single_file(self, name_to_find, src_path, target_dir):
-        """将单个文件或目录复制到目标文件夹。"""
+    def _save_tuning(self):
+        """记录本次测量到的最佳并发数，供下一次任务使用。"""
+        if self.autotune is None:
+            return
+        scan_best = self._scan_tuner.best if self._scan_tuner else None
+        copy_best = self._copy_tuner.best if self._copy_tuner else None
+        if scan_best is None and copy_best is None:
+            return
+        try:
+            self.autotune.remember(self.roots, self.target_dir, scan_workers=scan_best, copy_workers=copy_best)
+        except OSError as e:
+            self.log_sink.failed(f"⚠️ 无法保存并发调整结果: {e}")
+            return
+        if scan_best is not None:
+            self.metrics.add('scan_workers_tuned', scan_best)
+        if copy_best is not None:
+            self.metrics.add('copy_workers_tuned', copy_best)
+        self.log_sink.success(f"🎛️ 已记录并发调整结果: 扫描进程 {scan_best or '-'}，复制线程 {copy_best or '-'}")
+
+    def _copy_single_file(self, name_to_find, src_path, target_dir, dst_name=None, st=None):
+        """
+        将单个文件或目录复制到目标文件夹（dst_name 为目标名称，默认与源文件同名）。
+        st 为复制调度时已读取的源文件 stat 结果，提供时不再检查文件是否存在和类型。
+        """
         if self._is_stopped:
             return {'status': 'stopped', 'message': "任务已中断。", 'name': name_to_find}
 
-        if src_path and os.path.exists(src_path):
-            dst_name = os.path.basename(src_path)
+        if src_path and (st is not None or self.fs.exists(src_path)):
+            dst_name = dst_name or os.path.basename(src_path)
             dst = os.path.join(target_dir, dst_name)
             try:
-                if os.path.isfile(src_path):
-                    shutil.copy2(src_path, dst)
+                if stat.S_ISREG(st.st_mode) if st is not None else self.fs.isfile(src_path):
+                    self.metrics.add('bytes_copied', self.fs.copy_file(src_path, dst))
                 else:
                     if os.path.exists(dst):
                         shutil.rmtree(dst)
-                    shutil.copytree(src_path, dst)
+                    self.metrics.add('bytes_copied', self.fs.copy_tree(src_path, dst))
+                self.metrics.add('files_copied')
                 return {'status': 'success', 'message': f"✅ 已复制: {dst_name}", 'name': name_to_find}
             except Exception as e:
+                self.metrics.add('copy_errors')
                 return {'status': 'failed', 'message': f"❌ 复制失败 ({name_to_find}): {e}", 'name': name_to_find}
         else:
             return {'status': 'failed', 'message': f"❌ 未找到: {name_to_find}", 'name': name_to_find}
 
+    def _copy_candidates(self, name_to_find, src_paths, target_dir, stats=None):
+        """
+        把一个名称的全部候选复制到 target_dir 下以名称命名的子文件夹中（目标路径见 copy_plan.destinations）。
+        stats 为与 src_paths 对应的 stat 结果列表（见 _copy_single_file）。
+        """
+        if not src_paths:
+            return self._copy_single_file(name_to_find, None, target_dir)
+        dests = destinations(name_to_find, src_paths, copy_all=True)
+        os.makedirs(os.path.join(target_dir, os.path.dirname(dests[0])), exist_ok=True)
+        failures = []
+        for index, (src_path, dest) in enumerate(zip(src_paths, dests)):
+            result = self._copy_single_file(name_to_find, src_path, target_dir, dest,
+                                            stats[index] if stats else None)
+            if result['status'] == 'stopped':
+                return result
+            if result['status'] != 'success':
+                failures.append(result['message'])
+        if failures:
+            return {'status': 'failed', 'message': "\n".join(failures), 'name': name_to_find}
+        return {'status': 'success', 'message': f"✅ 已复制 {len(src_paths)} 个候选: {name_to_find}",
+                'name': name_to_find}
+
+    def _lookup_index(self, names_to_find_set):
+        """
+        先在文件索引中查找。
+
+        Returns:
+            tuple: ({名称: [(路径, 排序键), ...]}, 仍需直接扫描的根目录列表)
+        """
+        try:
+            found_files, uncovered_roots = self.index.lookup(
+                names_to_find_set, self.match_mode, self.min_fuzzy_score, self.roots, self.top_k,
+                filters=combine_filters(self.file_filter, self.name_filters, names_to_find_set),
+                normalize=self.normalize)
+        except Exception as e:
+            self.log_sink.failed(f"⚠️ 文件索引不可用，改为直接扫描: {e}")
+            return {}, self.roots
+
+        self.metrics.add('index_hits', len(found_files))
+        for name in found_files:
+            self.log_sink.success(f"🔍 找到文件: {name}")
+        self.log_sink.success(f"⚡ 索引命中 {len(found_files)} 个文件，"
+                              f"{len(uncovered_roots)} 个目录不在索引中，需要直接扫描。")
+        return found_files, uncovered_roots
+
+    def _settled_names(self, ranked, done_roots):
+        """
+        结果已成定局的名称：已有 top_k 个完美匹配，
+        且优先级不低于这些匹配所在根目录的根目录都已查找完毕。
+        """
+        done_prefix = 0
+        while done_prefix in done_roots:
+            done_prefix += 1
+        return {name for name, candidates in ranked.items()
+                if len(candidates) == self.top_k and all(key[0] == 0 and key[1] < done_prefix for key, _ in candidates)}
+
     def _find_files_in_roots(self, names_to_find_set):
-        """并行扫描多个根目录并汇总结果。"""
-        combined_found_files = {}
-        total_roots = len(self.roots)
+        """
+        并行扫描多个根目录，按 scan_worker 的“候选排序”合并结果：
+        每个名称保留排序最靠前的 top_k 个候选，与根目录完成的先后顺序和并行度无关。
+
+        Returns:
+            dict: {名称: 排序最靠前的候选路径}；全部候选保存在 self.candidates
+        """
+        # 无效的正则表达式只影响该名称，其他名称照常查找
+        invalid = invalid_patterns(names_to_find_set, self.match_mode)
+        for name, error in invalid.items():
+            self.log_sink.failed(f"❌ {name}: {error}")
+        names_to_find_set = names_to_find_set - invalid.keys()
+
+        # {名称: [(合并排序键, 路径), ...]}；done_roots 为已查找完毕的根目录在 self.roots 中的位置
+        ranked = {}
+        done_roots = set()
+        roots = self.roots
+        if self.index is not None and self.follow_links:
+            # 索引按 os.walk 的方式建立，不包含符号链接指向的目录
+            self.log_sink.failed("⚠️ 文件索引不跟随符号链接，本次直接扫描磁盘。")
+        elif self.index is not None:
+            with self.metrics.phase(PHASE_INDEX_LOOKUP):
+                index_found, roots = self._lookup_index(names_to_find_set)
+            merge_ranked(ranked, index_found, self.roots, self.top_k)
+            done_roots.update(index for index, root in enumerate(self.roots) if root not in roots)
+            # 索引覆盖的根目录以索引结果为准，只有未覆盖的根目录才需要扫描磁盘
+            if not roots or len(self._settled_names(ranked, done_roots)) == len(names_to_find_set):
+                self.events.on_progress(70, 100, "⚡ 已通过文件索引完成查找")
+                return self._best_candidates(ranked)
+
+        total_roots = len(roots)
         completed_roots = 0
 
-        with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
-            self._executor = executor
-            futures = {
-                executor.submit(_scan_root_process, root, names_to_find_set, self.match_mode, self.min_fuzzy_score): root
-                for root in self.roots
-            }
+        # 名称集合和匹配参数随任务只向每个扫描进程发送一次；索引中已有完美匹配的名称仍需扫描，
+        # 除非所有优先级更高的根目录都已被索引覆盖
+        scan_names = frozenset(names_to_find_set - self._settled_names(ranked, done_roots))
+        spec = {'names': scan_names,
+                'mode': self.match_mode,
+                'min_fuzzy_score': self.min_fuzzy_score, 'follow_links': self.follow_links, 'fs': self.fs,
+                'top_k': self.top_k, 'filter': self.file_filter, 'normalize': self.normalize,
+                'name_filters': {name: file_filter for name, file_filter in self.name_filters.items()
+                                 if name in scan_names}}
+        if self.follow_links:
+            unique = self._unique_roots(roots)
+            # 与其他根目录指向同一物理目录的根目录不再扫描，视为已完成
+            done_roots.update(index for index, root in enumerate(self.roots) if root in roots and root not in unique)
+            roots = unique
+        pool = self.scan_pool or ScanPool(self.scan_workers)
+        self._active_scan_pool = pool
+        if self.autotune is not None:
+            # 以根目录为单位调整同时扫描的数量
+            self._scan_tuner = self._new_tuner('scan_workers', pool.max_workers, pool.max_workers)
 
-            for future in concurrent.futures.as_completed(futures):
-                if self._is_stopped:
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    for name, path in result.items():
-                        if name not in combined_found_files:
-                            combined_found_files[name] = path
-                            self.success.emit(f"🔍 找到文件: {name}")
-                except Exception as e:
-                    root_dir = futures[future]
-                    self.failed.emit(f"❌ 扫描目录 {root_dir} 发生错误: {e}")
-
-                completed_roots += 1
-                search_progress_value = int((completed_roots / total_roots) * 70)
-                self.progress.emit(search_progress_value, 100, f"🔎 正在扫描: {completed_roots}/{total_roots} 个目录")
-
-                if len(combined_found_files) == len(names_to_find_set):
-                    self.success.emit("✅ 已找到所有文件，提前结束搜索。")
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
+        try:
+            with self.metrics.phase(PHASE_SCAN), closing(pool.scan(spec, roots, self._scan_tuner)) as results:
+                for root_dir, result, error, stats in results:
+                    if self._is_stopped:
+                        break
 
-        self._executor = None
-        return combined_found_files
+                    if error is None:
+                        if self._scan_tuner is not None and stats['wall'] > 0:
+                            # 根目录是在约 concurrent 个扫描同时进行时完成的，据此估算整体的条目数 / 秒
+                            concurrent = min(self._scan_tuner.limit, total_roots - completed_roots)
+                            self._scan_tuner.observe(concurrent * stats['entries'] / stats['wall'])
+                        self.summary['dirs_scanned'] += stats['dirs']
+                        self.summary['duplicate_dirs'] += stats['duplicates']
+                        self.metrics.merge_worker(stats)
+                        self.metrics.add('dirs_walked', stats['dirs'])
+                        if stats['pruned']:
+                            self.metrics.add('dirs_pruned', stats['pruned'])
+                        if stats['filtered']:
+                            self.metrics.add('files_filtered', stats['filtered'])
+                        self.metrics.add('entries_compared', stats['entries'])
+                        self.metrics.add(f'match_attempts.{self.match_mode}', stats['comparisons'])
+                        for name in merge_ranked(ranked, result, self.roots, self.top_k):
+                            self.log_sink.success(f"🔍 找到文件: {name}")
+                    else:
+                        self.log_sink.failed(f"❌ 扫描目录 {root_dir} 发生错误: {error}")
+                    done_roots.add(self.roots.index(root_dir))
+
+                    completed_roots += 1
+                    search_progress_value = int((completed_roots / total_roots) * 70)
+                    self.events.on_progress(search_progress_value, 100,
+                                            f"🔎 正在扫描: {completed_roots}/{total_roots} 个目录")
+
+                    if len(self._settled_names(ranked, done_roots)) == len(names_to_find_set):
+                        self.log_sink.success("✅ 所有文件都已有确定的完美匹配，提前结束搜索。")
+                        break
+        finally:
+            self._active_scan_pool = None
+            if pool is not self.scan_pool:
+                pool.shutdown()
+
+        if self.summary['duplicate_dirs']:
+            self.log_sink.success(f"🔗 已跳过 {self.summary['duplicate_dirs']} 个重复的物理目录（符号链接 / 绑定挂载）")
+        return self._best_candidates(ranked)
+
+    def _best_candidates(self, ranked):
+        """保存全部候选到 self.candidates，返回每个名称排序最靠前的候选。"""
+        self.candidates = {name: [path for _, path in candidates] for name, candidates in ranked.items()}
+        if self.top_k > 1:
+            self.metrics.add('candidates', sum(len(paths) for paths in self.candidates.values()))
+        return {name: paths[0] for name, paths in self.candidates.items()}
+
+    def _unique_roots(self, roots):
+        """去掉指向同一物理目录的重复根目录（按 st_dev / st_ino 判断）。"""
+        unique, seen = [], set()
+        for root in roots:
+            try:
+                st = self.fs.stat(root)
+                key = (st.st_dev, st.st_ino) if st.st_ino else os.path.realpath(root)
+            except OSError:
+                key = root
+            if key in seen:
+                self.summary['duplicate_dirs'] += 1
+                continue
+            seen.add(key)
+            unique.append(root)
+        return unique
 
     def _work(self):
-        """任务主流程：加载 Excel, 查找文件, 复制文件, 生成报告。"""
-        self.progress.emit(0, 100, "⚙️ 正在初始化...")
-        os.makedirs(self.target_dir, exist_ok=True)
+        """任务主流程：加载 Excel, 查找文件, 复制文件, 生成报告（试运行时改为保存复制计划）。"""
+        self.events.on_progress(0, 100, "⚙️ 正在初始化...")
+        if self.plan_path is None:
+            os.makedirs(self.target_dir, exist_ok=True)
+        if self.from_plan is not None:
+            loaded = self._load_plan()
+            if loaded is not None:
+                self._copy_and_report(*loaded)
+            return
 
         try:
             # 确保 excel_path 存在。
             # 这里是加载，而不是创建。
-            wb_original = load_workbook(self.excel_path)
-            ws_original = wb_original.active
-
-            names_to_find = [
-                str(row[0]).strip()
-                for row in ws_original.iter_rows(min_row=2, values_only=True)
-                if row and row[0] is not None
-            ]
-            names_to_find = [name for name in names_to_find if name]
+            with self.metrics.phase(PHASE_READ_LIST):
+                if self.names is not None:
+                    names_to_find = list(self.names)
+                else:
+                    names_to_find, self.name_filters = read_name_list(self.excel_path)
             names_to_find_set = set(names_to_find)
 
         except Exception as e:
-            self.failed.emit(f"❌ 无法读取 Excel 文件: {self.excel_path} - {e}")
+            self.summary['error'] = True
+            self.log_sink.failed(f"❌ 无法读取 Excel 文件: {self.excel_path} - {e}")
             return
 
         if not names_to_find_set:
-            self.progress.emit(100, 100, "⚠️ Excel 中未找到文件名。")
+            self.events.on_progress(100, 100, "⚠️ Excel 中未找到文件名。")
             return
 
-        self.success.emit(f"🔎 开始在 {len(self.roots)} 个目录中查找 {len(names_to_find)} 个文件...")
-        found_files = self._find_files_in_roots(names_to_find_set)
-        self.progress.emit(70, 100, "✅ 搜索阶段完成，准备复制文件...")
+        self.summary['total'] = len(names_to_find_set)
+        carried = self._carry_forward(names_to_find_set)
+        names_to_scan = [name for name in names_to_find if name not in carried]
+        if names_to_scan:
+            self.log_sink.success(f"🔎 开始在 {len(self.roots)} 个目录中查找 {len(names_to_scan)} 个文件...")
+            found_files = self._find_files_in_roots(names_to_find_set - carried.keys())
+        else:
+            found_files = {}
+        self.summary['found'] = len(found_files) + len(carried)
+        self.events.on_progress(70, 100, "✅ 搜索阶段完成，准备复制文件...")
 
         if self._is_stopped:
-            self.failed.emit("任务已中断。")
+            self.log_sink.failed("任务已中断。")
             return
 
-        copy_results = self._copy_files(names_to_find, found_files)
+        if self.plan_path is not None:
+            with self.metrics.phase(PHASE_PLAN):
+                self._save_plan(names_to_find, carried)
+            return
+        self._copy_and_report(names_to_find, carried, found_files)
+
+    def _load_plan(self):
+        """
+        按 from_plan 复制时，从计划中取出名称、沿用的名称和候选，代替读取列表和扫描。
+
+        计划中的源路径必须是绝对路径且至少有一个仍然存在，否则记录错误并返回 None，
+        不复制也不覆盖上一次的报告；部分源文件已不存在时只给出警告，这些名称在报告中记为复制失败。
+
+        Returns:
+            tuple: (名称列表, {沿用的名称: 候选路径}, {名称: 最佳候选路径})
+        """
+        plan = self.from_plan
+        sources = plan.sources()
+        relative = [path for path in sources if not os.path.isabs(path)]
+        if relative:
+            self.summary['error'] = True
+            self.log_sink.failed(f"❌ 复制计划中有 {len(relative)} 个相对路径（例如 {relative[0]}），"
+                                 f"无法确定源文件位置，请重新生成计划。")
+            return None
+        stats = stat_sources(sources, self.fs, self.copy_workers)
+        unresolved = [path for path in sources if stats[path] is None]
+        if sources and len(unresolved) == len(sources):
+            self.summary['error'] = True
+            self.log_sink.failed(f"❌ 复制计划中的源文件都不存在（例如 {unresolved[0]}），未复制任何文件。")
+            return None
+        if unresolved:
+            self.log_sink.failed(f"⚠️ 复制计划中有 {len(unresolved)} 个源文件已不存在（例如 {unresolved[0]}），"
+                                 f"对应的名称将记为复制失败。")
+        carried = {name: list(paths) for name, paths in plan.carried.items()}
+        self.candidates = {name: list(paths) for name, paths in plan.candidates.items()
+                           if paths and name not in carried}
+        found_files = {name: paths[0] for name, paths in self.candidates.items()}
+        self.summary.update(total=len(set(plan.names)), found=len(found_files) + len(carried), carried=len(carried))
+        self.log_sink.success(f"📋 按复制计划复制（{plan.settings.get('created', '')}），跳过扫描: "
+                              f"{len(found_files)} 个名称，目标 {self.target_dir}")
+        return list(plan.names), carried, found_files
+
+    def _save_plan(self, names_to_find, carried):
+        """试运行：生成并保存复制计划，推送结果行，但不复制、不写报告。"""
+        plan = build_plan(names_to_find, self.candidates, self.target_dir, self.fs, copy_all=self.copy_all,
+                          carried=carried, workers=self.copy_workers, roots=list(self.roots),
+                          match_mode=self.match_mode, top_k=self.top_k,
+                          list_path=os.path.abspath(self.excel_path) if self.excel_path else None)
+        self.summary['plan'] = plan.totals
+        self.metrics.add('bytes_planned', plan.totals['bytes'])
+        try:
+            plan.save(self.plan_path)
+        except OSError as e:
+            self.summary['error'] = True
+            self.log_sink.failed(f"❌ 无法保存复制计划: {e}")
+            return
+        for line in plan.summary_lines():
+            (self.log_sink.success if plan.fits else self.log_sink.failed)(f"📋 {line}")
+        if plan.collisions:
+            self.log_sink.failed(f"⚠️ {len(plan.collisions)} 个目标路径有重名，后复制的文件会覆盖先复制的文件")
+        self.log_sink.success(f"✅ 已保存复制计划：{self.plan_path}")
+
+        for name, paths in carried.items():
+            self.candidates[name] = paths[:self.top_k]
+        found = {'status': 'success', 'message': ''}
+        self.events.on_report([self._report_row(name, found if self.candidates.get(name) else None)
+                               for name in names_to_find])
+        self.events.on_progress(100, 100, "📋 复制计划已保存，未复制任何文件。")
+
+    def _copy_and_report(self, names_to_find, carried, found_files):
+        """复制找到的文件并生成报告。"""
+        names_to_find_set = set(names_to_find)
+        names_to_copy = [name for name in names_to_find if name not in carried]
+        with self.metrics.phase(PHASE_COPY):
+            copy_results = self._copy_files(names_to_copy, found_files)
+        if copy_results is None:
+            # 空间检查未通过，没有复制任何文件，保留上一次的报告
+            return
+        # 沿用的名称使用上一次报告中的候选
+        carried_results = []
+        for name, paths in carried.items():
+            self.candidates[name] = paths[:self.top_k]
+            carried_results.append({'status': 'success', 'name': name, 'message': ''})
+        if carried_results:
+            self.events.on_rows([self._report_row(res['name'], res) for res in carried_results])
+        copy_results.extend(carried_results)
+
+        results_map = {res['name']: res for res in copy_results}
+        self.summary['copied'] = sum(1 for res in results_map.values() if res['status'] == 'success')
+        self.summary['failed'] = len(names_to_find_set) - self.summary['copied']
 
-        if not self._is_stopped:
-            self._finalize_excel_report(self.updated_excel_path, names_to_find, copy_results)
-            self.progress.emit(100, 100, "任务完成。")
-            self.success.emit(f"✅ 已保存更新表：{Path(self.updated_excel_path).name}")
+        if self._is_stopped:
+            self.log_sink.failed("任务已中断。")
+        elif self.updated_excel_path is None:
+            self.events.on_report([self._report_row(name, results_map.get(name)) for name in names_to_find])
+            self.events.on_progress(100, 100, "任务完成。")
         else:
-            self.failed.emit("任务已中断。")
+            with self.metrics.phase(PHASE_REPORT):
+                self._finalize_report(self.updated_excel_path, names_to_find, copy_results)
+            self.events.on_progress(100, 100, "任务完成。")
+            self.log_sink.success(f"✅ 已保存更新表：{Path(self.updated_excel_path).name}")
+
+    def _carry_forward(self, names_to_find_set):
+        """
+        读取 retry_from 指定的上一次报告，返回其中已找到的名称。
+
+        Returns:
+            dict: {名称: 上一次报告中的候选路径列表}
+        """
+        if not self.retry_from:
+            return {}
+        if not os.path.exists(self.retry_from):
+            self.log_sink.failed(f"⚠️ 上一次的报告不存在，将查找全部名称: {self.retry_from}")
+            return {}
+        success_text = _report_status({'status': 'success'})[0]
+        try:
+            previous = read_report(self.retry_from)
+        except Exception as e:
+            self.log_sink.failed(f"⚠️ 无法读取上一次的报告，将查找全部名称: {e}")
+            return {}
+
+        carried = {name: paths for name, (status, paths) in previous.items()
+                   if name in names_to_find_set and status == success_text}
+        self.summary['carried'] = len(carried)
+        self.metrics.add('names_carried', len(carried))
+        self.log_sink.success(f"♻️ 沿用上一次已找到的 {len(carried)} 个名称，"
+                              f"只重新查找其余 {len(names_to_find_set) - len(carried)} 个。")
+        return carried
+
+    def _copy_batch(self, items):
+        """按顺序复制一批（来自同一目录的）文件，返回各名称的结果列表。"""
+        if self.copy_all:
+            return [self._copy_candidates(item.name, item.sources, self.target_dir, item.stats) for item in items]
+        return [self._copy_single_file(item.name, item.sources[0], self.target_dir, st=item.stats[0])
+                for item in items]
 
     def _copy_files(self, names_to_find, found_files):
-        """使用多线程复制文件。"""
+        """
+        使用多线程复制文件。复制顺序由 copy_scheduler 按源文件的设备、目录和 inode 安排：
+        小文件按目录分批交给复制线程，大文件在单独的线程池中复制，互不阻塞。
+        小文件通道同时进行的批次数不超过 copy_workers；自动调整时由 autotune 按字节数 / 秒增减。
+
+        Returns:
+            list: 各名称的结果；目标卷剩余空间不足（见 _has_space）时不复制任何文件，返回 None
+        """
         total_files_to_process = len(names_to_find)
         if total_files_to_process == 0:
-            self.success.emit("没有需要复制的文件。")
+            self.log_sink.success("没有需要复制的文件。")
             return []
 
         copied_count = 0
         copy_results = []
-        self.progress.emit(70, 100, "📁 正在并发复制文件...")
+        pending_rows = []
+        last_rows_emit = time.monotonic()
+        self.events.on_progress(70, 100, "📁 正在并发复制文件...")
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() * 2 or 4) as executor:
-            futures = [executor.submit(self._copy_single_file, name, found_files.get(name), self.target_dir)
-                       for name in names_to_find]
-
-            for future in concurrent.futures.as_completed(futures):
+        if self.copy_all:
+            units = [(name, self.candidates.get(name) or []) for name in names_to_find]
+        else:
+            units = [(name, [found_files[name]] if found_files.get(name) else []) for name in names_to_find]
+        lane_workers = self.copy_workers
+        if self.autotune is not None:
+            lane_workers = self.max_copy_workers
+            self._copy_tuner = self._new_tuner('copy_workers', self.copy_workers, lane_workers)
+        # 读取元数据只有往返延迟、不占带宽，自动调整时直接按上限并行
+        schedule = schedule_copies(units, self.fs, lane_workers)
+        if self.space_check and not self._has_space(schedule):
+            return None
+        self.metrics.add('copy_batches', len(schedule.batches))
+        if schedule.large:
+            self.metrics.add('copy_large_files', len(schedule.large))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=lane_workers) as executor, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=min(LARGE_LANE_WORKERS, lane_workers)) \
+                as large_executor:
+            # 大文件先提交，在自己的通道中与小文件批次同时开始；{future: 小文件批次}，其他任务为 None
+            futures = {large_executor.submit(self._copy_batch, [item]): None for item in schedule.large}
+            if schedule.missing:
+                futures[executor.submit(
+                    lambda: [self._copy_single_file(name, None, self.target_dir) for name in schedule.missing])] = None
+            batches = deque(schedule.batches)
+            batches_in_flight = 0
+
+            while futures or batches:
+                limit = self._copy_tuner.limit if self._copy_tuner else self.copy_workers
+                while batches and batches_in_flight < limit:
+                    batch = batches.popleft()
+                    futures[executor.submit(self._copy_batch, batch)] = batch
+                    batches_in_flight += 1
+                done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
                 if self._is_stopped:
                     executor.shutdown(wait=False, cancel_futures=True)
+                    large_executor.shutdown(wait=False, cancel_futures=True)
                     break
 
-                copied_count += 1
-                try:
-                    result = future.result()
-                    copy_results.append(result)
-                    if result['status'] == 'success':
-                        self.success.emit(result['message'])
-                    elif result['status'] == 'failed':
-                        self.failed.emit(result['message'])
-                except Exception as e:
-                    self.failed.emit(f"❌ 任务处理异常: {e}")
+                for future in done:
+                    batch = futures.pop(future)
+                    if batch is not None:
+                        batches_in_flight -= 1
+                        if self._copy_tuner is not None:
+                            self._copy_tuner.record(sum(item.size for item in batch))
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        self.log_sink.failed(f"❌ 任务处理异常: {e}")
+                        continue
+                    copied_count += len(results)
+                    for result in results:
+                        copy_results.append(result)
+                        pending_rows.append(self._report_row(result['name'], result))
+                        if result['status'] == 'success':
+                            self.log_sink.success(result['message'])
+                        elif result['status'] == 'failed':
+                            self.log_sink.failed(result['message'])
+
+                # 结果行和进度攒够一批或间隔足够长时再推送给界面
+                now = time.monotonic()
+                if len(pending_rows) >= ROW_BATCH_SIZE or now - last_rows_emit >= ROW_BATCH_INTERVAL:
+                    self._emit_copy_progress(copied_count, total_files_to_process)
+                    self.events.on_rows(pending_rows)
+                    pending_rows = []
+                    last_rows_emit = now
+
+        self._emit_copy_progress(copied_count, total_files_to_process)
+        if pending_rows:
+            self.events.on_rows(pending_rows)
+        return copy_results
 
-                copy_progress_value = 70 + int((copied_count / total_files_to_process) * 30)
-                self.progress.emit(copy_progress_value, 100, f"🚀 正在复制文件: {copied_count}/{total_files_to_process}")
+    def _has_space(self, schedule):
+        """
+        复制前检查目标卷的剩余空间，只使用复制调度时已读取的 stat 结果（目录的大小不计入）。
+        空间不足时记录错误并返回 False。
+        """
+        items = list(schedule.large) + [item for batch in schedule.batches for item in batch]
+        copies = [(dest, st) for item in items
+                  for dest, st in zip(destinations(item.name, item.sources, self.copy_all), item.stats)]
+        needed = needed_bytes(copies, self.target_dir)
+        free = free_space(self.target_dir)
+        if free is None or needed <= free:
+            return True
+        self.summary['error'] = True
+        self.log_sink.failed(f"❌ 目标磁盘空间不足：至少需要 {format_bytes(needed)}，剩余 {format_bytes(free)}，"
+                             f"未复制任何文件。")
+        self.events.on_progress(100, 100, "❌ 目标磁盘空间不足")
+        return False
+
+    def _emit_copy_progress(self, copied_count, total_files_to_process):
+        """推送复制阶段的进度。"""
+        copy_progress_value = 70 + int((copied_count / total_files_to_process) * 30)
+        self.events.on_progress(copy_progress_value, 100, f"🚀 正在复制文件: {copied_count}/{total_files_to_process}")
+
+    def _report_row(self, name, result):
+        """结果表中的一行：名称、状态，保留多个候选时再加上各候选的路径。"""
+        row = [name, _report_status(result)[0]]
+        if self.top_k > 1:
+            paths = self.candidates.get(name, [])
+            row.extend(paths + [''] * (self.top_k - len(paths)))
+        return row
+
+    def _finalize_report(self, report_path, names_to_find, copy_results):
+        """按 report_format 生成并保存最终报告。"""
+        if self.report_format == 'xlsx':
+            self._finalize_excel_report(report_path, names_to_find, copy_results)
+            return
 
-        return copy_results
+        results_map = {res['name']: res for res in copy_results}
+        report_rows = [self._report_row(name, results_map.get(name)) for name in names_to_find]
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+            with open(report_path, 'w', encoding='utf-8-sig' if self.report_format == 'csv' else 'utf-8',
+                      newline='') as f:
+                if self.report_format == 'csv':
+                    writer = csv.writer(f)
+                    writer.writerow(report_columns(self.top_k))
+                    writer.writerows(report_rows)
+                else:
+                    json.dump([dict(zip(report_columns(self.top_k), row)) for row in report_rows], f,
+                              ensure_ascii=False, indent=2)
+            self.events.on_report(report_rows)
+        except Exception as e:
+            self.summary['error'] = True
+            self.log_sink.failed(f"❌ 无法保存报告: {e}")
+            traceback.print_exc()
 
     def _finalize_excel_report(self, updated_excel_path, names_to_find, copy_results):
         """生成并保存最终的 Excel 报告。"""
+        from openpyxl import load_workbook, Workbook
+        from openpyxl.styles import PatternFill
         try:
             # 确保 updated_excel_path 的父目录存在
-            os.makedirs(os.path.dirname(updated_excel_path), exist_ok=True)
+            os.makedirs(os.path.dirname(os.path.abspath(updated_excel_path)), exist_ok=True)
             
             # 检查文件是否已存在，不存在则创建
             if not os.path.exists(updated_excel_path):
                 wb = Workbook()
-                ws = wb.active
-                ws.cell(row=1, column=1, value="文件名")
-                ws.cell(row=1, column=2, value="状态")
                 wb.save(updated_excel_path)
             
             wb = load_workbook(updated_excel_path)
             ws = wb.active
 
+            # 表头总是重写，保证与界面中的结果表一致
+            columns = report_columns(self.top_k)
+            for col_index, header in enumerate(columns, start=1):
+                ws.cell(row=1, column=col_index, value=header)
+
             results_map = {res['name']: res for res in copy_results}
+            report_rows = []
 
             # 写入或更新每一行数据
             for idx, name_to_find in enumerate(names_to_find):
                 row_index = idx + 2
-                result = results_map.get(name_to_find)
-
-                fill = None
-                status_text = ""
-                if result:
-                    status = result['status']
-                    if status == 'success':
-                        fill = PatternFill(fill_type='solid', start_color='00FF00', end_color='00FF00')
-                        status_text = "✅ 已找到"
-                    elif status == 'failed':
-                        fill = PatternFill(fill_type='solid', start_color='FFC0CB', end_color='FFC0CB')
-                        status_text = "❌ 未找到或复制失败"
-                else:
-                    fill = PatternFill(fill_type='solid', start_color='FFFF00', end_color='FFFF00')
-                    status_text = "❌ 未找到"
+                status_text, color = _report_status(results_map.get(name_to_find))
+                row = self._report_row(name_to_find, results_map.get(name_to_find))
+                report_rows.append(row)
 
                 ws.cell(row=row_index, column=1, value=name_to_find)
                 cell_status = ws.cell(row=row_index, column=2, value=status_text)
-                if fill:
-                    cell_status.fill = fill
+                if color:
+                    cell_status.fill = PatternFill(fill_type='solid', start_color=color, end_color=color)
+                for col_index, value in enumerate(row[2:], start=3):
+                    ws.cell(row=row_index, column=col_index, value=value)
+
+            # 删除上一次任务遗留的多余行
+            last_row = len(names_to_find) + 1
+            if ws.max_row > last_row:
+                ws.delete_rows(last_row + 1, ws.max_row - last_row)
+            # 上一次任务保留的候选数更多时，删除多余的候选列
+            if ws.max_column > len(columns):
+                ws.delete_cols(len(columns) + 1, ws.max_column - len(columns))
             
             wb.save(updated_excel_path)
+            self.events.on_report(report_rows)
         except Exception as e:
-            self.failed.emit(f"❌ 无法保存更新的 Excel 报告: {e}")
+            self.summary['error'] = True
+            self.log_sink.failed(f"❌ 无法保存更新的 Excel 报告: {e}")
             traceback.print_exc()
\ No newline at end of file
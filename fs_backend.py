@@ -0,0 +1,187 @@
+"""
+fs_backend.py
+
+扫描和复制使用的文件系统访问层。
+
+- LocalFS: 直接访问本地文件系统（默认）；
+- LatencyFS: 用本地目录模拟网络共享（SMB / NFS），每次 listdir / stat 调用注入固定延迟，
+  复制时按带宽上限限速，用于在普通机器上评估和调整高延迟存储下的并发策略。
+
+后端对象随扫描规格发送给扫描子进程，因此必须可以 pickle。
+"""
+import os
+import time
+import random
+import shutil
+import threading
+from collections import deque
+
+# 复制文件时每次读写的块大小
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class LocalFS:
+    """直接访问本地文件系统。"""
+
+    def scandir(self, path):
+        """返回目录中的条目列表（os.DirEntry）。"""
+        with os.scandir(path) as it:
+            return list(it)
+
+    def stat(self, path):
+        """os.stat。"""
+        return os.stat(path)
+
+    def exists(self, path):
+        """os.path.exists。"""
+        return os.path.exists(path)
+
+    def isfile(self, path):
+        """os.path.isfile。"""
+        return os.path.isfile(path)
+
+    def walk(self, top, accept=None):
+        """
+        按层（广度优先）遍历目录，产出 (目录路径, 子目录名列表, 文件名列表)。
+        与 os.walk 一样不进入指向目录的符号链接、跳过无法读取的目录；
+        不同的是目录深度单调不减，scan_worker.match_walk 依此判断完美匹配何时已成定局。
+        与 os.walk(topdown=True) 一样，调用方可以原地修改子目录名列表来跳过部分子目录。
+        accept(DirEntry) 为假的文件不出现在文件名列表中（见 file_filters.FileFilter.accepts_entry）。
+        """
+        queue = deque([top])
+        while queue:
+            dirpath = queue.popleft()
+            try:
+                entries = self.scandir(dirpath)
+            except OSError:
+                continue
+            dirnames, filenames, links = [], [], set()
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dirnames.append(entry.name)
+                    if entry.is_symlink():
+                        links.add(entry.name)
+                elif accept is None or accept(entry):
+                    filenames.append(entry.name)
+            yield dirpath, dirnames, filenames
+            queue.extend(os.path.join(dirpath, name) for name in dirnames if name not in links)
+
+    def copy_file(self, src, dst):
+        """复制单个文件（含元数据），返回复制的字节数。"""
+        shutil.copy2(src, dst)
+        return os.path.getsize(dst)
+
+    def copy_tree(self, src, dst):
+        """复制整个目录，返回复制的字节数。"""
+        copied = [0]
+
+        def copy_function(file_src, file_dst):
+            result = shutil.copy2(file_src, file_dst)
+            copied[0] += os.path.getsize(file_dst)
+            return result
+
+        shutil.copytree(src, dst, copy_function=copy_function)
+        return copied[0]
+
+
+class LatencyFS(LocalFS):
+    """
+    注入延迟和带宽上限的本地文件系统，模拟网络共享。
+
+    延迟使用 time.sleep，不占用 CPU 也不持有 GIL，
+    因此多个扫描进程 / 复制线程之间的并发效果与真实的网络存储相近。
+    带宽上限在同一进程内的所有复制线程之间共享（模拟一条共享链路）；
+    各扫描子进程分别计算。
+    """
+
+    def __init__(self, latency=0.005, bandwidth=None, jitter=0.0, seed=None):
+        """
+        Args:
+            latency (float): 每次元数据调用（listdir / stat / 打开文件）的延迟（秒）
+            bandwidth (float): 读取带宽上限（字节/秒），None 表示不限速
+            jitter (float): 延迟的随机抖动幅度（秒），实际延迟在 latency ± jitter 之间
+            seed (int): 抖动使用的随机种子
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.jitter = jitter
+        self.seed = seed
+        self._init_runtime()
+
+    def _init_runtime(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._link_free_at = 0.0
+
+    def __getstate__(self):
+        return {'latency': self.latency, 'bandwidth': self.bandwidth, 'jitter': self.jitter, 'seed': self.seed}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def _delay(self):
+        """模拟一次往返延迟。"""
+        delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay += self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _throttle(self, nbytes):
+        """按带宽上限为 nbytes 字节预约链路时间，并等待到预约结束。"""
+        if not self.bandwidth:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._link_free_at)
+            self._link_free_at = start + nbytes / self.bandwidth
+            wait = self._link_free_at - now
+        if wait > 0:
+            time.sleep(wait)
+
+    def scandir(self, path):
+        self._delay()
+        return super().scandir(path)
+
+    def stat(self, path):
+        self._delay()
+        return super().stat(path)
+
+    def exists(self, path):
+        self._delay()
+        return super().exists(path)
+
+    def isfile(self, path):
+        self._delay()
+        return super().isfile(path)
+
+    def copy_file(self, src, dst):
+        self._delay()
+        copied = 0
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            while True:
+                chunk = fsrc.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                self._throttle(len(chunk))
+                fdst.write(chunk)
+                copied += len(chunk)
+        shutil.copystat(src, dst)
+        return copied
+
+    def copy_tree(self, src, dst):
+        os.makedirs(dst)
+        copied = 0
+        for entry in self.scandir(src):
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir() and not entry.is_symlink():
+                copied += self.copy_tree(entry.path, target)
+            else:
+                copied += self.copy_file(entry.path, target)
+        return copied
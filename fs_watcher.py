@@ -0,0 +1,328 @@
+"""
+fs_watcher.py
+
+监视索引根目录的变化，把新建、删除、重命名增量应用到 index_service.FileIndex，
+索引保持最新而无需重新遍历整个目录树。
+
+- Linux 下通过 ctypes 直接使用 inotify（不依赖第三方库），每个目录一个 watch；
+- 其他平台、inotify 不可用或 watch 数量达到系统上限时，退回到轮询目录的修改时间。
+
+两种方式都只记录“哪些目录发生了变化”：短时间内的大量事件合并成一批，
+每个目录每批只重新读取一次，突发的大量事件不会让 CPU 占用失控。
+"""
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+
+# 最后一个事件之后等待多久（秒）再应用这一批变化
+DEBOUNCE = 0.2
+# 持续有事件时，一批变化最多积攒多久（秒）
+MAX_BATCH_DELAY = 2.0
+# 轮询模式的检查间隔（秒）
+POLL_INTERVAL = 5.0
+# 轮询模式占用一个 CPU 核心的比例上限
+POLL_MAX_DUTY = 0.2
+# 修改时间的精度余量（秒）：最近这么久内修改过的目录下一轮仍会重新读取，
+# 避免同一时间刻度内的第二次修改因修改时间不变而被漏掉
+MTIME_SLACK = 2.0
+
+# inotify 常量（见 <sys/inotify.h>）
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _changed_since(dirpaths, since):
+    """返回修改时间不早于 since - MTIME_SLACK 的目录（用于补上启动监视之前发生的变化）。"""
+    changed = set()
+    threshold = (since or 0) - MTIME_SLACK
+    for dirpath in dirpaths:
+        try:
+            if os.stat(dirpath).st_mtime >= threshold:
+                changed.add(dirpath)
+        except OSError:
+            changed.add(dirpath)
+    return changed
+
+
+class _BaseWatcher:
+    """监视器的公共部分：后台线程的启动与停止。"""
+
+    mode = None
+
+    def __init__(self, index):
+        """
+        Args:
+            index (FileIndex): 需要保持最新的索引
+        """
+        self.index = index
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """启动后台监视线程。"""
+        self._thread = threading.Thread(target=self._run, name=f'fs-watcher-{self.mode}', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止监视。"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def sync(self):
+        """索引被整体重建后调用，使监视范围与索引一致。"""
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class PollingWatcher(_BaseWatcher):
+    """
+    轮询目录修改时间的监视器。在目录中新建、删除、重命名条目都会更新该目录的修改时间，
+    因此只需 stat 每个目录，只有修改时间变化的目录才会重新读取。
+    """
+
+    mode = 'polling'
+
+    def __init__(self, index, interval=POLL_INTERVAL):
+        """
+        Args:
+            index (FileIndex): 需要保持最新的索引
+            interval (float): 检查间隔（秒）
+        """
+        super().__init__(index)
+        self.interval = interval
+
+    def _run(self):
+        mtimes = {}
+        # 首次见到的目录：修改时间晚于上一轮开始时间的才需要重新读取
+        since = self.index.updated_at or self.index.built_at or 0
+        wait = 0
+        while not self._stop_event.wait(wait):
+            started = time.monotonic()
+            now = time.time()
+            dirty = set()
+            for dirpath in self.index.directories():
+                try:
+                    mtime = os.stat(dirpath).st_mtime_ns
+                except OSError:
+                    mtime = None
+                if dirpath not in mtimes:
+                    mtimes[dirpath] = mtime
+                    if mtime is None or mtime / 1e9 >= since - MTIME_SLACK:
+                        dirty.add(dirpath)
+                elif mtime != mtimes[dirpath]:
+                    mtimes[dirpath] = mtime
+                    dirty.add(dirpath)
+                elif mtime is not None and now - mtime / 1e9 < MTIME_SLACK:
+                    dirty.add(dirpath)
+
+            if dirty:
+                _, removed = self.index.update_dirs(dirty)
+                for dirpath in removed:
+                    mtimes.pop(dirpath, None)
+            since = now
+
+            # 目录很多时按实际耗时拉长间隔，使占用的 CPU 比例不超过 POLL_MAX_DUTY
+            elapsed = time.monotonic() - started
+            wait = max(self.interval, elapsed * (1 / POLL_MAX_DUTY - 1))
+
+
+class _WatchLimitReached(Exception):
+    """inotify watch 数量达到系统上限（fs.inotify.max_user_watches）。"""
+
+
+class InotifyWatcher(_BaseWatcher):
+    """
+    基于 Linux inotify 的监视器，每个已索引目录一个 watch。
+    watch 数量达到系统上限时自动切换到 PollingWatcher。
+    """
+
+    mode = 'inotify'
+
+    def __init__(self, index):
+        """
+        Args:
+            index (FileIndex): 需要保持最新的索引
+
+        Raises:
+            OSError: 当前平台不支持 inotify，或无法为根目录建立监视
+        """
+        super().__init__(index)
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, "inotify 不可用")
+        self._get_errno = ctypes.get_errno
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(self._get_errno(), "inotify_init1 失败")
+        self._wd_paths = {}
+        self._path_wds = {}
+        self._resync = threading.Event()
+        self._fallback = None
+        try:
+            self._sync_watches()
+        except _WatchLimitReached:
+            self._close_fd()
+            raise OSError(errno.ENOSPC, "inotify watch 数量已达系统上限") from None
+
+    def sync(self):
+        """请求监视线程按当前索引重新建立 watch。"""
+        if self._fallback is not None:
+            self._fallback.sync()
+        self._resync.set()
+
+    def stop(self):
+        """停止监视并关闭 inotify 描述符。"""
+        super().stop()
+        if self._fallback is not None:
+            self._fallback.stop()
+        self._close_fd()
+
+    def _close_fd(self):
+        """关闭 inotify 描述符（只关闭一次，避免误关被复用的描述符号）。"""
+        fd, self._fd = self._fd, -1
+        if fd >= 0:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    # ---------------- watch 管理（只在监视线程和构造函数中调用） ----------------
+
+    def _add_watch(self, dirpath):
+        """为目录建立 watch；目录已消失或无权限时忽略。"""
+        if dirpath in self._path_wds:
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), WATCH_MASK)
+        if wd < 0:
+            error = self._get_errno()
+            if error == errno.ENOSPC:
+                raise _WatchLimitReached()
+            return
+        self._wd_paths[wd] = dirpath
+        self._path_wds[dirpath] = wd
+
+    def _remove_watch(self, dirpath):
+        """移除目录的 watch（目录已删除时内核会自动移除，这里只清理记录）。"""
+        wd = self._path_wds.pop(dirpath, None)
+        if wd is not None:
+            self._wd_paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _sync_watches(self):
+        """使 watch 集合与索引中的目录一致。"""
+        wanted = self.index.directories()
+        wanted_set = set(wanted)
+        for dirpath in [path for path in self._path_wds if path not in wanted_set]:
+            self._remove_watch(dirpath)
+        for dirpath in wanted:
+            self._add_watch(dirpath)
+
+    # ---------------- 事件处理 ----------------
+
+    def _read_events(self, dirty):
+        """读取当前所有待处理的事件，把受影响的目录加入 dirty。"""
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            if not data:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # 内核事件队列溢出，无法得知具体变化，检查所有最近修改过的目录
+                    dirty.update(_changed_since(self.index.directories(),
+                                                self.index.updated_at or self.index.built_at))
+                    continue
+                dirpath = self._wd_paths.get(wd)
+                if dirpath is None:
+                    continue
+                if mask & IN_IGNORED:
+                    self._wd_paths.pop(wd, None)
+                    self._path_wds.pop(dirpath, None)
+                elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    dirty.add(dirpath)
+                    dirty.add(os.path.dirname(dirpath))
+                else:
+                    dirty.add(dirpath)
+
+    def _apply(self, dirty):
+        """把一批变化应用到索引，并为新目录建立 watch。"""
+        added, removed = self.index.update_dirs(dirty)
+        while added or removed:
+            for dirpath in removed:
+                self._remove_watch(dirpath)
+            for dirpath in added:
+                self._add_watch(dirpath)
+            # 新目录在建立 watch 之前可能已有变化，建立之后再读取一次
+            added, removed = self.index.update_dirs(added) if added else ([], [])
+
+    def _run(self):
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        try:
+            dirty = _changed_since(self.index.directories(), self.index.built_at)
+            batch_started = time.monotonic() if dirty else None
+            while not self._stop_event.is_set():
+                timeout = DEBOUNCE if dirty else 0.5
+                if poller.poll(timeout * 1000):
+                    self._read_events(dirty)
+                    if batch_started is None:
+                        batch_started = time.monotonic()
+                    if time.monotonic() - batch_started < MAX_BATCH_DELAY:
+                        continue
+                if self._resync.is_set():
+                    self._resync.clear()
+                    self._sync_watches()
+                if dirty:
+                    self._apply(dirty)
+                    dirty = set()
+                    batch_started = None
+        except _WatchLimitReached:
+            print("⚠️ inotify watch 数量已达系统上限，改为轮询目录修改时间", file=sys.stderr)
+            # 不再读取 inotify 事件，释放描述符和已建立的全部 watch
+            self._close_fd()
+            self._fallback = PollingWatcher(self.index)
+            self._fallback.start()
+        except OSError:
+            # 描述符在 stop 中被关闭
+            if not self._stop_event.is_set():
+                raise
+
+
+def create_watcher(index, poll_interval=POLL_INTERVAL):
+    """
+    为索引创建合适的监视器：优先使用 inotify，不可用时退回轮询。
+
+    Args:
+        index (FileIndex): 需要保持最新的索引（应已完成首次构建）
+        poll_interval (float): 轮询模式的检查间隔（秒）
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(index)
+        except OSError as e:
+            print(f"⚠️ 无法使用 inotify（{e}），改为轮询目录修改时间", file=sys.stderr)
+    return PollingWatcher(index, poll_interval)
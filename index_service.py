@@ -0,0 +1,547 @@
+"""
+index_service.py
+
+本地文件索引服务（可选的后台守护模式）。
+
+服务在内存中维护已配置根目录的文件索引，通过 fs_watcher 监视目录变化增量更新（也可定期整体重建），
+通过仅监听 localhost 的 HTTP 接口批量回答“某个文件在哪里”并执行复制任务。
+图形界面和命令行可以通过 IndexClient 把查找交给服务，而不必自己扫描磁盘。
+
+接口（均为 JSON）:
+    GET  /status   索引状态
+    POST /lookup   {"names": [...], "mode": "exact", "min_fuzzy_score": 85, "roots": [...], "top_k": 1,
+                    "filters": {名称: 筛选条件}, "normalize": false}
+                   -> {"found": {名称: [[路径, 排序键], ...]}, "uncovered": [未被索引覆盖的根目录]}
+    POST /copy     {"names": [...], "target": "...", "mode": ..., "roots": [...], "top_k": 1, "copy_all": false,
+                    "filter": 对所有名称生效的筛选条件, "normalize": false}
+                   -> {"summary": {...}, "rows": [[名称, 状态], ...]}
+    POST /refresh  立即整体重建索引
+
+POST 请求必须使用 Content-Type: application/json，并在 X-Index-Token 头中携带共享令牌：
+服务启动时生成随机令牌，写入设置文件（settings.json）所在目录的 index_service.token，
+IndexClient 从同一位置读取，因此只有能读取该文件的本机用户才能调用服务。
+/copy 的目标文件夹必须位于服务启动时允许的目录（--allow-target）之内。
+
+筛选条件的格式见 file_filters.FileFilter.to_dict。
+"""
+import os
+import sys
+import hmac
+import json
+import time
+import secrets
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from scan_worker import CompiledSpec, match_walk, candidate_rank, merge_ranked
+from file_filters import FileFilter
+from path_store import PathStore
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# 不监视目录变化时，默认的整体重建间隔（秒）
+DEFAULT_REFRESH_INTERVAL = 300
+# 共享令牌的文件名（位于设置文件所在目录）和请求头
+TOKEN_FILE = 'index_service.token'
+TOKEN_HEADER = 'X-Index-Token'
+
+
+def token_path_for(settings_path='settings.json'):
+    """与设置文件位于同一目录的共享令牌文件路径。"""
+    return os.path.join(os.path.dirname(os.path.abspath(settings_path)), TOKEN_FILE)
+
+
+def write_token(path):
+    """生成新的随机令牌并写入 path（仅所有者可读写），返回令牌。"""
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token)
+    return token
+
+
+def read_token(path):
+    """读取共享令牌，文件不存在或无法读取时为 None。"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _is_under(path, root):
+    """判断 path 是否位于 root 之内（按路径分隔符边界比较）。"""
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def _accepts(file_filter, path):
+    """按筛选条件检查索引中的一个文件；没有条件时总是接受。"""
+    if file_filter is None:
+        return True
+    if not file_filter.accepts_name(os.path.basename(path)):
+        return False
+    if not file_filter.needs_stat:
+        return True
+    try:
+        return file_filter.accepts_stat(os.stat(path))
+    except OSError:
+        return False
+
+
+def _mtime(path):
+    """文件的修改时间，无法读取时为 0。"""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def _list_dir(dirpath):
+    """
+    读取单个目录，分类方式与 os.walk 一致（指向目录的符号链接既不算文件也不进入）。
+
+    Returns:
+        tuple: (文件名元组, 子目录名元组)；目录已不存在时返回 None
+    """
+    filenames, subdirs = [], []
+    try:
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    filenames.append(entry.name)
+                elif not entry.is_symlink():
+                    subdirs.append(entry.name)
+    except FileNotFoundError:
+        return None
+    except OSError:
+        # 无权限等错误与 os.walk 一样按空目录处理
+        pass
+    return tuple(filenames), tuple(subdirs)
+
+
+class FileIndex:
+    """
+    已配置根目录的内存文件索引。
+
+    lookup 与磁盘扫描使用同一套匹配逻辑（scan_worker.match_walk），
+    精确匹配时文件名完全相同的条目通过字典直接命中。
+    refresh 整体重建索引；update_dirs 只重新读取发生变化的目录，供 fs_watcher 增量更新。
+    """
+
+    def __init__(self, roots):
+        """
+        Args:
+            roots (list[str]): 需要索引的根目录
+        """
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.built_at = None      # 最近一次整体重建开始的时间戳，尚未构建时为 None
+        self.updated_at = None    # 最近一次增量更新的时间戳
+        self._store = PathStore()
+        # _lock 保护 _store，查询只短暂持有；_update_lock 让重建和增量更新依次进行
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+
+    def __getstate__(self):
+        """pickle 时只保存根目录、时间戳和紧凑的路径存储，不保存锁。"""
+        with self._lock:
+            return {'roots': self.roots, 'built_at': self.built_at, 'updated_at': self.updated_at,
+                    'store': self._store}
+
+    def __setstate__(self, state):
+        FileIndex.__init__(self, state['roots'])
+        self.built_at, self.updated_at, self._store = state['built_at'], state['updated_at'], state['store']
+
+    def _remove_tree(self, dirpath):
+        """从索引中移除目录及其全部子目录（调用方持有 _lock），返回被移除的目录列表。"""
+        removed = []
+        stack = [dirpath]
+        while stack:
+            current = stack.pop()
+            entry = self._store.remove_dir(current)
+            if entry is None:
+                continue
+            removed.append(current)
+            stack.extend(os.path.join(current, name) for name in entry[1])
+        return removed
+
+    # ---------------- 构建与更新 ----------------
+
+    def refresh(self):
+        """重新遍历所有根目录，构建完成后整体替换旧索引（查询不受影响）。"""
+        with self._update_lock:
+            started = time.time()
+            fresh = PathStore()
+            for root in self.roots:
+                stack = [root]
+                while stack:
+                    dirpath = stack.pop()
+                    listing = _list_dir(dirpath)
+                    if listing is None:
+                        continue
+                    fresh.set_dir(dirpath, *listing)
+                    # 逆序入栈，保持与 os.walk 相同的自顶向下顺序
+                    stack.extend(os.path.join(dirpath, name) for name in reversed(listing[1]))
+            with self._lock:
+                self._store = fresh
+                self.built_at = started
+
+    def update_dirs(self, dirpaths):
+        """
+        重新读取一批发生变化的目录并增量更新索引。
+
+        新出现的子目录会继续向下读取，消失的子目录连同其下所有内容一起移除；
+        目录读取在锁外进行，查询不会被长时间阻塞。
+
+        Args:
+            dirpaths (iterable[str]): 内容发生变化的目录
+
+        Returns:
+            tuple: (新加入索引的目录列表, 从索引中移除的目录列表)
+        """
+        added, removed = [], []
+        with self._update_lock:
+            pending = list(dirpaths)
+            while pending:
+                listings = [(dirpath, _list_dir(dirpath)) for dirpath in pending]
+                pending = []
+                with self._lock:
+                    for dirpath, listing in listings:
+                        if listing is None:
+                            removed.extend(self._remove_tree(dirpath))
+                            continue
+                        old = self._store.get(dirpath)
+                        if old is None:
+                            # 只接受根目录本身或已索引目录的子目录
+                            if dirpath not in self.roots and os.path.dirname(dirpath) not in self._store:
+                                continue
+                            added.append(dirpath)
+                        filenames, subdirs = listing
+                        for name in set(old[1] if old else ()) - set(subdirs):
+                            removed.extend(self._remove_tree(os.path.join(dirpath, name)))
+                        self._store.set_dir(dirpath, filenames, subdirs)
+                        pending.extend(path for path in (os.path.join(dirpath, name) for name in subdirs)
+                                       if path not in self._store)
+            self.updated_at = time.time()
+        return added, removed
+
+    # ---------------- 查询 ----------------
+
+    def directories(self):
+        """返回当前已索引的全部目录。"""
+        with self._lock:
+            return self._store.dirs()
+
+    def covers(self, root):
+        """索引是否覆盖了该目录。"""
+        root = os.path.abspath(root)
+        return any(_is_under(root, indexed) for indexed in self.roots)
+
+    def status(self):
+        """返回索引状态。"""
+        with self._lock:
+            return {'roots': self.roots, 'directories': len(self._store), 'entries': self._store.entry_count,
+                    'built_at': self.built_at, 'updated_at': self.updated_at}
+
+    def lookup(self, names, mode='exact', min_fuzzy_score=85, roots=None, top_k=1, filters=None, normalize=False):
+        """
+        在索引中查找一批名称。
+
+        Args:
+            names (iterable[str]): 待查找的名称
+            mode (str): 匹配模式
+            min_fuzzy_score (int): 模糊匹配阈值
+            roots (list[str]): 限定查找范围的根目录，默认为全部已索引目录
+            top_k (int): 每个名称返回的候选数
+            filters (dict): {名称: file_filters.FileFilter}，索引不保存文件元数据，
+                            只在文件名匹配后检查这些条件
+            normalize (bool): 是否按 scan_worker.match_key 规范化后比较
+
+        Returns:
+            tuple: ({名称: [(路径, 排序键), ...]}, [未被索引覆盖、需要调用方自行扫描的根目录])；
+                   每个名称取 roots 中排序最靠前的 top_k 个候选，规则与直接扫描相同（见 scan_worker 的“候选排序”）
+        """
+        requested = [os.path.abspath(root) for root in (roots or self.roots)]
+        covered = [root for root in requested if self.covers(root)]
+        uncovered = [root for root in (roots or self.roots) if not self.covers(root)]
+        if not covered:
+            return {}, uncovered
+
+        merged = {}
+        remaining = set(names)
+        filters = filters or {}
+        if mode == 'exact' and not normalize:
+            # 文件名完全相同是唯一的完美匹配（质量 0），直接通过字典命中；
+            # 凑满 top_k 个的名称不可能再被其他候选超过。锁内只取出路径，读取元数据在锁外进行
+            with self._lock:
+                named = {name: list(self._store.paths_named(name)) for name in remaining}
+            for name, paths in named.items():
+                hits = [(path, candidate_rank(0, path, _mtime(path))) for path in paths
+                        if any(_is_under(path, root) for root in covered) and _accepts(filters.get(name), path)]
+                if hits:
+                    merge_ranked(merged, {name: hits}, requested, top_k)
+                if len(hits) >= top_k:
+                    remaining.discard(name)
+        if remaining:
+            # 目录内容以元组保存、只会被整体替换，复制一份引用即可在锁外匹配
+            with self._lock:
+                listings = [self._store.listing(lambda dirpath, root=root: _is_under(dirpath, root))
+                            for root in covered]
+            compiled = CompiledSpec({'names': frozenset(remaining), 'mode': mode, 'min_fuzzy_score': min_fuzzy_score,
+                                     'top_k': top_k, 'name_filters': filters, 'normalize': normalize})
+            for root, listing in zip(covered, listings):
+                merge_ranked(merged, match_walk(listing, compiled, root_dir=root), requested, top_k)
+        return {name: [(path, key[:1] + key[2:]) for key, path in candidates]
+                for name, candidates in merged.items()}, uncovered
+
+
+class IndexClient:
+    """
+    索引服务的 HTTP 客户端，lookup 接口与 FileIndex 相同，
+    因此可以直接作为 SearchEngine 的 index 参数使用。
+    """
+
+    def __init__(self, url, timeout=30, token_path=None):
+        """
+        Args:
+            url (str): 服务地址，例如 http://127.0.0.1:8765
+            timeout (float): 请求超时（秒）
+            token_path (str): 共享令牌文件，默认为当前目录下 settings.json 旁的 index_service.token
+        """
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.token_path = token_path or token_path_for()
+
+    def _request(self, path, payload=None):
+        """发送请求并解析 JSON 响应；连接失败时抛出 OSError。"""
+        data = None if payload is None else json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        # 服务每次启动都会生成新令牌，每次请求时重新读取
+        token = read_token(self.token_path)
+        if token:
+            headers[TOKEN_HEADER] = token
+        request = urllib.request.Request(self.url + path, data=data, headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def status(self):
+        """查询服务状态。"""
+        return self._request('/status')
+
+    def lookup(self, names, mode='exact', min_fuzzy_score=85, roots=None, top_k=1, filters=None, normalize=False):
+        """通过服务查找一批名称，返回值与 FileIndex.lookup 相同。"""
+        result = self._request('/lookup', {'names': sorted(names), 'mode': mode,
+                                           'min_fuzzy_score': min_fuzzy_score, 'roots': roots, 'top_k': top_k,
+                                           'filters': {name: file_filter.to_dict()
+                                                       for name, file_filter in (filters or {}).items()},
+                                           'normalize': normalize})
+        if 'error' in result:
+            raise ValueError(result['error'])
+        # JSON 中的排序键是列表，转换回元组以便与扫描结果比较
+        return {name: [(path, tuple(rank)) for path, rank in candidates]
+                for name, candidates in result['found'].items()}, result['uncovered']
+
+    def copy(self, names, target, mode='exact', min_fuzzy_score=85, roots=None, top_k=1, copy_all=False,
+             file_filter=None, normalize=False):
+        """让服务查找并复制一批文件。"""
+        return self._request('/copy', {'names': list(names), 'target': target, 'mode': mode,
+                                       'min_fuzzy_score': min_fuzzy_score, 'roots': roots,
+                                       'top_k': top_k, 'copy_all': copy_all,
+                                       'filter': file_filter.to_dict() if file_filter else None,
+                                       'normalize': normalize})
+
+
+class _RowCollector:
+    """收集 /copy 任务的完整结果行。"""
+
+    def __init__(self):
+        self.rows = []
+
+    def on_progress(self, current, total, message):
+        """服务端不需要进度。"""
+
+    def on_rows(self, rows):
+        """只使用最终结果。"""
+
+    def on_report(self, rows):
+        """保存完整结果行。"""
+        self.rows = rows
+
+
+class IndexService:
+    """
+    索引守护服务：持有 FileIndex，监视目录变化保持索引最新，并通过 HTTP 对外提供查询与复制。
+    """
+
+    def __init__(self, roots, host=DEFAULT_HOST, port=DEFAULT_PORT, refresh_interval=None, watch=True,
+                 token_path=None, allowed_targets=()):
+        """
+        Args:
+            roots (list[str]): 需要索引的根目录
+            host (str): 监听地址，默认只监听本机
+            port (int): 监听端口
+            refresh_interval (float): 整体重建索引的间隔（秒），0 表示不自动重建；
+                                      默认监视目录变化时不重建，否则为 DEFAULT_REFRESH_INTERVAL
+            watch (bool): 是否监视目录变化并增量更新索引
+            token_path (str): 写入共享令牌的文件，默认为当前目录下 settings.json 旁的 index_service.token
+            allowed_targets (list[str]): /copy 允许的目标目录（含子目录）；为空时拒绝所有 /copy 请求
+
+        Raises:
+            OSError: 无法写入令牌文件或监听端口
+        """
+        self.index = FileIndex(roots)
+        self.token_path = token_path or token_path_for()
+        self.token = write_token(self.token_path)
+        self.allowed_targets = [os.path.realpath(path) for path in allowed_targets]
+        self.watch = watch
+        self.watcher = None
+        if refresh_interval is None:
+            refresh_interval = 0 if watch else DEFAULT_REFRESH_INTERVAL
+        self.refresh_interval = refresh_interval
+        self._stop_event = threading.Event()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def address(self):
+        """实际监听的 (地址, 端口)。"""
+        return self._server.server_address
+
+    def _refresh_loop(self):
+        """后台刷新线程。"""
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ 刷新索引失败: {e}", file=sys.stderr)
+
+    def refresh(self):
+        """整体重建索引，并让监视器与新索引同步。"""
+        self.index.refresh()
+        if self.watcher is not None:
+            self.watcher.sync()
+
+    def status(self):
+        """返回索引和监视器的状态。"""
+        status = self.index.status()
+        status['watcher'] = self.watcher.mode if self.watcher is not None else None
+        return status
+
+    def serve_forever(self):
+        """构建索引并开始服务，直到 shutdown 被调用。"""
+        self.index.refresh()
+        if self.watch:
+            # 延迟导入：不监视目录时无需加载 ctypes 等模块
+            from fs_watcher import create_watcher
+            self.watcher = create_watcher(self.index)
+            self.watcher.start()
+        if self.refresh_interval:
+            threading.Thread(target=self._refresh_loop, daemon=True).start()
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """停止服务。"""
+        self._stop_event.set()
+        if self.watcher is not None:
+            self.watcher.stop()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def target_allowed(self, target):
+        """目标文件夹是否位于允许的目录之内（按真实路径比较，符号链接不能绕过）。"""
+        if not isinstance(target, str) or not target:
+            return False
+        target = os.path.realpath(target)
+        return any(_is_under(target, allowed) for allowed in self.allowed_targets)
+
+    def copy(self, payload):
+        """
+        执行 /copy 请求：用索引查找后复制到目标文件夹。
+
+        Raises:
+            PermissionError: 目标文件夹不在允许的目录之内
+        """
+        if not self.target_allowed(payload.get('target')):
+            raise PermissionError(f"目标文件夹不在允许的目录之内: {payload.get('target')}")
+        # 延迟导入，避免只做查询的服务加载复制和报告相关的模块
+        from file_operations import SearchEngine
+
+        collector = _RowCollector()
+        engine = SearchEngine(
+            excel_path=None,
+            names=payload['names'],
+            target_dir=payload['target'],
+            roots=payload.get('roots') or self.index.roots,
+            updated_excel_path=None,
+            match_mode=payload.get('mode', 'exact'),
+            min_fuzzy_score=payload.get('min_fuzzy_score', 85),
+            top_k=payload.get('top_k', 1),
+            copy_all=payload.get('copy_all', False),
+            file_filter=FileFilter.from_dict(payload['filter']) if payload.get('filter') else None,
+            normalize=payload.get('normalize', False),
+            events=collector,
+            index=self.index,
+        )
+        summary = engine.run()
+        batches, _ = engine.log_sink.drain()
+        return {'summary': summary, 'rows': collector.rows, 'log': batches}
+
+    def _handler_class(self):
+        """创建绑定到本服务的请求处理类。"""
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """HTTP 请求处理。"""
+
+            def _send(self, status, body):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == '/status':
+                    self._send(200, service.status())
+                else:
+                    self._send(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.headers.get_content_type() != 'application/json':
+                    self._send(415, {'error': 'Content-Type must be application/json'})
+                    return
+                if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, '').encode('utf-8'),
+                                           service.token.encode('utf-8')):
+                    self._send(403, {'error': 'invalid token'})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    payload = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+                    if self.path == '/lookup':
+                        found, uncovered = service.index.lookup(
+                            payload.get('names', []), payload.get('mode', 'exact'),
+                            payload.get('min_fuzzy_score', 85), payload.get('roots'), payload.get('top_k', 1),
+                            {name: FileFilter.from_dict(data) for name, data in (payload.get('filters') or {}).items()},
+                            payload.get('normalize', False))
+                        self._send(200, {'found': found, 'uncovered': uncovered,
+                                         'built_at': service.index.built_at})
+                    elif self.path == '/copy':
+                        self._send(200, service.copy(payload))
+                    elif self.path == '/refresh':
+                        service.refresh()
+                        self._send(200, service.status())
+                    else:
+                        self._send(404, {'error': 'not found'})
+                except PermissionError as e:
+                    self._send(403, {'error': str(e)})
+                except Exception as e:
+                    self._send(400, {'error': f"{type(e).__name__}: {e}"})
+
+            def log_message(self, format, *args):
+                """不在终端输出每条访问日志。"""
+
+        return Handler
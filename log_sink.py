@@ -0,0 +1,107 @@
+"""
+log_sink.py
+
+该模块提供任务日志的缓冲与落盘功能：工作线程只把日志写入内存缓冲区和磁盘文件，
+界面按固定间隔批量取走并显示，避免逐条发送信号造成事件循环拥堵。
+"""
+import os
+import time
+import itertools
+import threading
+from collections import deque
+
+# 完整日志文件所在目录（相对于程序运行目录）
+LOG_DIR = 'logs'
+
+# 每类日志在内存中最多缓存的条数，超出后丢弃最旧的（完整内容仍在日志文件中）
+MAX_PENDING = 5000
+
+# 本进程内生成的日志文件序号
+_log_counter = itertools.count(1)
+
+
+def new_log_path(log_dir=LOG_DIR):
+    """
+    生成一次任务的日志文件路径，按开始时间命名。
+    同一秒内可能开始多个任务（多个进程，或索引服务并发处理的 /copy 请求），
+    文件名中加入进程号和本进程内的序号，保证日志和同名的统计文件不会互相覆盖。
+    """
+    return os.path.join(log_dir, time.strftime('run_%Y%m%d_%H%M%S') + f'_{os.getpid()}_{next(_log_counter)}.log')
+
+
+class BatchedLogSink:
+    """
+    线程安全的日志汇集器。
+
+    add 由工作线程调用，只做内存追加和文件写入；drain 由界面定时调用，
+    一次性取走积攒的所有日志。两类日志（成功 / 失败）分别缓存。
+    """
+
+    SUCCESS = 'success'
+    FAILED = 'failed'
+
+    def __init__(self, log_path=None, max_pending=MAX_PENDING):
+        """
+        初始化日志汇集器
+
+        Args:
+            log_path (str): 完整日志文件路径，为 None 时不落盘
+            max_pending (int): 每类日志在内存中最多缓存的条数
+        """
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._pending = {self.SUCCESS: deque(maxlen=max_pending), self.FAILED: deque(maxlen=max_pending)}
+        self._dropped = {self.SUCCESS: 0, self.FAILED: 0}
+        self._file = None
+
+    def open(self):
+        """打开日志文件。无法创建文件时只保留内存缓冲。"""
+        if not self.log_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            self._file = open(self.log_path, 'a', encoding='utf-8')
+        except OSError as e:
+            self._file = None
+            self.add(self.FAILED, f"❌ 无法创建日志文件 {self.log_path}: {e}")
+
+    def close(self):
+        """关闭日志文件，已缓存的日志仍可被 drain 取走。"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def add(self, kind, message):
+        """追加一条日志。"""
+        with self._lock:
+            pending = self._pending[kind]
+            if len(pending) == pending.maxlen:
+                self._dropped[kind] += 1
+            pending.append(message)
+            if self._file:
+                self._file.write(f"{time.strftime('%H:%M:%S')} [{kind}] {message}\n")
+
+    def success(self, message):
+        """追加一条成功日志。"""
+        self.add(self.SUCCESS, message)
+
+    def failed(self, message):
+        """追加一条失败日志。"""
+        self.add(self.FAILED, message)
+
+    def drain(self):
+        """
+        取走所有积攒的日志
+
+        Returns:
+            tuple: ({类型: [日志, ...]}, {类型: 因缓存已满被丢弃的条数})
+        """
+        with self._lock:
+            batches = {kind: list(pending) for kind, pending in self._pending.items() if pending}
+            dropped = {kind: count for kind, count in self._dropped.items() if count}
+            for pending in self._pending.values():
+                pending.clear()
+            for kind in self._dropped:
+                self._dropped[kind] = 0
+        return batches, dropped
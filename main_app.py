@@ -1,11 +1,19 @@
 # main_app.py
 import sys
-from PyQt5.QtWidgets import QApplication
-from ui_elements import UniApp
 import multiprocessing
 
 if __name__ == "__main__":
     multiprocessing.freeze_support() # 关键：在Windows下用于PyInstaller打包多进程
+
+    # 带有命令行选项（或 --cli）启动时进入命令行批处理模式，完全不导入 PyQt5；
+    # 其他参数（例如 Qt 的 -style）仍交给图形界面
+    if len(sys.argv) > 1:
+        from cli import wants_cli, main, CLI_FLAG
+        if wants_cli(sys.argv[1:]):
+            sys.exit(main([arg for arg in sys.argv[1:] if arg != CLI_FLAG]))
+
+    from PyQt5.QtWidgets import QApplication
+    from ui_elements import UniApp
     try:
         app = QApplication(sys.argv)
         window = UniApp()
@@ -13,4 +21,4 @@ if __name__ == "__main__":
         sys.exit(app.exec_())
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,189 @@
+"""
+path_store.py
+
+文件索引使用的紧凑路径存储。
+
+每个目录路径只在目录表中保存一次，文件以“目录编号 + 文件名”的形式记录，
+完整路径只在真正需要时才拼接。文件名到目录编号的反查表中，
+只出现在一个目录里的文件名直接存一个整数，重名的才使用 array 列。
+与为每个文件保存完整路径字符串相比，几百万文件的索引占用的内存可减少数倍；
+pickle 时所有字符串被合并成少数几个大字符串，在进程之间传递的开销也很小。
+
+只有文件索引（index_service.FileIndex）使用本存储。扫描进程返回的结果每个名称最多 top_k 条，
+总量与名称列表同阶而与文件数无关，仍直接保存完整路径字符串。
+"""
+import os
+from array import array
+
+# pickle 时拼接文件名使用的分隔符，文件名中不可能出现
+_SEP = '\0'
+
+
+class PathStore:
+    """
+    目录表 + 每个目录的文件名 / 子目录名元组 + 文件名反查表。
+    本类不是线程安全的，由 FileIndex 负责加锁。
+    """
+
+    __slots__ = ('_dir_paths', '_dir_ids', '_files', '_subdirs', '_free_ids', '_by_name', 'entry_count')
+
+    def __init__(self):
+        self._dir_paths = []   # 目录编号 -> 目录路径（已删除的编号为 None，等待复用）
+        self._dir_ids = {}     # 目录路径 -> 目录编号
+        self._files = []       # 目录编号 -> 文件名元组
+        self._subdirs = []     # 目录编号 -> 子目录名元组
+        self._free_ids = []
+        self._by_name = {}     # 文件名 -> 目录编号（int）或多个目录编号（array）
+        self.entry_count = 0
+
+    def __len__(self):
+        return len(self._dir_ids)
+
+    def __contains__(self, dirpath):
+        return dirpath in self._dir_ids
+
+    # ---------------- 文件名反查表 ----------------
+
+    def _link(self, name, dir_id):
+        ids = self._by_name.get(name)
+        if ids is None:
+            self._by_name[name] = dir_id
+        elif isinstance(ids, int):
+            self._by_name[name] = array('i', (ids, dir_id))
+        else:
+            ids.append(dir_id)
+
+    def _unlink(self, name, dir_id):
+        ids = self._by_name.get(name)
+        if ids is None:
+            return
+        if isinstance(ids, int):
+            if ids == dir_id:
+                del self._by_name[name]
+            return
+        try:
+            ids.remove(dir_id)
+        except ValueError:
+            return
+        if len(ids) == 1:
+            self._by_name[name] = ids[0]
+
+    # ---------------- 读写目录 ----------------
+
+    def get(self, dirpath):
+        """返回目录的 (文件名元组, 子目录名元组)，不在索引中时返回 None。"""
+        dir_id = self._dir_ids.get(dirpath)
+        if dir_id is None:
+            return None
+        return self._files[dir_id], self._subdirs[dir_id]
+
+    def set_dir(self, dirpath, filenames, subdirs):
+        """写入或替换一个目录的内容，同步更新文件名反查表。"""
+        filenames = tuple(filenames)
+        dir_id = self._dir_ids.get(dirpath)
+        if dir_id is None:
+            if self._free_ids:
+                dir_id = self._free_ids.pop()
+                self._dir_paths[dir_id] = dirpath
+                self._files[dir_id] = ()
+                self._subdirs[dir_id] = ()
+            else:
+                dir_id = len(self._dir_paths)
+                self._dir_paths.append(dirpath)
+                self._files.append(())
+                self._subdirs.append(())
+            self._dir_ids[dirpath] = dir_id
+
+        old_files = self._files[dir_id]
+        if old_files != filenames:
+            old_set, new_set = set(old_files), set(filenames)
+            for name in old_set - new_set:
+                self._unlink(name, dir_id)
+            for name in new_set - old_set:
+                self._link(name, dir_id)
+            self.entry_count += len(new_set) - len(old_set)
+            self._files[dir_id] = filenames
+        self._subdirs[dir_id] = tuple(subdirs)
+
+    def remove_dir(self, dirpath):
+        """从索引中移除单个目录（不含子目录），返回它原来的 (文件名元组, 子目录名元组)。"""
+        dir_id = self._dir_ids.pop(dirpath, None)
+        if dir_id is None:
+            return None
+        entry = self._files[dir_id], self._subdirs[dir_id]
+        for name in set(entry[0]):
+            self._unlink(name, dir_id)
+        self.entry_count -= len(set(entry[0]))
+        self._dir_paths[dir_id] = None
+        self._files[dir_id] = None
+        self._subdirs[dir_id] = None
+        self._free_ids.append(dir_id)
+        return entry
+
+    # ---------------- 查询 ----------------
+
+    def dirs(self):
+        """返回全部目录路径。"""
+        return [path for path in self._dir_paths if path is not None]
+
+    def listing(self, accept=None):
+        """
+        返回 [(目录路径, 文件名元组), ...]，可直接交给 scan_worker.match_walk。
+
+        Args:
+            accept: 可选的过滤函数，参数为目录路径
+        """
+        return [(path, files) for path, files in zip(self._dir_paths, self._files)
+                if path is not None and (accept is None or accept(path))]
+
+    def paths_named(self, name):
+        """按需拼接并逐个产出文件名完全等于 name 的完整路径。"""
+        ids = self._by_name.get(name)
+        if ids is None:
+            return
+        for dir_id in ((ids,) if isinstance(ids, int) else ids):
+            yield os.path.join(self._dir_paths[dir_id], name)
+
+    # ---------------- pickle ----------------
+
+    def __getstate__(self):
+        """
+        把所有字符串合并成少数几个大字符串，计数保存为 array 字节，
+        pickle 和传输的开销与文件数近似线性且常数很小。反查表在加载时重建。
+        """
+        dir_paths, file_counts, subdir_counts, files, subdirs = [], array('I'), array('I'), [], []
+        for path, names, children in zip(self._dir_paths, self._files, self._subdirs):
+            if path is None:
+                continue
+            dir_paths.append(path)
+            file_counts.append(len(names))
+            subdir_counts.append(len(children))
+            files.extend(names)
+            subdirs.extend(children)
+        return {'dirs': _SEP.join(dir_paths), 'dir_count': len(dir_paths),
+                'file_counts': file_counts.tobytes(), 'files': _SEP.join(files),
+                'subdir_counts': subdir_counts.tobytes(), 'subdirs': _SEP.join(subdirs)}
+
+    def __setstate__(self, state):
+        PathStore.__init__(self)
+        if not state['dir_count']:
+            return
+        file_counts, subdir_counts = array('I'), array('I')
+        file_counts.frombytes(state['file_counts'])
+        subdir_counts.frombytes(state['subdir_counts'])
+        files = state['files'].split(_SEP) if state['files'] else []
+        subdirs = state['subdirs'].split(_SEP) if state['subdirs'] else []
+        file_pos = subdir_pos = 0
+        # 加载到空存储中，无需与旧内容比较，直接按顺序追加
+        for dir_id, (dirpath, file_count, subdir_count) in enumerate(
+                zip(state['dirs'].split(_SEP), file_counts, subdir_counts)):
+            names = tuple(files[file_pos:file_pos + file_count])
+            self._dir_paths.append(dirpath)
+            self._dir_ids[dirpath] = dir_id
+            self._files.append(names)
+            self._subdirs.append(tuple(subdirs[subdir_pos:subdir_pos + subdir_count]))
+            for name in names:
+                self._link(name, dir_id)
+            file_pos += file_count
+            subdir_pos += subdir_count
+        self.entry_count = len(files)
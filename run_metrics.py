@@ -0,0 +1,132 @@
+"""
+run_metrics.py
+
+任务运行指标：各阶段的耗时（墙钟时间与 CPU 时间）、热点计数器，
+以及从扫描子进程汇总来的每个进程的统计。任务结束后导出为 JSON 运行摘要，
+图形界面和命令行都可以用 format_metrics 显示成文本。
+
+本模块只依赖标准库。
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# 各阶段名称及显示顺序
+PHASE_READ_LIST = 'read_list'
+PHASE_INDEX_LOOKUP = 'index_lookup'
+PHASE_SCAN = 'scan'
+PHASE_PLAN = 'plan'
+PHASE_COPY = 'copy'
+PHASE_REPORT = 'report'
+
+# 扫描子进程回报的、需要逐项累加的统计
+WORKER_COUNTERS = ('tasks', 'dirs', 'duplicates', 'pruned', 'filtered', 'entries', 'comparisons', 'wall', 'cpu')
+
+
+class RunMetrics:
+    """
+    一次任务的运行指标。计数器可以从复制线程等多个线程同时累加。
+    """
+
+    def __init__(self):
+        self.phases = {}     # {阶段名: {'wall': 秒, 'cpu': 秒}}
+        self.counters = {}   # {计数器名: 数值}
+        self.workers = {}    # {扫描进程号: {统计项: 数值}}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        记录一个阶段的墙钟时间和本进程的 CPU 时间（包含复制线程，不含扫描子进程）。
+        同名阶段多次进入时累加。
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                entry = self.phases.setdefault(name, {'wall': 0.0, 'cpu': 0.0})
+                entry['wall'] += time.perf_counter() - wall
+                entry['cpu'] += time.process_time() - cpu
+
+    def add(self, name, value=1):
+        """累加计数器。"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge_worker(self, stats):
+        """合并扫描子进程回报的一次扫描统计（见 scan_worker.new_scan_stats）。"""
+        with self._lock:
+            worker = self.workers.setdefault(str(stats.get('pid', '?')), dict.fromkeys(WORKER_COUNTERS, 0))
+            worker['tasks'] += 1
+            for key in WORKER_COUNTERS[1:]:
+                worker[key] += stats.get(key, 0)
+
+    def to_dict(self):
+        """返回可直接写入 JSON 的指标字典。"""
+        with self._lock:
+            return {
+                'total': {'wall': time.perf_counter() - self._started, 'cpu': time.process_time() - self._started_cpu},
+                'phases': {name: dict(entry) for name, entry in self.phases.items()},
+                'counters': dict(self.counters),
+                'workers': {pid: dict(stats) for pid, stats in self.workers.items()},
+            }
+
+    def save(self, path, **extra):
+        """
+        把指标写入 JSON 文件。
+
+        Args:
+            path (str): 输出路径
+            **extra: 一并写入的其他字段（例如任务统计 summary）
+        """
+        data = self.to_dict()
+        data.update(extra)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return data
+
+
+def metrics_path_for(log_path):
+    """与日志文件同名的运行摘要路径：logs/run_xxx.log -> logs/run_xxx.metrics.json。"""
+    return os.path.splitext(log_path)[0] + '.metrics.json'
+
+
+def profile_path_for(log_path):
+    """与日志文件同名的 cProfile 输出路径：logs/run_xxx.log -> logs/run_xxx.prof。"""
+    return os.path.splitext(log_path)[0] + '.prof'
+
+
+def format_bytes(value):
+    """把字节数转换成便于阅读的文本（B / KiB / MiB / GiB / TiB）。"""
+    if abs(value) < 1024:
+        return f"{value:.0f} B"
+    for unit in ('KiB', 'MiB', 'GiB'):
+        value /= 1024
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+    return f"{value / 1024:.1f} TiB"
+
+
+def format_metrics(data):
+    """
+    把 to_dict / save 的结果整理成多行文本。
+
+    Returns:
+        str: 每行一个阶段、计数器或扫描进程
+    """
+    lines = [f"总计: {data['total']['wall']:.2f} s (CPU {data['total']['cpu']:.2f} s)"]
+    for name, entry in data['phases'].items():
+        lines.append(f"  {name:<13} {entry['wall']:8.3f} s   CPU {entry['cpu']:8.3f} s")
+    for name, value in sorted(data['counters'].items()):
+        shown = format_bytes(value) if name.startswith('bytes') else f"{value:,}"
+        lines.append(f"  {name:<24} {shown}")
+    for pid, stats in sorted(data['workers'].items()):
+        lines.append(f"  扫描进程 {pid}: {stats['tasks']} 个任务, {stats['dirs']:,} 个目录, "
+                     f"{stats['entries']:,} 个条目, {stats['wall']:.2f} s (CPU {stats['cpu']:.2f} s)")
+    return "\n".join(lines)
@@ -0,0 +1,200 @@
+"""
+scan_pool.py
+
+长期存活、可跨任务复用的扫描进程池。
+
+与每次任务都新建 ProcessPoolExecutor 相比：
+- 子进程只导入精简的 scan_worker 模块，并在任务之间保持存活，不再重复启动；
+- 每个任务的名称集合和匹配器只向每个子进程发送并编译一次，
+  之后的扫描任务只携带根目录路径；
+- 任务由父进程按需派发给空闲的子进程，可随时取消。
+"""
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from collections import deque
+import scan_worker
+
+# 轮询结果队列的超时时间（秒），超时后检查是否有子进程意外退出
+POLL_INTERVAL = 0.5
+# 取消任务后等待子进程交回结果的最长时间（秒），超时的子进程会被强制结束
+DRAIN_TIMEOUT = 5.0
+
+
+class _WorkerHandle:
+    """父进程中记录的单个子进程状态。"""
+
+    def __init__(self, index, process, inbox):
+        self.index = index
+        self.process = process
+        self.inbox = inbox
+        self.job_id = None  # 该子进程当前已安装的任务编号
+
+
+class ScanPool:
+    """
+    扫描进程池。同一时间只执行一个任务，多个调用方会按顺序排队。
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        Args:
+            max_workers (int): 最多同时存活的扫描进程数，默认为 CPU 核数
+        """
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self._context = multiprocessing.get_context()
+        self._workers = []
+        self._outbox = None
+        self._cancel_event = None
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count(1)
+
+    # ---------------- 进程管理 ----------------
+
+    def _spawn(self, index):
+        """启动一个子进程。"""
+        inbox = self._context.Queue()
+        process = self._context.Process(
+            target=scan_worker.worker_main,
+            args=(index, inbox, self._outbox, self._cancel_event),
+            daemon=True)
+        process.start()
+        return _WorkerHandle(index, process, inbox)
+
+    def _ensure_workers(self, count):
+        """确保至少有 count 个存活的子进程（不超过 max_workers），返回它们。"""
+        if self._outbox is None:
+            self._outbox = self._context.Queue()
+            self._cancel_event = self._context.Event()
+
+        count = min(count, self.max_workers)
+        for index, worker in enumerate(self._workers):
+            if not worker.process.is_alive():
+                self._workers[index] = self._spawn(index)
+        while len(self._workers) < count:
+            self._workers.append(self._spawn(len(self._workers)))
+        return self._workers[:count]
+
+    def warm_up(self, count=1):
+        """提前启动子进程，使下一次任务无需等待进程启动。"""
+        with self._lock:
+            self._ensure_workers(count)
+
+    def shutdown(self):
+        """通知所有子进程退出并回收资源。"""
+        with self._lock:
+            for worker in self._workers:
+                if worker.process.is_alive():
+                    worker.inbox.put(('stop',))
+            for worker in self._workers:
+                worker.process.join(timeout=1)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+            self._workers = []
+
+    # ---------------- 任务执行 ----------------
+
+    def cancel(self):
+        """取消当前任务：子进程会尽快交回已找到的部分结果。可从任意线程调用。"""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+
+    def scan(self, spec, roots, tuner=None):
+        """
+        在多个根目录中执行同一个匹配规格的扫描。
+
+        这是一个生成器，每完成一个根目录产出一次 (root, found_files, error, stats)，
+        其中 found_files 为 {名称: 路径}，stats 为扫描统计（见 scan_worker.new_scan_stats），
+        出错时二者均为 None 并给出错误信息。
+        提前结束迭代（break / close）时会自动取消剩余的扫描。
+
+        Args:
+            spec (dict): 匹配规格，见 scan_worker.CompiledSpec
+            roots (list[str]): 根目录列表
+            tuner: 决定同时扫描的根目录数的调整器（autotune.ConcurrencyTuner），
+                   每次派发前读取其 limit；为 None 时所有子进程同时工作
+        """
+        with self._lock:
+            if not roots:
+                return
+            job_id = next(self._job_ids)
+            workers = self._ensure_workers(len(roots))
+            self._cancel_event.clear()
+            pending = deque(enumerate(roots))
+            in_flight = {}
+
+            def dispatch(worker):
+                """把下一个根目录派发给空闲的子进程，必要时先安装匹配规格。"""
+                if not pending or self._cancel_event.is_set():
+                    return
+                task_id, root = pending.popleft()
+                if worker.job_id != job_id:
+                    worker.inbox.put(('job', job_id, spec))
+                    worker.job_id = job_id
+                worker.inbox.put(('task', job_id, task_id, root))
+                in_flight[worker.index] = task_id
+
+            def fill():
+                """在允许的并发数以内，把根目录派发给所有空闲的子进程。"""
+                limit = tuner.limit if tuner is not None else len(workers)
+                for worker in workers:
+                    if len(in_flight) >= limit:
+                        break
+                    if worker.index not in in_flight:
+                        dispatch(self._workers[worker.index])
+
+            try:
+                fill()
+
+                while in_flight:
+                    try:
+                        kind, worker_index, message_job_id, task_id, payload = self._outbox.get(timeout=POLL_INTERVAL)
+                    except queue.Empty:
+                        for task_id in self._reap_dead_workers(in_flight):
+                            yield roots[task_id], None, "扫描进程意外退出", None
+                        fill()
+                        continue
+
+                    # 忽略安装规格时的错误回报，对应的扫描任务会单独回报错误
+                    if message_job_id != job_id or task_id is None:
+                        continue
+                    in_flight.pop(worker_index, None)
+                    if kind == 'done':
+                        yield roots[task_id], payload[0], None, payload[1]
+                    else:
+                        yield roots[task_id], None, payload, None
+                    fill()
+            finally:
+                if in_flight:
+                    self._cancel_event.set()
+                    self._drain(in_flight)
+                self._cancel_event.clear()
+
+    def _reap_dead_workers(self, in_flight):
+        """找出意外退出的子进程，重新启动它们，返回丢失的任务编号。"""
+        lost = []
+        for worker_index in list(in_flight):
+            if not self._workers[worker_index].process.is_alive():
+                lost.append(in_flight.pop(worker_index))
+                self._workers[worker_index] = self._spawn(worker_index)
+        return lost
+
+    def _drain(self, in_flight):
+        """取消后等待仍在运行的子进程交回结果，超时则强制结束，保证下一次任务的队列干净。"""
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        while in_flight:
+            if time.monotonic() > deadline:
+                for worker_index in list(in_flight):
+                    self._workers[worker_index].process.terminate()
+                    self._workers[worker_index].process.join(timeout=1)
+                in_flight.clear()
+                break
+            try:
+                _, worker_index, _, task_id, _ = self._outbox.get(timeout=POLL_INTERVAL)
+                if task_id is not None:
+                    in_flight.pop(worker_index, None)
+            except queue.Empty:
+                self._reap_dead_workers(in_flight)
@@ -0,0 +1,720 @@
+"""
+scan_worker.py
+
+扫描子进程使用的精简模块：只依赖标准库中扫描所需的部分
+（模糊匹配时才导入 fuzzywuzzy），不会间接导入 pandas、openpyxl 或 PyQt5，
+因此在 spawn / PyInstaller 打包环境下子进程也能快速启动。
+
+子进程由 scan_pool.ScanPool 创建并长期复用。每个任务（job）开始时，
+名称集合和预编译的匹配器只发送并构建一次，之后的扫描任务只携带根目录路径。
+
+名称中含有路径分隔符时（例如 2023/Q4/invoice_001.pdf）作为路径片段匹配：
+最后一段按匹配模式与文件名比较，前面的各段必须与文件所在目录路径的末尾逐级相同
+（正则表达式模式下逐级完整匹配；按 / 拆开后有任何一段不是有效的正则表达式时，
+例如 [^/]+\\.pdf，整个名称仍作为一个正则表达式与文件名比较）。以分隔符开头的片段锚定在查找根目录上，
+全部名称都是锚定片段时，遍历会跳过不可能包含匹配的子目录。
+
+通配符模式（glob，* ? [...]）的所有模式在任务开始时一次性翻译成正则表达式，
+并按字面的扩展名 / 前缀分桶（见 GlobMatcher），每个文件名只与可能匹配它的模式比较。
+
+无效的正则表达式只影响该名称本身：它不参与匹配，错误信息记录在 CompiledSpec.invalid 中
+（调用方可以在扫描前用 invalid_patterns 检查），其他名称照常查找。
+
+元数据筛选条件（file_filters）分两级检查：任务设置的条件在遍历时用 DirEntry 检查，
+被排除的文件不会进入匹配；名称列表中逐行给出的条件只在文件名与该名称匹配后才检查。
+
+开启规范化（normalize）时，名称和文件名都先转换成匹配键（见 match_key：NFKC、大小写折叠、
+合并空白），名称在任务开始时转换一次，文件名在每个目录中转换一次，之后的比较与不规范化时相同。
+"""
+import os
+import re
+import time
+import heapq
+import fnmatch
+import unicodedata
+from collections import deque
+
+from fs_backend import LocalFS
+
+# 检查取消标志的间隔（目录数）
+CANCEL_CHECK_INTERVAL = 64
+# 名称为模式（而非字面文件名）的匹配模式，路径片段的目录各段也按模式匹配
+PATTERN_MODES = ('regex', 'glob')
+# 通配符
+_GLOB_CHARS = '*?['
+
+
+def match_key(text):
+    """
+    规范化的匹配键：NFKC（全角 / 半角、兼容字符统一）、大小写折叠，去掉首尾空白并把连续空白合并为一个空格。
+    纯 ASCII 文本跳过 Unicode 规范化。
+    """
+    if text.isascii():
+        key = text.lower()
+    else:
+        key = unicodedata.normalize('NFKC', text).casefold()
+    return ' '.join(key.split()) if key != key.strip() or '  ' in key or '\t' in key else key
+
+
+def split_path_name(name, mode):
+    """
+    把含有路径分隔符的名称拆成路径片段。
+
+    正则表达式模式下只有 / 是分隔符（\\ 是转义符），其他模式下 / 和 \\ 都是分隔符。
+    正则表达式模式下 / 也可能出现在字符集等结构中（例如 [^/]+\\.pdf），
+    因此只有拆开后的每一段都是有效的正则表达式时才作为路径片段。
+
+    Returns:
+        tuple: (是否锚定在根目录, 目录各段组成的元组, 文件名部分)；名称不含分隔符，
+               或不能拆成路径片段时返回 None
+    """
+    if mode != 'regex':
+        if '\\' in name:
+            name = name.replace('\\', '/')
+    if '/' not in name:
+        return None
+    parts = name.split('/')
+    if mode == 'regex' and not all(_is_valid_regex(part) for part in parts):
+        return None
+    dirs = tuple(part for part in parts[:-1] if part and part != '.')
+    return name.startswith('/'), dirs, parts[-1]
+
+
+def _is_valid_regex(text):
+    try:
+        re.compile(text)
+    except re.error:
+        return False
+    return True
+
+
+def invalid_patterns(names, mode):
+    """
+    检查名称中无效的正则表达式（只有正则表达式模式下才可能无效）。
+
+    Returns:
+        dict: {名称: 错误信息}
+    """
+    if mode != 'regex':
+        return {}
+    invalid = {}
+    for name in names:
+        # 能拆成路径片段的名称每一段都已编译过
+        if split_path_name(name, mode) is None:
+            try:
+                re.compile(name)
+            except re.error as e:
+                invalid[name] = f"无效的正则表达式: {e}"
+    return invalid
+
+
+def compile_pattern(mode, text, normalize=False):
+    """
+    把正则表达式或通配符模式编译成正则表达式对象；通配符模式与整个名称比较（fnmatchcase 语义）。
+    normalize 为 True 时模式用于匹配 match_key 转换后的文本：通配符模式本身也转换成匹配键，
+    正则表达式保持原样（避免改变转义序列），改为忽略大小写。
+    """
+    if mode == 'glob':
+        return re.compile(fnmatch.translate(match_key(text) if normalize else text))
+    return re.compile(text, re.IGNORECASE if normalize else 0)
+
+
+class GlobMatcher:
+    """
+    一组通配符模式编译成的匹配器。
+
+    模式按字面部分分桶：不含通配符的模式按整个文件名放入字典；字面后缀中带扩展名的按扩展名分桶；
+    其余有字面前缀的按前缀首字符分桶。每个文件名只取出可能匹配的桶，
+    先用字面前缀 / 后缀做字符串比较，通过后才运行正则表达式。
+    """
+
+    def __init__(self):
+        self._literal = {}   # {文件名: [名称]}
+        self._by_ext = {}    # {扩展名: [(前缀, 后缀, 正则表达式, 名称)]}
+        self._by_first = {}  # {前缀首字符: [(前缀, 后缀, 正则表达式, 名称)]}
+        self._anywhere = []  # 既没有扩展名也没有字面前缀的模式
+
+    def add(self, name, pattern, text=None):
+        """加入一个模式（pattern 为 compile_pattern 的结果，text 为分桶使用的模式文本，默认为 name）。"""
+        text = name if text is None else text
+        if not any(char in text for char in _GLOB_CHARS):
+            self._literal.setdefault(text, []).append(name)
+            return
+        first = min(text.find(char) for char in _GLOB_CHARS if char in text)
+        last = max(text.rfind(char) for char in _GLOB_CHARS + ']' if char in text)
+        prefix, suffix = text[:first], text[last + 1:]
+        entry = (prefix, suffix, pattern, name)
+        if '.' in suffix:
+            self._by_ext.setdefault(suffix[suffix.rfind('.'):], []).append(entry)
+        elif prefix:
+            self._by_first.setdefault(prefix[0], []).append(entry)
+        else:
+            self._anywhere.append(entry)
+
+    def matches(self, filename):
+        """返回与 filename 匹配的全部名称。"""
+        found = list(self._literal.get(filename, ()))
+        dot = filename.rfind('.')
+        for bucket in (self._by_ext.get(filename[dot:]) if dot >= 0 else None,
+                       self._by_first.get(filename[:1]), self._anywhere):
+            if bucket:
+                for prefix, suffix, pattern, name in bucket:
+                    if filename.startswith(prefix) and filename.endswith(suffix) and pattern.match(filename):
+                        found.append(name)
+        return found
+
+
+class CompiledSpec:
+    """
+    一次任务的匹配规格在子进程中的预编译形式。
+    """
+
+    def __init__(self, spec):
+        """
+        Args:
+            spec (dict): {'names': 待查找的名称集合, 'mode': 匹配模式, 'min_fuzzy_score': 模糊匹配阈值,
+                          'follow_links': 是否跟随指向目录的符号链接,
+                          'fs': 文件系统后端（fs_backend），默认为 LocalFS,
+                          'top_k': 每个名称保留的候选数，默认为 1,
+                          'filter': 对所有名称生效的 file_filters.FileFilter，在遍历时检查,
+                          'name_filters': {名称: FileFilter}，只对该名称生效，在文件名匹配后检查,
+                          'normalize': 是否按 match_key 规范化后比较}
+        """
+        self.names = spec['names']
+        self.mode = spec['mode']
+        self.min_fuzzy_score = spec.get('min_fuzzy_score', 85)
+        self.follow_links = spec.get('follow_links', False)
+        self.fs = spec.get('fs') or LocalFS()
+        self.top_k = max(1, spec.get('top_k', 1))
+        self.file_filter = spec.get('filter') or None
+        self.name_filters = spec.get('name_filters') or {}
+        self.normalize = spec.get('normalize', False)
+        # 无效的正则表达式：{名称: 错误信息}，这些名称不参与匹配
+        self.invalid = {}
+        self.fuzz = None
+        # 普通名称在每个目录中都要比较：[(名称, 与文件名比较的对象)]，
+        # 比较对象在精确 / 模糊模式下是字符串，在正则表达式模式下是预编译的正则表达式
+        self.plain_targets = []
+        # 路径片段：{名称: (是否锚定, 目录各段, 与文件名比较的对象)}
+        self.path_names = {}
+        # 路径片段的逐级索引（精确 / 模糊模式）：
+        #   _by_parent        {最后一级目录名: [名称]}，未锚定的片段
+        #   _by_dirs          {目录各段: [名称]}，锚定的片段
+        #   _anywhere         没有目录部分的未锚定片段（例如 ./a.pdf），在每个目录中都要比较
+        #   _anchored_prefixes 锚定片段的全部目录前缀，用于剪除子目录
+        self._by_parent = {}
+        self._by_dirs = {}
+        self._anywhere = []
+        self._anchored_prefixes = set()
+        # 正则表达式 / 通配符模式下目录各段的预编译结果：{名称: [正则表达式]}
+        self._dir_patterns = {}
+        # 通配符模式下不含目录部分的名称
+        self.glob = GlobMatcher() if self.mode == 'glob' else None
+
+        if self.mode == 'fuzzy':
+            from fuzzywuzzy import fuzz
+            self.fuzz = fuzz
+        # 预编译所有正则表达式，每个任务只编译一次
+        for name in self.names:
+            try:
+                self._add_name(name)
+            except re.error as e:
+                self.invalid[name] = f"无效的正则表达式: {e}"
+
+    def _add_name(self, name):
+        normalize = self.normalize
+        split = split_path_name(name, self.mode)
+        if split is None:
+            if self.mode in PATTERN_MODES:
+                pattern = compile_pattern(self.mode, name, normalize)
+                self.plain_targets.append((name, pattern))
+                if self.glob is not None:
+                    self.glob.add(name, pattern, match_key(name) if normalize else name)
+            else:
+                self.plain_targets.append((name, match_key(name) if normalize else name))
+            return
+        anchored, dirs, base = split
+        if self.mode in PATTERN_MODES:
+            self._dir_patterns[name] = [compile_pattern(self.mode, part, normalize) for part in dirs]
+            base = compile_pattern(self.mode, base, normalize)
+        elif normalize:
+            dirs = tuple(match_key(part) for part in dirs)
+            base = match_key(base)
+        self.path_names[name] = (anchored, dirs, base)
+        if self.mode in PATTERN_MODES:
+            return
+        if anchored:
+            self._by_dirs.setdefault(dirs, []).append(name)
+            self._anchored_prefixes.update(dirs[:length] for length in range(1, len(dirs) + 1))
+        elif dirs:
+            self._by_parent.setdefault(dirs[-1], []).append(name)
+        else:
+            self._anywhere.append(name)
+
+    def targets_in(self, rel_parts):
+        """
+        在相对根目录的路径为 rel_parts 的目录中需要比较的名称。
+
+        Args:
+            rel_parts (tuple): 目录相对查找根目录的各段
+
+        Returns:
+            list: [(名称, 与文件名比较的对象)]
+        """
+        path_targets = self.path_targets_in(rel_parts)
+        return self.plain_targets + path_targets if path_targets else self.plain_targets
+
+    def path_targets_in(self, rel_parts):
+        """targets_in 中来自路径片段的部分。"""
+        if not self.path_names:
+            return []
+        if self.mode in PATTERN_MODES:
+            names = [name for name, (anchored, dirs, _) in self.path_names.items()
+                     if self._regex_dirs_match(self._dir_patterns[name], anchored, rel_parts)]
+        else:
+            names = list(self._anywhere)
+            names.extend(self._by_dirs.get(rel_parts, ()))
+            if rel_parts:
+                for name in self._by_parent.get(rel_parts[-1], ()):
+                    dirs = self.path_names[name][1]
+                    if len(dirs) <= len(rel_parts) and rel_parts[len(rel_parts) - len(dirs):] == dirs:
+                        names.append(name)
+        return [(name, self.path_names[name][2]) for name in names]
+
+    @staticmethod
+    def _regex_dirs_match(patterns, anchored, rel_parts):
+        if len(patterns) > len(rel_parts) or (anchored and len(patterns) != len(rel_parts)):
+            return False
+        tail = rel_parts[len(rel_parts) - len(patterns):]
+        return all(pattern.fullmatch(part) for pattern, part in zip(patterns, tail))
+
+    def subtree_filter(self, root_dir):
+        """
+        全部名称都是锚定的路径片段时（精确 / 模糊模式），返回剪除子目录的函数 prune(目录路径, 子目录名列表)，
+        它就地删去不在任何片段目录前缀上的子目录；否则返回 None。
+        """
+        if self.plain_targets or self._by_parent or self._anywhere or self.mode in PATTERN_MODES \
+                or not self.path_names:
+            return None
+        prefixes = self._anchored_prefixes
+
+        key = match_key if self.normalize else str
+
+        def prune(dirpath, dirnames):
+            rel_parts = self.relative_parts(dirpath, root_dir)
+            dirnames[:] = [name for name in dirnames if rel_parts + (key(name),) in prefixes]
+
+        return prune
+
+    def relative_parts(self, dirpath, root_dir):
+        """与 targets_in 比较的目录各段：relative_parts 的结果，开启规范化时转换成匹配键。"""
+        parts = relative_parts(dirpath, root_dir)
+        return tuple(match_key(part) for part in parts) if self.normalize else parts
+
+
+def relative_parts(dirpath, root_dir):
+    """dirpath 相对 root_dir 的各段组成的元组；root_dir 为 None 时为 dirpath 的全部各段。"""
+    if root_dir is not None:
+        if dirpath == root_dir:
+            return ()
+        if dirpath.startswith(root_dir):
+            dirpath = dirpath[len(root_dir):]
+    return tuple(part for part in dirpath.split(os.sep) if part)
+
+
+def new_scan_stats():
+    """
+    扫描统计：
+        dirs         已扫描的目录数
+        duplicates   因指向已扫描过的物理目录而跳过的目录数
+        pruned       因路径片段的目录约束而整体跳过的子目录数
+        filtered     被任务的筛选条件排除、未参与匹配的文件数
+        entries      参与匹配的文件名数
+        comparisons  名称与文件名的比较次数（按“未找到的名称数 × 目录文件数”计，为上限）
+        wall / cpu   扫描耗时和扫描进程的 CPU 时间（秒），由 worker_main 填写
+        pid          执行扫描的进程号
+    """
+    return {'dirs': 0, 'duplicates': 0, 'pruned': 0, 'filtered': 0, 'entries': 0, 'comparisons': 0, 'wall': 0.0, 'cpu': 0.0, 'pid': os.getpid()}
+
+
+def _prune(prune, dirpath, dirnames, stats):
+    if prune is not None and dirnames:
+        before = len(dirnames)
+        prune(dirpath, dirnames)
+        stats['pruned'] += before - len(dirnames)
+
+
+def _walk(root_dir, stats, fs, prune=None, accept=None):
+    """
+    不跟随符号链接的按层遍历（见 LocalFS.walk），统计目录数；
+    prune 见 CompiledSpec.subtree_filter，accept 见 _entry_filter。
+    """
+    for dirpath, dirnames, filenames in fs.walk(root_dir, accept):
+        stats['dirs'] += 1
+        _prune(prune, dirpath, dirnames, stats)
+        yield dirpath, filenames
+
+
+def _entry_filter(file_filter, stats):
+    """把任务的筛选条件包装成遍历使用的 accept(DirEntry)，并统计被排除的文件数；没有条件时返回 None。"""
+    if not file_filter:
+        return None
+    accepts_entry = file_filter.accepts_entry
+
+    def accept(entry):
+        if accepts_entry(entry):
+            return True
+        stats['filtered'] += 1
+        return False
+
+    return accept
+
+
+def walk_unique(root_dir, stats, fs=None, prune=None, accept=None):
+    """
+    跟随符号链接遍历目录，按 (st_dev, st_ino) 记录已访问的物理目录，
+    每个物理目录只扫描一次：指向已扫描目录的符号链接、绑定挂载的重复目录以及链接环都会被跳过，
+    并计入 stats['duplicates']。文件系统不提供 inode 编号时退回到按真实路径去重。
+    同一层的子目录按名称排序后访问，因此同一物理目录总是经由同一条（最浅的）路径被扫描。
+
+    Args:
+        root_dir (str): 根目录
+        stats (dict): 扫描统计，见 new_scan_stats
+        fs: 文件系统后端，默认为 LocalFS
+        prune: 可选的子目录剪除函数，见 CompiledSpec.subtree_filter
+        accept: 可选的文件筛选函数 accept(DirEntry)，见 _entry_filter
+
+    Yields:
+        tuple: (目录路径, 文件名列表)，按层（广度优先）产出
+    """
+    fs = fs or LocalFS()
+    visited = set()
+    queue = deque([root_dir])
+    while queue:
+        dirpath = queue.popleft()
+        try:
+            st = fs.stat(dirpath)
+        except OSError:
+            continue
+        key = (st.st_dev, st.st_ino) if st.st_ino else os.path.realpath(dirpath)
+        if key in visited:
+            stats['duplicates'] += 1
+            continue
+        visited.add(key)
+
+        filenames, subdirs = [], []
+        try:
+            for entry in fs.scandir(dirpath):
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    subdirs.append(entry.name)
+                elif accept is None or accept(entry):
+                    filenames.append(entry.name)
+        except OSError:
+            continue
+        stats['dirs'] += 1
+        _prune(prune, dirpath, subdirs, stats)
+        yield dirpath, filenames
+        queue.extend(os.path.join(dirpath, name) for name in sorted(subdirs))
+
+
+def scan_root(root_dir, compiled, cancel_event=None, stats=None):
+    """
+    在单个根目录中查找文件。
+
+    Args:
+        root_dir (str): 根目录
+        compiled (CompiledSpec): 预编译的匹配规格
+        cancel_event: multiprocessing.Event，被设置时尽快返回已找到的部分结果
+        stats (dict): 可选的扫描统计，见 new_scan_stats
+
+    Returns:
+        dict: {名称: [(完整路径, 排序键), ...]}，每个名称最多 top_k 个候选，从好到差排列；排序键见 candidate_rank
+    """
+    if not compiled.fs.exists(root_dir):
+        return {}
+    if stats is None:
+        stats = new_scan_stats()
+    prune = compiled.subtree_filter(root_dir)
+    accept = _entry_filter(compiled.file_filter, stats)
+    if compiled.follow_links:
+        walk = walk_unique(root_dir, stats, compiled.fs, prune, accept)
+    else:
+        walk = _walk(root_dir, stats, compiled.fs, prune, accept)
+    return match_walk(walk, compiled, cancel_event, stats, level_order=True, root_dir=root_dir)
+
+
+# ---------------- 候选排序 ----------------
+#
+# 同一名称可能匹配到多个文件。每个候选按以下顺序比较，越小越靠前，
+# 每个名称保留最靠前的 top_k 个，因此无论扫描顺序和并行度如何，结果都相同：
+#     1. 匹配质量（0 为完美匹配，越小越好，见 match_quality）
+#     2. 根目录优先级（在根目录列表中越靠前越好，由合并方按路径计算）
+#     3. 目录深度（越浅越好）
+#     4. 修改时间（越新越好，仅在前几项相同时才读取）
+#     5. 完整路径（字符串顺序，保证全序）
+
+def match_quality(mode, name, filename, score=None, pattern=None):
+    """
+    候选的匹配质量，0 为完美匹配。
+
+        exact  文件名与名称完全相同为 0，去掉扩展名后相同为 1，否则为 2 + 多出的字符数
+        fuzzy  100 - 相似度（相似度 100 即完全相同）
+        regex  整个文件名匹配为 0，仅部分匹配为 1
+        glob   通配符总是与整个文件名比较，匹配即为 0
+    """
+    if mode == 'exact':
+        if filename == name:
+            return 0
+        if os.path.splitext(filename)[0] == name:
+            return 1
+        return 2 + len(filename) - len(name)
+    if mode == 'fuzzy':
+        return 100 - score
+    if mode == 'glob':
+        return 0
+    return 0 if pattern.fullmatch(filename) else 1
+
+
+def candidate_rank(quality, path, mtime):
+    """单个根目录内的排序键：(质量, 深度, -修改时间, 路径)。"""
+    return (quality, path.count(os.sep), -mtime, path)
+
+
+def _mtime(fs, path):
+    try:
+        return fs.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+class _Candidate:
+    """
+    match_walk 中的一个候选。修改时间在第一次需要比较时才读取。
+    a < b 表示 a 排在 b 之后（更差），因此 heapq 的堆顶总是当前最差的候选。
+    """
+
+    __slots__ = ('quality', 'depth', 'path', 'fs', '_mtime')
+
+    def __init__(self, quality, depth, path, fs, mtime=None):
+        self.quality = quality
+        self.depth = depth
+        self.path = path
+        self.fs = fs
+        self._mtime = mtime
+
+    def mtime(self):
+        if self._mtime is None:
+            self._mtime = _mtime(self.fs, self.path)
+        return self._mtime
+
+    def __lt__(self, other):
+        if self.quality != other.quality or self.depth != other.depth:
+            return (self.quality, self.depth) > (other.quality, other.depth)
+        return (-self.mtime(), self.path) > (-other.mtime(), other.path)
+
+    def rank(self):
+        return candidate_rank(self.quality, self.path, self.mtime())
+
+
+def root_priority(path, roots):
+    """path 所在的第一个根目录在 roots 中的位置；不在任何根目录下时排在最后。"""
+    path = os.path.abspath(path)
+    for index, root in enumerate(roots):
+        root = os.path.abspath(root)
+        if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+            return index
+    return len(roots)
+
+
+def merge_ranked(merged, found, roots, top_k=1):
+    """
+    把一个根目录（或索引）的结果合并到 merged 中，每个名称保留排序键最小的 top_k 个候选。
+
+    Args:
+        merged (dict): {名称: [(合并排序键, 完整路径), ...]}，从好到差排列，就地更新
+        found (dict): {名称: [(完整路径, candidate_rank 排序键), ...]}
+        roots (list[str]): 决定根目录优先级的根目录列表
+        top_k (int): 每个名称保留的候选数
+
+    Returns:
+        list[str]: 本次新找到（之前没有任何候选）的名称
+    """
+    added = []
+    for name, candidates in found.items():
+        current = merged.get(name)
+        if current is None:
+            added.append(name)
+            current = []
+        # 相互嵌套的根目录可能找到同一个文件，其合并排序键相同，按路径去重
+        known = {path for _, path in current}
+        for path, rank in candidates:
+            if path not in known:
+                known.add(path)
+                current.append(((rank[0], root_priority(path, roots)) + tuple(rank[1:]), path))
+        current.sort()
+        merged[name] = current[:top_k]
+    return added
+
+
+def match_walk(walk, compiled, cancel_event=None, stats=None, level_order=False, root_dir=None):
+    """
+    在一组目录列表上执行匹配，既可用于实时遍历磁盘，也可用于内存中的文件索引。
+    每个名称在所有候选中保留排序最靠前的 top_k 个（见“候选排序”），结果与遍历顺序无关；
+    每个名称最多占用 top_k 个候选的内存（有界堆）。
+
+    Args:
+        walk: 可迭代的 (目录路径, 文件名列表)
+        compiled (CompiledSpec): 预编译的匹配规格
+        cancel_event: 被设置时尽快返回已找到的部分结果
+        stats (dict): 可选的扫描统计，累加 entries 和 comparisons
+        level_order (bool): walk 是否按层产出（深度单调不减）。此时进入更深一层后，
+                            已有 top_k 个完美匹配的名称不可能再被超过，不再参与比较；全部名称如此即提前结束
+        root_dir (str): walk 所在的查找根目录，路径片段的目录部分相对它比较
+
+    Returns:
+        dict: {名称: [(完整路径, candidate_rank 排序键), ...]}，从好到差排列
+    """
+    names = compiled.names
+    mode = compiled.mode
+    fs = compiled.fs
+    top_k = compiled.top_k
+    normalize = compiled.normalize
+    name_filters = compiled.name_filters
+    # {名称: 候选堆}，堆顶为最差的候选
+    best = {}
+    settled = set()
+    level = None
+    # 计数在每个目录上累加一次，不在逐个比较的内层循环中计数
+    entries = comparisons = 0
+
+    def offer(name, quality, depth, dirpath, filename):
+        path = os.path.join(dirpath, filename)
+        mtime = None
+        file_filter = name_filters.get(name) if name_filters else None
+        if file_filter is not None:
+            # 该名称自己的筛选条件：先比较扩展名，再读取元数据（修改时间顺便用于排序）
+            if not file_filter.accepts_name(filename):
+                return
+            if file_filter.needs_stat:
+                try:
+                    st = fs.stat(path)
+                except OSError:
+                    return
+                if not file_filter.accepts_stat(st):
+                    return
+                mtime = st.st_mtime
+        heap = best.get(name)
+        if heap is None:
+            best[name] = [_Candidate(quality, depth, path, fs, mtime)]
+        elif len(heap) < top_k:
+            heapq.heappush(heap, _Candidate(quality, depth, path, fs, mtime))
+        elif (quality, depth) <= (heap[0].quality, heap[0].depth):
+            # 质量和深度都不优于最差的候选时不必读取修改时间
+            candidate = _Candidate(quality, depth, path, fs, mtime)
+            if heap[0] < candidate:
+                heapq.heapreplace(heap, candidate)
+
+    for dir_count, (dirpath, filenames) in enumerate(walk):
+        if cancel_event is not None and dir_count % CANCEL_CHECK_INTERVAL == 0 and cancel_event.is_set():
+            break
+        depth = dirpath.count(os.sep)
+        if level_order and depth != level:
+            # 进入新的一层：之前各层中凑满 top_k 个的完美匹配已是最终结果
+            level = depth
+            settled.update(name for name, heap in best.items() if len(heap) == top_k and heap[0].quality == 0)
+            if len(settled) == len(names) - len(compiled.invalid):
+                break
+        # 只有目录部分与当前目录相符的路径片段才参与比较
+        targets = compiled.targets_in(compiled.relative_parts(dirpath, root_dir)) if compiled.path_names \
+            else compiled.plain_targets
+        entries += len(filenames)
+        comparisons += max(len(targets) - len(settled), 0) * len(filenames)
+        # 与名称比较的是文件名的匹配键（每个目录项只转换一次），候选路径仍使用原始文件名
+        keys = [match_key(filename) for filename in filenames] if normalize else filenames
+
+        if mode == 'exact':
+            # 先在整个目录的文件名拼接串中查找一次（C 层面的子串搜索），命中的名称才逐个文件比较
+            joined = '\n'.join(keys)
+            for name_to_find, needle in targets:
+                if name_to_find not in settled and needle in joined:
+                    for filename, key in zip(filenames, keys):
+                        if needle in key:
+                            offer(name_to_find, match_quality(mode, needle, key), depth, dirpath, filename)
+        elif mode == 'fuzzy':
+            ratio = compiled.fuzz.ratio
+            for filename, key in zip(filenames, keys):
+                for name_to_find, needle in targets:
+                    if name_to_find not in settled:
+                        score = ratio(needle, key)
+                        if score >= compiled.min_fuzzy_score:
+                            offer(name_to_find, match_quality(mode, needle, key, score=score), depth,
+                                  dirpath, filename)
+        elif mode == 'regex':
+            for filename, key in zip(filenames, keys):
+                for name_to_find, pattern in targets:
+                    if name_to_find not in settled and pattern.search(key):
+                        offer(name_to_find, match_quality(mode, name_to_find, key, pattern=pattern), depth,
+                              dirpath, filename)
+        elif mode == 'glob':
+            # 不含目录部分的模式由 GlobMatcher 分桶匹配，路径片段逐个比较
+            matches = compiled.glob.matches
+            path_targets = targets[len(compiled.plain_targets):]
+            for filename, key in zip(filenames, keys):
+                for name_to_find in matches(key):
+                    if name_to_find not in settled:
+                        offer(name_to_find, 0, depth, dirpath, filename)
+                for name_to_find, pattern in path_targets:
+                    if name_to_find not in settled and pattern.match(key):
+                        offer(name_to_find, 0, depth, dirpath, filename)
+
+    if stats is not None:
+        stats['entries'] += entries
+        stats['comparisons'] += comparisons
+    return {name: [(candidate.path, candidate.rank()) for candidate in sorted(heap, reverse=True)]
+            for name, heap in best.items()}
+
+
+def worker_main(worker_index, inbox, outbox, cancel_event):
+    """
+    子进程主循环。
+
+    inbox 中的消息:
+        ('job', job_id, spec)            安装新任务的匹配规格
+        ('task', job_id, task_id, root)  扫描一个根目录
+        ('stop',)                        退出进程
+    outbox 中的消息:
+        ('done', worker_index, job_id, task_id, (found_files, 扫描统计))，found_files 见 scan_root
+        ('error', worker_index, job_id, task_id, 错误信息)
+    """
+    job_id = None
+    compiled = None
+    while True:
+        message = inbox.get()
+        kind = message[0]
+        if kind == 'stop':
+            break
+        if kind == 'job':
+            job_id = message[1]
+            try:
+                compiled = CompiledSpec(message[2])
+            except Exception as e:
+                compiled = None
+                outbox.put(('error', worker_index, job_id, None, f"{type(e).__name__}: {e}"))
+        elif kind == 'task':
+            _, task_job_id, task_id, root_dir = message
+            if compiled is None or task_job_id != job_id:
+                outbox.put(('error', worker_index, task_job_id, task_id, "扫描进程尚未收到任务的匹配规格"))
+                continue
+            try:
+                stats = new_scan_stats()
+                wall, cpu = time.perf_counter(), time.process_time()
+                found_files = scan_root(root_dir, compiled, cancel_event, stats)
+                stats['wall'] = time.perf_counter() - wall
+                stats['cpu'] = time.process_time() - cpu
+                outbox.put(('done', worker_index, job_id, task_id, (found_files, stats)))
+            except Exception as e:
+                outbox.put(('error', worker_index, job_id, task_id, f"{type(e).__name__}: {e}"))
@@ -0,0 +1,58 @@
+"""
+search_worker.py
+
+该模块把不依赖界面的 SearchEngine 适配为 Qt 工作者对象：
+引擎的事件回调被转换为 Qt 信号，在独立线程中运行。
+"""
+from PyQt5.QtCore import QObject, pyqtSignal
+from file_operations import SearchEngine, SearchEvents
+
+
+class SearchWorker(QObject, SearchEvents):
+    """
+    一个在独立线程中执行搜索和复制任务的工作者类。
+    """
+    finished = pyqtSignal()
+    progress = pyqtSignal(int, int, str)
+    # 复制过程中分批推送的结果行 [[文件名, 状态, 候选...], ...]，列见 file_operations.report_columns
+    rows_ready = pyqtSignal(list)
+    # 任务结束时按 Excel 顺序整理好的完整结果行，界面直接使用而无需重新读取文件
+    report_ready = pyqtSignal(list)
+
+    def __init__(self, *args, **kwargs):
+        """初始化工作者，参数与 SearchEngine 相同（events 除外）。"""
+        super().__init__()
+        self.engine = SearchEngine(*args, events=self, **kwargs)
+
+    @property
+    def log_sink(self):
+        """引擎的日志汇集器，由界面定时批量取走日志。"""
+        return self.engine.log_sink
+
+    @property
+    def metrics(self):
+        """引擎的运行指标，任务结束后由界面显示。"""
+        return self.engine.metrics
+
+    def stop(self):
+        """停止当前任务。"""
+        self.engine.stop()
+
+    def run(self):
+        """开始执行任务。"""
+        try:
+            self.engine.run()
+        finally:
+            self.finished.emit()
+
+    def on_progress(self, current, total, message):
+        """将引擎的进度转发为 Qt 信号。"""
+        self.progress.emit(current, total, message)
+
+    def on_rows(self, rows):
+        """将引擎的结果行转发为 Qt 信号。"""
+        self.rows_ready.emit(rows)
+
+    def on_report(self, rows):
+        """将引擎的完整结果转发为 Qt 信号。"""
+        self.report_ready.emit(rows)
@@ -0,0 +1,59 @@
+from autotune import ConcurrencyTuner, TuningStore, tuning_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_slow_start_then_back_off():
+    tuner = ConcurrencyTuner(2, maximum=64, slow_start=True)
+    assert tuner.observe(100) == 4
+    assert tuner.observe(200) == 8
+    # 吞吐量不再上升：保持不变并结束慢启动
+    assert tuner.observe(201) == 8
+    # 吞吐量下降：按比例回退
+    assert tuner.observe(150) == 6
+    # 并发数 8 的两次测量平滑后低于并发数 4
+    assert tuner.rates[8] == 175.5
+    assert tuner.best == 4
+
+
+def test_flat_rate_probes_after_a_few_windows():
+    tuner = ConcurrencyTuner(4, slow_start=False)
+    assert tuner.observe(100) == 5
+    limits = [tuner.observe(100) for _ in range(4)]
+    assert limits == [5, 5, 5, 6]
+
+
+def test_limit_stays_in_range():
+    tuner = ConcurrencyTuner(3, minimum=1, maximum=4)
+    for rate in (10, 20, 40, 80, 160):
+        assert 1 <= tuner.observe(rate) <= 4
+    assert tuner.limit == 4
+
+
+def test_record_measures_windows():
+    clock = FakeClock()
+    tuner = ConcurrencyTuner(2, window=1.0, clock=clock)
+    assert tuner.record(500) == 2
+    clock.now = 1.0
+    assert tuner.record(500) == 4
+    assert tuner.rates == {2: 1000.0}
+    assert tuner.best is None
+
+
+def test_tuning_store_round_trip(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{"language": "en"}', encoding='utf-8')
+    store = TuningStore(str(path))
+    assert store.lookup(['/a'], '/out') == {}
+    store.remember(['/a', '/b'], '/out', scan_workers=6, copy_workers=None)
+    store.remember(['/b', '/a'], '/out', copy_workers=12)
+    entry = store.lookup(['/b', '/a'], '/out')
+    assert entry['scan_workers'] == 6 and entry['copy_workers'] == 12
+    assert '"language": "en"' in path.read_text(encoding='utf-8')
+    assert tuning_key(['/a', '/b'], '/out') == tuning_key(['/b', '/a'], '/out')
@@ -0,0 +1,21 @@
+from cli import CLI_FLAG, build_parser, wants_cli
+
+
+def test_wants_cli_for_known_options():
+    assert wants_cli(['--list', 'names.xlsx', '--root', '/mnt', '--target', 'out'])
+    assert wants_cli(['--from-plan=plan.json'])
+    assert wants_cli(['--serve', '--root', '/mnt'])
+    assert wants_cli(['-h'])
+    assert wants_cli(['--cli'])
+
+
+def test_wants_cli_ignores_other_arguments():
+    assert not wants_cli(['-style', 'fusion'])
+    assert not wants_cli(['names.xlsx'])
+    assert not wants_cli(['-psn_0_12345'])
+
+
+def test_build_parser_records_options_of_groups():
+    options = build_parser().options
+    assert {'-h', '--help', '--list', '-q', '--quiet', '--ext', '--from-plan', '--serve', '--no-watch'} <= options
+    assert CLI_FLAG not in options
@@ -0,0 +1,110 @@
+"""copy_plan 与试运行 / 按计划复制。"""
+import os
+import json
+import pytest
+import cli
+from copy_plan import CopyPlan, build_plan, candidate_dir_name, destinations
+from file_operations import report_columns
+from fs_backend import LocalFS
+
+
+def _make_tree(base):
+    for relative, content in (('src/a/x.txt', '1'), ('src/b/x.txt', '22'), ('src/c/y.txt', '333')):
+        path = base / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    (base / 'names.txt').write_text('a/x.txt\nb/x.txt\ny.txt\nmissing.txt\n', encoding='utf-8')
+
+
+def test_destinations_copy_all_prefixes_duplicates():
+    assert destinations('n', ['/a/x.txt', '/b/x.txt'], copy_all=True) == [
+        os.path.join('n', 'x.txt'), os.path.join('n', '2_x.txt')]
+    assert destinations('n', ['/a/x.txt'], copy_all=False) == ['x.txt']
+
+
+def test_build_plan_totals_collisions_and_absolute_paths(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    candidates = {'a/x.txt': ['src/a/x.txt'], 'b/x.txt': ['src/b/x.txt'], 'y.txt': ['src/c/y.txt']}
+    plan = build_plan(['a/x.txt', 'b/x.txt', 'y.txt', 'missing.txt'], candidates, 'out', LocalFS(),
+                      roots=['src'])
+    assert plan.totals['files'] == 3 and plan.totals['bytes'] == 6
+    assert plan.totals['missing'] == 1
+    assert plan.collisions == {'x.txt': ['a/x.txt', 'b/x.txt']}
+    assert all(os.path.isabs(path) for path in plan.sources())
+    assert all(os.path.isabs(path) for paths in plan.candidates.values() for path in paths)
+    assert plan.settings['roots'] == [str(tmp_path / 'src')]
+
+    plan.save('plan.json')
+    loaded = CopyPlan.load('plan.json')
+    assert loaded.to_dict() == plan.to_dict()
+
+
+def test_load_rejects_other_versions(tmp_path):
+    path = tmp_path / 'plan.json'
+    path.write_text(json.dumps({'version': 0}))
+    with pytest.raises(ValueError):
+        CopyPlan.load(str(path))
+
+
+def test_from_plan_in_another_working_directory(tmp_path, monkeypatch):
+    """相对的根目录生成的计划，从其他工作目录按计划复制时仍能找到源文件。"""
+    work = tmp_path / 't'
+    work.mkdir()
+    _make_tree(work)
+    monkeypatch.chdir(work)
+    code = cli.main(['--list', 'names.txt', '--root', 'src', '--target', 'out', '--format', 'csv',
+                     '--plan', 'plan.json', '-q'])
+    assert code == cli.EXIT_INCOMPLETE  # missing.txt 未找到
+    assert not os.path.exists('out')
+
+    monkeypatch.chdir(tmp_path)
+    code = cli.main(['--from-plan', 't/plan.json', '--format', 'csv', '-q'])
+    assert code == cli.EXIT_INCOMPLETE
+    assert sorted(os.listdir(work / 'out')) == ['x.txt', 'y.txt']
+    with open(work / 'names_updated.csv', encoding='utf-8-sig') as f:
+        rows = f.read().splitlines()
+    assert rows[1:] == ['a/x.txt,✅ 已找到', 'b/x.txt,✅ 已找到', 'y.txt,✅ 已找到', 'missing.txt,❌ 未找到或复制失败']
+
+
+def test_from_plan_with_unresolvable_sources_keeps_previous_report(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    assert cli.main(['--list', 'names.txt', '--root', 'src', '--target', 'out', '--format', 'csv',
+                     '--plan', 'plan.json', '-q']) == cli.EXIT_INCOMPLETE
+    report = tmp_path / 'names_updated.csv'
+    report.write_text('previous', encoding='utf-8')
+    plan = json.loads((tmp_path / 'plan.json').read_text(encoding='utf-8'))
+    for entries in plan['copies'].values():
+        for entry in entries:
+            entry['source'] = entry['source'].replace(str(tmp_path), str(tmp_path / 'gone'))
+    (tmp_path / 'plan.json').write_text(json.dumps(plan), encoding='utf-8')
+
+    assert cli.main(['--from-plan', 'plan.json', '--format', 'csv', '-q']) == cli.EXIT_ERROR
+    assert report.read_text(encoding='utf-8') == 'previous'
+    assert not os.listdir(tmp_path / 'out')
+
+
+def test_report_columns_per_candidate():
+    assert report_columns() == ['文件名', '状态']
+    assert report_columns(1) == ['文件名', '状态']
+    assert report_columns(3) == ['文件名', '状态', '候选1', '候选2', '候选3']
+
+
+def test_copy_all_copies_candidates_into_per_name_subfolders(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    (tmp_path / 'names.txt').write_text('x.txt\ny.txt\n', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    code = cli.main(['--list', 'names.txt', '--root', 'src', '--target', 'out', '--format', 'csv',
+                     '--top-k', '2', '--copy-all', '-q'])
+    assert code == cli.EXIT_OK
+    # 每个名称的全部候选放在以名称命名的子文件夹中，重名的候选加序号前缀
+    subdirs = {name: candidate_dir_name(name) for name in ('x.txt', 'y.txt')}
+    assert sorted(os.listdir(tmp_path / 'out')) == sorted(subdirs.values())
+    assert sorted(os.listdir(tmp_path / 'out' / subdirs['x.txt'])) == ['2_x.txt', 'x.txt']
+    assert os.listdir(tmp_path / 'out' / subdirs['y.txt']) == ['y.txt']
+    contents = {(tmp_path / 'out' / subdirs['x.txt'] / name).read_text() for name in ('x.txt', '2_x.txt')}
+    assert contents == {'1', '22'}
+    with open(tmp_path / 'names_updated.csv', encoding='utf-8-sig') as f:
+        header = f.readline().strip()
+    assert header == ','.join(report_columns(2))
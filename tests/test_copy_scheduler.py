@@ -0,0 +1,65 @@
+"""按源文件位置安排复制顺序。"""
+import os
+import stat
+
+import copy_scheduler
+from copy_scheduler import LARGE_FILE_THRESHOLD, schedule_copies, stat_sources
+
+
+class FakeStat:
+    def __init__(self, ino, size, mode=stat.S_IFREG, dev=1):
+        self.st_dev = dev
+        self.st_ino = ino
+        self.st_size = size
+        self.st_mode = mode
+
+
+class FakeFS:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def stat(self, path):
+        try:
+            return self.stats[path]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+
+def _names(batch):
+    return [item.name for item in batch]
+
+
+def test_stat_sources_marks_unreadable():
+    fs = FakeFS({'/a': FakeStat(1, 10)})
+    stats = stat_sources(['/a', '/missing'], fs, workers=4)
+    assert stats['/a'].st_ino == 1
+    assert stats['/missing'] is None
+
+
+def test_schedule_groups_by_directory_and_inode():
+    fs = FakeFS({
+        '/d1/z': FakeStat(3, 10), '/d1/y': FakeStat(1, 10), '/d2/x': FakeStat(2, 10),
+        '/d1/big': FakeStat(9, LARGE_FILE_THRESHOLD), '/d1/sub': FakeStat(5, 0, mode=stat.S_IFDIR),
+    })
+    units = [('z', ['/d1/z']), ('x', ['/d2/x']), ('missing', []), ('big', ['/d1/big']),
+             ('y', ['/d1/y']), ('sub', ['/d1/sub'])]
+    schedule = schedule_copies(units, fs, workers=2)
+    assert schedule.missing == ['missing']
+    # 同一目录的小文件按 inode 顺序放在同一批
+    assert [_names(batch) for batch in schedule.batches] == [['y', 'z'], ['x']]
+    # 大文件和目录走大文件通道，同样按位置排序
+    assert _names(schedule.large) == ['sub', 'big']
+    assert schedule.batches[0][0].stats[0] is fs.stats['/d1/y']
+
+
+def test_batches_are_bounded(monkeypatch):
+    monkeypatch.setattr(copy_scheduler, 'BATCH_MAX_FILES', 3)
+    fs = FakeFS({os.path.join('/d', str(index)): FakeStat(index, 1) for index in range(7)})
+    schedule = schedule_copies([(str(index), [os.path.join('/d', str(index))]) for index in range(7)], fs)
+    assert [len(batch) for batch in schedule.batches] == [3, 3, 1]
+
+
+def test_unreadable_sources_are_still_scheduled():
+    schedule = schedule_copies([('gone', ['/nowhere/gone'])], FakeFS({}))
+    assert _names(schedule.batches[0]) == ['gone']
+    assert schedule.batches[0][0].stats == [None]
@@ -0,0 +1,124 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+pytest.importorskip('PyQt5')
+pytest.importorskip('pandas')
+
+from excel_model import ExcelTableModel, TableFilterProxyModel
+
+
+def _proxy_rows(proxy):
+    return [proxy.mapToSource(proxy.index(row, 0)).data() for row in range(proxy.rowCount())]
+
+
+def _filtered(rows, text):
+    model = ExcelTableModel()
+    model.set_rows(rows, ['name', 'note'])
+    proxy = TableFilterProxyModel()
+    proxy.setSourceModel(model)
+    proxy.set_filter(text)
+    resets = []
+    proxy.modelReset.connect(lambda: resets.append(True))
+    return model, proxy, resets
+
+
+def test_filtered_insert_is_incremental():
+    model, proxy, resets = _filtered([['apple', ''], ['pear', ''], ['apple pie', '']], 'apple')
+    inserted = []
+    proxy.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+    model.append_rows([['kiwi', ''], ['green apple', ''], ['apple', 'x']])
+    assert _proxy_rows(proxy) == ['apple', 'apple pie', 'green apple', 'apple']
+    assert inserted == [(2, 3)]
+    assert not resets
+
+    model.insertRows(1, 1)
+    # 新插入的空行不符合条件；之后的行号整体后移
+    assert _proxy_rows(proxy) == ['apple', 'apple pie', 'green apple', 'apple']
+    assert proxy.mapToSource(proxy.index(1, 0)).row() == 3
+    assert not resets
+
+
+def test_filtered_remove_shifts_rows():
+    model, proxy, resets = _filtered([['apple', ''], ['pear', ''], ['apple pie', ''], ['kiwi', ''],
+                                      ['green apple', '']], 'apple')
+    removed = []
+    proxy.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+
+    # 删除的行都不在筛选结果中
+    model.removeRows(1, 1)
+    assert _proxy_rows(proxy) == ['apple', 'apple pie', 'green apple']
+    assert removed == []
+
+    model.removeRows(0, 2)
+    assert _proxy_rows(proxy) == ['green apple']
+    assert [proxy.mapToSource(proxy.index(row, 0)).row() for row in range(proxy.rowCount())] == [1]
+    assert removed == [(0, 1)]
+    assert not resets
+
+    proxy.set_filter('')
+    assert _proxy_rows(proxy) == ['kiwi', 'green apple']
+
+
+def test_cleanup_empty_rows_removes_ranges_bottom_up():
+    model = ExcelTableModel()
+    model.set_rows([['a', '1'], ['', ''], ['b', '2'], ['', ''], ['', ''], ['c', '3']], ['name', 'note'])
+    signals = []
+    model.rowsRemoved.connect(lambda parent, first, last: signals.append(
+        ('removed', first, last, model.rowCount(), [model.index(row, 0).data() for row in range(model.rowCount())])))
+    model.modelReset.connect(lambda: signals.append(('reset',)))
+
+    model.cleanup_empty_rows(full=True)
+    assert model.df['name'].tolist() == ['a', 'b', 'c']
+    assert list(model.df.index) == [0, 1, 2]
+    # 每个连续区间一次删除信号，从下往上；每次信号之后模型的行数和内容都与已删除的区间一致
+    assert signals == [('removed', 3, 4, 4, ['a', '', 'b', 'c']), ('removed', 1, 1, 3, ['a', 'b', 'c'])]
+
+    # 单个连续区间按行删除
+    signals.clear()
+    model.insertRows(1, 2)
+    model.cleanup_empty_rows(full=True)
+    assert model.df['name'].tolist() == ['a', 'b', 'c']
+    assert [signal[:3] for signal in signals] == [('removed', 1, 2)]
+
+    # 至少保留一行
+    model.set_rows([['', ''], ['', '']], ['name', 'note'])
+    model.cleanup_empty_rows(full=True)
+    assert model.rowCount() == 1
+
+
+def _track_data_changed(model):
+    changes = []
+    model.dataChanged.connect(lambda top_left, bottom_right, roles: changes.append(
+        ((top_left.row(), top_left.column()), (bottom_right.row(), bottom_right.column()))))
+    return changes
+
+
+def test_set_block_emits_one_data_changed():
+    model = ExcelTableModel()
+    model.set_rows([['a', '1', 'x'], ['b', '2', 'y'], ['c', '3', 'z']], ['name', 'note', 'extra'])
+    changes = _track_data_changed(model)
+
+    # None 保持原值；超出列范围的部分被忽略
+    assert model.set_block(1, 1, [['p', None, 'ignored'], [None, 'q']])
+    assert changes == [((1, 1), (2, 2))]
+    assert model.df.values.tolist() == [['a', '1', 'x'], ['b', 'p', 'y'], ['c', '3', 'q']]
+
+    changes.clear()
+    assert not model.set_block(3, 0, [['out of range']])
+    assert changes == []
+
+
+def test_clear_cells_emits_bounding_rectangle():
+    model = ExcelTableModel()
+    model.set_rows([['a', '1', 'x'], ['b', '2', 'y'], ['c', '3', 'z']], ['name', 'note', 'extra'])
+    changes = _track_data_changed(model)
+
+    # 不连续的选区：只清空选中的单元格，信号覆盖整个外接矩形
+    assert model.clear_cells([model.index(0, 0), model.index(2, 1)])
+    assert changes == [((0, 0), (2, 1))]
+    assert model.df.values.tolist() == [['', '1', 'x'], ['b', '2', 'y'], ['c', '', 'z']]
+    assert not model.clear_cells([])
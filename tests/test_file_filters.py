@@ -0,0 +1,65 @@
+import datetime
+import os
+
+import pytest
+
+from file_filters import FileFilter, combine_filters, parse_extensions, parse_size, parse_time
+
+
+class Stat:
+    def __init__(self, size, mtime):
+        self.st_size = size
+        self.st_mtime = mtime
+
+
+def test_parse_helpers():
+    assert parse_extensions('pdf, .XLSX;dwg pdf') == ('.pdf', '.xlsx', '.dwg')
+    assert parse_extensions(None) == ()
+    assert parse_size('10KB') == 10 * 1024
+    assert parse_size('1.5 MiB') == int(1.5 * 1024 ** 2)
+    assert parse_size('2048') == 2048
+    assert parse_size('') is None
+    with pytest.raises(ValueError):
+        parse_size('ten')
+    day = datetime.datetime(2024, 3, 1)
+    assert parse_time('2024-03-01') == day.timestamp()
+    assert parse_time('2024-03-01', end=True) == (day + datetime.timedelta(days=1)).timestamp()
+    with pytest.raises(ValueError):
+        parse_time('yesterday')
+
+
+def test_from_fields_and_checks():
+    assert FileFilter.from_fields() is None
+    file_filter = FileFilter.from_fields('pdf', '1KB', '1MB', '2024-03-01', '2024-03-31')
+    assert file_filter.needs_stat
+    assert file_filter.accepts_name('Report.PDF')
+    assert not file_filter.accepts_name('report.txt')
+    inside = datetime.datetime(2024, 3, 31, 23, 59).timestamp()
+    assert file_filter.accepts_stat(Stat(2048, inside))
+    assert not file_filter.accepts_stat(Stat(100, inside))
+    assert not file_filter.accepts_stat(Stat(2048, datetime.datetime(2024, 4, 1).timestamp()))
+    with pytest.raises(ValueError):
+        FileFilter.from_fields(min_size='2MB', max_size='1MB')
+    with pytest.raises(ValueError):
+        FileFilter.from_fields(modified_from='2024-04-01', modified_to='2024-03-01')
+
+
+def test_accepts_entry(tmp_path):
+    (tmp_path / 'small.pdf').write_bytes(b'x' * 10)
+    (tmp_path / 'big.pdf').write_bytes(b'x' * 4096)
+    (tmp_path / 'big.txt').write_bytes(b'x' * 4096)
+    file_filter = FileFilter(('.pdf',), min_size=1024)
+    with os.scandir(tmp_path) as entries:
+        assert sorted(entry.name for entry in entries if file_filter.accepts_entry(entry)) == ['big.pdf']
+
+
+def test_combine_and_round_trip():
+    job = FileFilter(('.pdf', '.dwg'), min_size=100)
+    row = FileFilter(('.pdf',), min_size=10, max_size=1000)
+    combined = job.combine(row)
+    assert combined == FileFilter(('.pdf',), 100, 1000)
+    # 扩展名没有交集时不接受任何文件
+    assert not FileFilter(('.txt',)).combine(FileFilter(('.pdf',))).accepts_name('a.pdf')
+    assert FileFilter.from_dict(combined.to_dict()) == combined
+    assert combine_filters(job, {'a': row}, ['a', 'b']) == {'a': combined, 'b': job}
+    assert combine_filters(None, {'a': row}, ['a', 'b']) == {'a': row}
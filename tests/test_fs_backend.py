@@ -0,0 +1,81 @@
+"""fs_backend.LatencyFS：注入的延迟和带宽上限，以及在扫描子进程中的使用。"""
+import os
+import pickle
+
+import pytest
+
+import fs_backend
+from fs_backend import LatencyFS
+from scan_pool import ScanPool
+
+
+def _record_sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(fs_backend.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def test_metadata_calls_sleep_for_latency_with_jitter(tmp_path, monkeypatch):
+    sleeps = _record_sleeps(monkeypatch)
+    fs = LatencyFS(latency=0.05, jitter=0.01, seed=7)
+    fs.stat(str(tmp_path))
+    fs.scandir(str(tmp_path))
+    fs.exists(str(tmp_path))
+    fs.isfile(str(tmp_path))
+    assert len(sleeps) == 4
+    assert all(0.04 <= delay <= 0.06 for delay in sleeps)
+
+    # 相同的种子产生相同的抖动序列
+    again = _record_sleeps(monkeypatch)
+    other = LatencyFS(latency=0.05, jitter=0.01, seed=7)
+    for _ in range(4):
+        other.stat(str(tmp_path))
+    assert again == sleeps
+
+
+def test_copy_is_throttled_to_bandwidth(tmp_path, monkeypatch):
+    src = tmp_path / 'src.bin'
+    src.write_bytes(b'x' * (3 * fs_backend.COPY_CHUNK_SIZE))
+    clock = [100.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(fs_backend.time, 'sleep', fake_sleep)
+    monkeypatch.setattr(fs_backend.time, 'monotonic', lambda: clock[0])
+    bandwidth = fs_backend.COPY_CHUNK_SIZE * 10
+    fs = LatencyFS(latency=0.0, bandwidth=bandwidth)
+    assert fs.copy_file(str(src), str(tmp_path / 'dst.bin')) == src.stat().st_size
+    # 每块按带宽预约链路时间，总等待时间等于字节数 / 带宽
+    assert sleeps == pytest.approx([0.1, 0.1, 0.1])
+    assert (tmp_path / 'dst.bin').read_bytes() == src.read_bytes()
+
+
+def test_pickle_keeps_settings_and_recreates_runtime():
+    fs = LatencyFS(latency=0.02, bandwidth=1000, jitter=0.001, seed=3)
+    loaded = pickle.loads(pickle.dumps(fs))
+    assert (loaded.latency, loaded.bandwidth, loaded.jitter, loaded.seed) == (0.02, 1000, 0.001, 3)
+    assert loaded.stat(os.curdir)
+
+
+def test_latency_applies_inside_scan_workers(tmp_path):
+    latency = 0.05
+    for relative in ('a/one.txt', 'b/two.txt'):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('x')
+    pool = ScanPool(1)
+    try:
+        results = list(pool.scan({'names': frozenset(['two.txt']), 'mode': 'exact', 'fs': LatencyFS(latency)},
+                                 [str(tmp_path)]))
+    finally:
+        pool.shutdown()
+    [(_, found, error, stats)] = results
+    assert error is None
+    assert [path for path, _ in found['two.txt']] == [str(tmp_path / 'b' / 'two.txt')]
+    # 在子进程中测得的扫描耗时不少于每个目录一次的往返延迟
+    assert stats['pid'] != os.getpid()
+    assert stats['dirs'] == 3
+    assert stats['wall'] >= stats['dirs'] * latency
@@ -0,0 +1,60 @@
+import errno
+import os
+import sys
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify 只在 Linux 上可用')
+
+from fs_watcher import InotifyWatcher, PollingWatcher, _WatchLimitReached
+from index_service import FileIndex
+
+
+def _index(tmp_path):
+    (tmp_path / 'a').mkdir()
+    index = FileIndex([str(tmp_path)])
+    index.refresh()
+    return index
+
+
+def _is_open(fd):
+    try:
+        os.fstat(fd)
+    except OSError:
+        return False
+    return True
+
+
+def test_watch_limit_in_constructor(tmp_path, monkeypatch):
+    index = _index(tmp_path)
+
+    def limit_reached(self, dirpath):
+        raise _WatchLimitReached()
+
+    monkeypatch.setattr(InotifyWatcher, '_add_watch', limit_reached)
+    with pytest.raises(OSError) as excinfo:
+        InotifyWatcher(index)
+    assert excinfo.value.errno == errno.ENOSPC
+    assert excinfo.value.__suppress_context__
+
+
+def test_fallback_to_polling_closes_inotify_fd(tmp_path, monkeypatch):
+    index = _index(tmp_path)
+    watcher = InotifyWatcher(index)
+    assert _is_open(watcher._fd)
+
+    def limit_reached():
+        raise _WatchLimitReached()
+
+    monkeypatch.setattr(watcher, '_sync_watches', limit_reached)
+    watcher.start()
+    watcher.sync()
+    deadline = time.time() + 5
+    while watcher._fallback is None and time.time() < deadline:
+        time.sleep(0.01)
+    try:
+        assert isinstance(watcher._fallback, PollingWatcher)
+        assert watcher._fd == -1
+    finally:
+        watcher.stop()
@@ -0,0 +1,21 @@
+"""启动导入预算：入口模块的导入耗时不超过预算，且不会在导入阶段加载重量级模块。"""
+import pytest
+
+from benchmarks.import_budget import CHECKS, measure
+
+# 与 benchmarks/import_budget.py 的默认预算相同（秒）
+BUDGET = 1.0
+
+
+@pytest.mark.parametrize('module, forbidden', CHECKS, ids=[module for module, _ in CHECKS])
+def test_import_budget(module, forbidden):
+    if module == 'ui_elements':
+        pytest.importorskip('PyQt5')
+    elapsed, loaded = measure(module, forbidden)
+    assert not loaded, f"import {module} 提前加载了 {', '.join(loaded)}"
+    assert elapsed <= BUDGET, f"import {module} 耗时 {elapsed:.2f} s，超过预算 {BUDGET} s"
+
+
+def test_cli_does_not_load_gui_or_table_libraries():
+    _, loaded = measure('cli', ['PyQt5', 'pandas', 'openpyxl'])
+    assert loaded == []
@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from index_service import TOKEN_HEADER, IndexClient, IndexService, read_token
+
+
+@pytest.fixture
+def service(tmp_path):
+    root = tmp_path / 'root'
+    (root / 'sub').mkdir(parents=True)
+    (root / 'sub' / 'a.pdf').write_text('a')
+    (tmp_path / 'allowed').mkdir()
+    token_path = str(tmp_path / 'index_service.token')
+    service = IndexService([str(root)], port=0, refresh_interval=0, watch=False, token_path=token_path,
+                           allowed_targets=[str(tmp_path / 'allowed')])
+    thread = threading.Thread(target=service.serve_forever, daemon=True)
+    thread.start()
+    host, port = service.address
+    client = IndexClient(f'http://{host}:{port}', timeout=10, token_path=token_path)
+    deadline = time.time() + 10
+    while service.index.built_at is None and time.time() < deadline:
+        time.sleep(0.01)
+    yield service, client, tmp_path
+    service.shutdown()
+
+
+def _post(client, path, body, headers):
+    request = urllib.request.Request(client.url + path, data=json.dumps(body).encode('utf-8'), headers=headers)
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status
+
+
+def test_token_written_owner_only(service):
+    svc, client, _ = service
+    assert read_token(client.token_path) == svc.token
+    assert os.stat(client.token_path).st_mode & 0o777 == 0o600
+
+
+def test_post_requires_json_and_token(service):
+    svc, client, _ = service
+    body = {'names': ['a.pdf']}
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _post(client, '/lookup', body, {'Content-Type': 'application/json'})
+    assert excinfo.value.code == 403
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _post(client, '/lookup', body, {'Content-Type': 'text/plain', TOKEN_HEADER: svc.token})
+    assert excinfo.value.code == 415
+    assert _post(client, '/lookup', body, {'Content-Type': 'application/json', TOKEN_HEADER: svc.token}) == 200
+
+    found, uncovered = client.lookup(['a.pdf'])
+    assert [path for path, _ in found['a.pdf']] == [os.path.join(svc.index.roots[0], 'sub', 'a.pdf')]
+    assert uncovered == []
+
+
+def test_copy_target_allow_list(service):
+    _, client, tmp_path = service
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        client.copy(['a.pdf'], str(tmp_path / 'elsewhere'))
+    assert excinfo.value.code == 403
+    assert not (tmp_path / 'elsewhere').exists()
+    # 借助 .. 也不能跳出允许的目录
+    with pytest.raises(urllib.error.HTTPError):
+        client.copy(['a.pdf'], str(tmp_path / 'allowed' / '..' / 'elsewhere'))
+
+    result = client.copy(['a.pdf'], str(tmp_path / 'allowed' / 'out'))
+    assert result['summary']['copied'] == 1
+    assert (tmp_path / 'allowed' / 'out' / 'a.pdf').read_text() == 'a'
+
+
+def test_index_and_scan_agree_on_extensionless_names(tmp_path):
+    from file_operations import SearchEngine
+    from index_service import FileIndex
+
+    root = tmp_path / 'root'
+    (root / 'a' / 'b').mkdir(parents=True)
+    (root / 'invoice.pdf').write_text('stem')
+    (root / 'a' / 'b' / 'invoice').write_text('exact')
+    index = FileIndex([str(root)])
+    index.refresh()
+    found, _ = index.lookup(['invoice'])
+    assert [path for path, _ in found['invoice']] == [str(root / 'a' / 'b' / 'invoice')]
+
+    engine = SearchEngine(excel_path=None, names=['invoice'], target_dir=str(tmp_path / 'out'), roots=[str(root)],
+                          updated_excel_path=None, scan_workers=1)
+    assert engine._find_files_in_roots({'invoice'}) == {'invoice': str(root / 'a' / 'b' / 'invoice')}
@@ -0,0 +1,23 @@
+import os
+
+from log_sink import BatchedLogSink, new_log_path
+
+
+def test_new_log_path_unique_within_a_second(tmp_path):
+    paths = [new_log_path(str(tmp_path)) for _ in range(100)]
+    assert len(set(paths)) == len(paths)
+    assert all(os.path.basename(path).startswith('run_') and path.endswith('.log') for path in paths)
+    assert all(f'_{os.getpid()}_' in os.path.basename(path) for path in paths)
+
+
+def test_sink_writes_and_drains(tmp_path):
+    sink = BatchedLogSink(new_log_path(str(tmp_path)))
+    sink.open()
+    sink.success('found a')
+    sink.failed('missing b')
+    sink.close()
+    with open(sink.log_path, encoding='utf-8') as f:
+        text = f.read()
+    assert '[success] found a' in text and '[failed] missing b' in text
+    batches, _ = sink.drain()
+    assert batches == {BatchedLogSink.SUCCESS: ['found a'], BatchedLogSink.FAILED: ['missing b']}
@@ -0,0 +1,49 @@
+import pickle
+
+from path_store import PathStore
+
+
+def _store():
+    store = PathStore()
+    store.set_dir('/r', ['a.pdf', 'b.txt'], ['x', 'y', 'gone'])
+    store.set_dir('/r/x', ['a.pdf'], [])
+    store.set_dir('/r/y', [], ['z'])
+    store.set_dir('/r/y/z', ['c.dwg', 'a.pdf'], [])
+    store.set_dir('/r/gone', ['d.txt'], [])
+    store.remove_dir('/r/gone')
+    return store
+
+
+def test_reverse_lookup_and_counts():
+    store = _store()
+    assert len(store) == 4
+    assert store.entry_count == 5
+    assert sorted(store.paths_named('a.pdf')) == ['/r/a.pdf', '/r/x/a.pdf', '/r/y/z/a.pdf']
+    assert list(store.paths_named('d.txt')) == []
+    # 替换目录内容时同步更新反查表
+    store.set_dir('/r/x', ['e.pdf'], [])
+    assert sorted(store.paths_named('a.pdf')) == ['/r/a.pdf', '/r/y/z/a.pdf']
+    assert list(store.paths_named('e.pdf')) == ['/r/x/e.pdf']
+
+
+def test_pickle_round_trip():
+    store = _store()
+    loaded = pickle.loads(pickle.dumps(store))
+    assert len(loaded) == len(store)
+    assert loaded.entry_count == store.entry_count
+    assert sorted(loaded.dirs()) == sorted(store.dirs())
+    for dirpath in store.dirs():
+        assert loaded.get(dirpath) == store.get(dirpath)
+    assert '/r/gone' not in loaded
+    assert sorted(loaded.paths_named('a.pdf')) == sorted(store.paths_named('a.pdf'))
+    assert sorted(loaded.listing()) == sorted(store.listing())
+    # 加载后仍可继续更新
+    loaded.set_dir('/r/new', ['a.pdf'], [])
+    assert '/r/new/a.pdf' in loaded.paths_named('a.pdf')
+
+
+def test_pickle_empty_store():
+    loaded = pickle.loads(pickle.dumps(PathStore()))
+    assert len(loaded) == 0
+    assert loaded.entry_count == 0
+    assert loaded.listing() == []
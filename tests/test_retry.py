@@ -0,0 +1,44 @@
+"""只重试未找到的名称：读取上一次的报告并沿用已找到的结果。"""
+import json
+
+import pytest
+
+import cli
+from file_operations import read_report
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'json'])
+def test_read_report(tmp_path, suffix):
+    path = tmp_path / f'report.{suffix}'
+    rows = [['a.pdf', '✅ 已找到', '/r/a.pdf', '/r/x/a.pdf'], ['b.pdf', '❌ 未找到', '', ''],
+            ['a.pdf', '❌ 未找到', '', ''], ['', '', '', '']]
+    header = ['文件名', '状态', '候选1', '候选2']
+    if suffix == 'csv':
+        path.write_text('\n'.join(','.join(row) for row in [header] + rows), encoding='utf-8-sig')
+    else:
+        path.write_text(json.dumps([dict(zip(header, row)) for row in rows], ensure_ascii=False),
+                        encoding='utf-8')
+    # 同一名称出现多次时以第一行为准，空行被跳过
+    assert read_report(str(path)) == {'a.pdf': ('✅ 已找到', ['/r/a.pdf', '/r/x/a.pdf']),
+                                      'b.pdf': ('❌ 未找到', [])}
+
+
+def test_retry_misses_only_searches_missing_names(tmp_path, monkeypatch):
+    _write(tmp_path / 'first' / 'a.txt', 'a')
+    _write(tmp_path / 'names.txt', 'a.txt\nb.txt\n')
+    monkeypatch.chdir(tmp_path)
+    args = ['--list', 'names.txt', '--target', 'out', '--format', 'csv', '--report', 'report.csv', '-q']
+    assert cli.main(args + ['--root', 'first']) == cli.EXIT_INCOMPLETE
+
+    # 第二次只在新的根目录中查找 b.txt；其中的 a.txt 不应覆盖上一次的结果
+    _write(tmp_path / 'second' / 'a.txt', 'other')
+    _write(tmp_path / 'second' / 'b.txt', 'b')
+    assert cli.main(args + ['--root', 'second', '--retry-misses']) == cli.EXIT_OK
+    assert (tmp_path / 'out' / 'a.txt').read_text(encoding='utf-8') == 'a'
+    assert (tmp_path / 'out' / 'b.txt').read_text(encoding='utf-8') == 'b'
+    assert read_report('report.csv') == {'a.txt': ('✅ 已找到', []), 'b.txt': ('✅ 已找到', [])}
@@ -0,0 +1,13 @@
+from run_metrics import format_bytes
+
+
+def test_format_bytes():
+    assert format_bytes(0) == '0 B'
+    assert format_bytes(1023) == '1023 B'
+    assert format_bytes(1024) == '1.0 KiB'
+    assert format_bytes(1536) == '1.5 KiB'
+    assert format_bytes(5 * 1024 ** 2) == '5.0 MiB'
+    assert format_bytes(3 * 1024 ** 3) == '3.0 GiB'
+    assert format_bytes(2 * 1024 ** 4) == '2.0 TiB'
+    assert format_bytes(2048 * 1024 ** 4) == '2048.0 TiB'
+    assert format_bytes(-2048) == '-2.0 KiB'
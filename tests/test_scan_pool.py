@@ -0,0 +1,66 @@
+import os
+
+from autotune import ConcurrencyTuner
+from fs_backend import LocalFS
+from scan_pool import ScanPool
+
+
+class _InstallCountingFS(LocalFS):
+    """随匹配规格发送给子进程的文件系统后端：每次在子进程中解开（即安装一次规格）时记下进程号。"""
+
+    def __init__(self, log_path):
+        self.log_path = log_path
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(f'{os.getpid()}\n')
+
+
+def _make_roots(base, count):
+    roots = []
+    for index in range(count):
+        root = base / f'root{index}'
+        root.mkdir()
+        (root / f'file{index}.txt').write_text('x')
+        roots.append(str(root))
+    return roots
+
+
+def test_scan_with_tuner_limit(tmp_path):
+    roots = _make_roots(tmp_path, 4)
+
+    tuner = ConcurrencyTuner(1, maximum=1)
+    pool = ScanPool(2)
+    try:
+        results = list(pool.scan({'names': frozenset(['file0.txt', 'file3.txt']), 'mode': 'exact'}, roots, tuner))
+    finally:
+        pool.shutdown()
+    assert sorted(root for root, _, _, _ in results) == roots
+    assert all(error is None for _, _, error, _ in results)
+    found = {name: paths for _, result, _, _ in results for name, paths in result.items()}
+    assert [path for path, _ in found['file3.txt']] == [os.path.join(roots[3], 'file3.txt')]
+
+
+def test_warm_pool_installs_spec_once_per_worker_and_job(tmp_path):
+    roots = _make_roots(tmp_path, 6)
+    log_path = str(tmp_path / 'installs.log')
+    pool = ScanPool(2)
+    try:
+        pids = []
+        for names in (['file0.txt'], ['file5.txt']):
+            spec = {'names': frozenset(names), 'mode': 'exact', 'fs': _InstallCountingFS(log_path)}
+            results = list(pool.scan(spec, roots))
+            assert all(error is None for _, _, error, _ in results)
+            assert sum(len(found) for _, found, _, _ in results) == 1
+            pids.append({stats['pid'] for _, _, _, stats in results})
+    finally:
+        pool.shutdown()
+    # 两次任务由同一组子进程执行
+    assert pids[0] == pids[1]
+    assert os.getpid() not in pids[0]
+    # 12 个扫描任务，每个子进程每次任务只安装一次规格
+    with open(log_path, encoding='utf-8') as f:
+        installs = f.read().split()
+    assert len(installs) == 2 * len(pids[0])
+    assert set(map(int, installs)) == pids[0]
@@ -0,0 +1,176 @@
+import os
+import re
+import unicodedata
+
+import pytest
+
+from scan_worker import (CompiledSpec, GlobMatcher, compile_pattern, invalid_patterns, match_key, merge_ranked,
+                         new_scan_stats, scan_root, split_path_name, walk_unique)
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('x')
+
+
+def test_split_path_name_exact_and_backslash():
+    assert split_path_name('invoice.pdf', 'exact') is None
+    assert split_path_name('2023/Q4/invoice.pdf', 'exact') == (False, ('2023', 'Q4'), 'invoice.pdf')
+    assert split_path_name('2023\\Q4\\invoice.pdf', 'fuzzy') == (False, ('2023', 'Q4'), 'invoice.pdf')
+    assert split_path_name('/2023/./invoice.pdf', 'exact') == (True, ('2023',), 'invoice.pdf')
+
+
+def test_split_path_name_regex():
+    # 正则表达式模式下 \ 是转义符
+    assert split_path_name(r'a\d+\.pdf', 'regex') is None
+    assert split_path_name(r'20\d\d/inv_\d+\.pdf', 'regex') == (False, (r'20\d\d',), r'inv_\d+\.pdf')
+    # 字符集中的 / 拆开后不是有效的正则表达式，整个名称与文件名比较
+    assert split_path_name(r'[^/]+\.pdf', 'regex') is None
+
+
+def test_regex_with_slash_in_character_class(tmp_path):
+    _touch(str(tmp_path / 'docs' / 'report.pdf'))
+    _touch(str(tmp_path / 'docs' / 'notes.txt'))
+    compiled = CompiledSpec({'names': frozenset([r'[^/]+\.pdf']), 'mode': 'regex'})
+    assert not compiled.invalid
+    found = scan_root(str(tmp_path), compiled)
+    assert [path for path, _ in found[r'[^/]+\.pdf']] == [str(tmp_path / 'docs' / 'report.pdf')]
+
+
+def test_invalid_regex_only_affects_its_name(tmp_path):
+    _touch(str(tmp_path / 'a1.pdf'))
+    names = frozenset([r'a\d\.pdf', 'b[', r'x/(y'])
+    assert set(invalid_patterns(names, 'regex')) == {'b[', r'x/(y'}
+    assert invalid_patterns(names, 'exact') == {}
+    compiled = CompiledSpec({'names': names, 'mode': 'regex'})
+    assert set(compiled.invalid) == {'b[', r'x/(y'}
+    found = scan_root(str(tmp_path), compiled)
+    assert set(found) == {r'a\d\.pdf'}
+
+
+def test_glob_matcher_buckets():
+    matcher = GlobMatcher()
+    for name in ('report.pdf', '*.pdf', 'inv_*', '*2023*', 'data_??.csv'):
+        matcher.add(name, compile_pattern('glob', name))
+    assert sorted(matcher.matches('report.pdf')) == ['*.pdf', 'report.pdf']
+    assert sorted(matcher.matches('inv_2023.txt')) == ['*2023*', 'inv_*']
+    assert matcher.matches('data_01.csv') == ['data_??.csv']
+    assert matcher.matches('data_001.csv') == []
+    assert matcher.matches('README') == []
+
+
+def test_match_key():
+    assert match_key('Report.PDF') == 'report.pdf'
+    assert match_key('  a \t b  ') == 'a b'
+    # 全角字符经 NFKC 转换为半角
+    assert match_key('ＡＢＣ１２３.pdf') == 'abc123.pdf'
+    assert match_key('Straße') == 'strasse'
+
+
+def test_merge_ranked_keeps_best_top_k():
+    roots = ['/r0', '/r1']
+    merged = {}
+    added = merge_ranked(merged, {'a': [('/r1/a', (0, 1, 0.0, '/r1/a'))]}, roots, top_k=2)
+    assert added == ['a']
+    added = merge_ranked(merged, {'a': [('/r0/x/a', (0, 2, 0.0, '/r0/x/a')), ('/r0/a.txt', (1, 1, 0.0, '/r0/a.txt'))],
+                                  'b': [('/r0/b', (0, 1, 0.0, '/r0/b'))]}, roots, top_k=2)
+    assert added == ['b']
+    # 质量优先，其次根目录优先级
+    assert [path for _, path in merged['a']] == ['/r0/x/a', '/r1/a']
+    # 同一路径不重复计入
+    merge_ranked(merged, {'a': [('/r1/a', (0, 1, 0.0, '/r1/a'))]}, roots, top_k=2)
+    assert [path for _, path in merged['a']] == ['/r0/x/a', '/r1/a']
+
+
+def test_compile_pattern_normalize():
+    assert compile_pattern('glob', 'REPORT*.PDF', normalize=True).match('report_1.pdf')
+    assert compile_pattern('regex', r'REPORT\d', normalize=True).flags & re.IGNORECASE
+
+
+def test_deeper_exact_match_beats_shallower_stem_match(tmp_path):
+    _touch(str(tmp_path / 'invoice.pdf'))
+    _touch(str(tmp_path / 'a' / 'b' / 'invoice'))
+    compiled = CompiledSpec({'names': frozenset(['invoice']), 'mode': 'exact', 'top_k': 2})
+    found = scan_root(str(tmp_path), compiled)
+    # 与名称完全相同的文件（质量 0）排在去掉扩展名后相同的文件（质量 1）之前，与深度无关
+    assert [path for path, _ in found['invoice']] == [str(tmp_path / 'a' / 'b' / 'invoice'),
+                                                      str(tmp_path / 'invoice.pdf')]
+
+
+def _walked_files(root):
+    stats = new_scan_stats()
+    files = [os.path.join(dirpath, name) for dirpath, filenames in walk_unique(root, stats) for name in filenames]
+    return files, stats
+
+
+def _symlink(target, link):
+    try:
+        os.symlink(target, link, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip('无法创建符号链接')
+
+
+def test_walk_unique_skips_symlink_cycle(tmp_path):
+    _touch(str(tmp_path / 'a' / 'b' / 'f.txt'))
+    _symlink(str(tmp_path / 'a'), str(tmp_path / 'a' / 'b' / 'loop'))
+    files, stats = _walked_files(str(tmp_path))
+    assert files == [str(tmp_path / 'a' / 'b' / 'f.txt')]
+    assert stats['duplicates'] == 1
+    assert stats['dirs'] == 3
+
+
+def test_walk_unique_scans_linked_directory_once(tmp_path):
+    _touch(str(tmp_path / 'data' / 'g.txt'))
+    _symlink(str(tmp_path / 'data'), str(tmp_path / 'alias'))
+    _symlink(str(tmp_path / 'data'), str(tmp_path / 'more'))
+    files, stats = _walked_files(str(tmp_path))
+    # 同一层按名称排序，经由名称最小的路径扫描一次
+    assert files == [str(tmp_path / 'alias' / 'g.txt')]
+    assert stats['duplicates'] == 2
+
+
+def test_glob_scan_selects_buckets(tmp_path):
+    for relative in ('report.pdf', 'inv_2023.txt', 'data_01.csv', 'data_001.csv', 'README',
+                     'sub/inv_1.txt', 'sub/notes.md', '2023/inv_9.pdf'):
+        _touch(str(tmp_path / relative))
+    # 字面名称、按扩展名、按前缀首字符、无字面前缀 / 扩展名的模式，以及带目录部分的模式
+    names = ['README', '*.pdf', 'data_??.csv', 'inv_*', '*2023*', '2023/inv_*.pdf']
+    compiled = CompiledSpec({'names': frozenset(names), 'mode': 'glob', 'top_k': 5})
+    assert not compiled.invalid
+    assert sorted(compiled.glob.matches('inv_2023.txt')) == ['*2023*', 'inv_*']
+    assert compiled.glob.matches('notes.md') == []
+
+    found = scan_root(str(tmp_path), compiled)
+    paths = {name: sorted(os.path.relpath(path, str(tmp_path)) for path, _ in hits) for name, hits in found.items()}
+    assert paths == {
+        'README': ['README'],
+        '*.pdf': [os.path.join('2023', 'inv_9.pdf'), 'report.pdf'],
+        'data_??.csv': ['data_01.csv'],
+        'inv_*': [os.path.join('2023', 'inv_9.pdf'), 'inv_2023.txt', os.path.join('sub', 'inv_1.txt')],
+        '*2023*': ['inv_2023.txt'],
+        '2023/inv_*.pdf': [os.path.join('2023', 'inv_9.pdf')],
+    }
+
+
+def test_glob_scan_normalized(tmp_path):
+    _touch(str(tmp_path / 'Report_1.PDF'))
+    compiled = CompiledSpec({'names': frozenset(['REPORT_*.pdf']), 'mode': 'glob', 'normalize': True})
+    found = scan_root(str(tmp_path), compiled)
+    assert [path for path, _ in found['REPORT_*.pdf']] == [str(tmp_path / 'Report_1.PDF')]
+
+
+@pytest.mark.parametrize('requested, on_disk', [
+    (unicodedata.normalize('NFC', 'café.pdf'), unicodedata.normalize('NFD', 'café.pdf')),
+    ('Report1.pdf', 'Ｒｅｐｏｒｔ１.pdf'),
+    ('2023/Report1.pdf', '２０２３/Ｒｅｐｏｒｔ１.pdf'),
+], ids=['nfc-nfd', 'half-full', 'path-half-full'])
+def test_normalized_scan_matches_other_forms(tmp_path, requested, on_disk):
+    _touch(str(tmp_path / 'docs' / on_disk))
+    if not os.path.isfile(os.path.join(str(tmp_path), 'docs', on_disk)) or \
+            os.path.basename(on_disk) not in os.listdir(os.path.dirname(str(tmp_path / 'docs' / on_disk))):
+        pytest.skip('文件系统改变了文件名的 Unicode 形式')
+    spec = {'names': frozenset([requested]), 'mode': 'exact'}
+    assert not scan_root(str(tmp_path), CompiledSpec(spec))
+    found = scan_root(str(tmp_path), CompiledSpec(dict(spec, normalize=True)))
+    assert [path for path, _ in found[requested]] == [str(tmp_path / 'docs' / on_disk)]
@@ -0,0 +1,147 @@
+import os
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+pytest.importorskip('PyQt5')
+pytest.importorskip('pandas')
+
+from PyQt5.QtCore import QThread
+from PyQt5.QtWidgets import QApplication
+
+import cli
+import search_worker
+import ui_elements
+from file_operations import report_columns
+from log_sink import BatchedLogSink
+from run_metrics import RunMetrics
+
+
+def _wait_for_threads(app, timeout=30.0):
+    """处理事件直到窗口的后台线程（读取表格、执行任务）全部结束。"""
+    qt_app = QApplication.instance()
+    # 启动时读取表格的线程由 QTimer.singleShot 在事件循环中启动
+    qt_app.processEvents()
+    deadline = time.monotonic() + timeout
+    while any(thread.isRunning() for thread in app.findChildren(QThread)):
+        assert time.monotonic() < deadline, '后台线程没有在限定时间内结束'
+        qt_app.processEvents()
+        time.sleep(0.01)
+    qt_app.processEvents()
+
+
+@pytest.fixture(scope='module')
+def qt_app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(qt_app, tmp_path, monkeypatch):  # pylint: disable=redefined-outer-name,unused-argument
+    monkeypatch.chdir(tmp_path)
+    app = ui_elements.UniApp()
+    _wait_for_threads(app)
+    app.excel_le.clear()
+    app.target_le.clear()
+    app.root_le.clear()
+    yield app
+    _wait_for_threads(app)
+    app.close()
+
+
+def _message(key):
+    return ui_elements.get_translation(key, 'zh')
+
+
+def test_start_task_requires_paths(window):
+    window.start_task()
+    assert window.worker is None
+    assert _message('path_not_set_error') in window.fail_edit.toPlainText()
+
+
+def test_start_task_from_plan_ignores_path_fields(window, tmp_path):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'a.txt').write_text('1')
+    (tmp_path / 'names.txt').write_text('a.txt\n', encoding='utf-8')
+    report = tmp_path / 'names_updated.xlsx'
+    assert cli.main(['--list', 'names.txt', '--root', 'src', '--target', 'out', '--report', str(report),
+                     '--plan', str(tmp_path / 'names_updated.plan.json'), '-q']) == cli.EXIT_OK
+
+    window.updated_excel_path = str(report)
+    window.from_plan_cb.setChecked(True)
+    window.start_task()
+    assert window.worker is not None
+    _wait_for_threads(window)
+    assert window.start_btn.isEnabled()
+    assert _message('path_not_set_error') not in window.fail_edit.toPlainText()
+    # 目标文件夹沿用计划中的设置
+    assert os.listdir(tmp_path / 'out') == ['a.txt']
+
+
+def test_start_task_from_plan_reports_missing_plan(window, tmp_path):
+    window.updated_excel_path = str(tmp_path / 'names_updated.xlsx')
+    window.from_plan_cb.setChecked(True)
+    window.start_task()
+    assert window.worker is None
+    assert _message('plan_load_error') in window.fail_edit.toPlainText()
+
+
+class _ScriptedEngine:
+    """代替 SearchEngine：按 SCRIPT 依次发出引擎事件，不读取列表、不扫描也不复制。"""
+    SCRIPT = []
+
+    def __init__(self, *args, events=None, top_k=1, **kwargs):  # pylint: disable=unused-argument
+        self.events = events
+        self.top_k = top_k
+        self.log_sink = BatchedLogSink('task.log')
+        self.metrics = RunMetrics()
+
+    def run(self):
+        for method, payload in self.SCRIPT:
+            getattr(self.events, method)(payload)
+
+    def stop(self):
+        """与 SearchEngine.stop 相同的接口。"""
+
+
+def _run_scripted(window, monkeypatch, script):
+    monkeypatch.setattr(search_worker, 'SearchEngine', _ScriptedEngine)
+    monkeypatch.setattr(_ScriptedEngine, 'SCRIPT', script)
+    window.excel_le.setText(window.excel_file_path)
+    window.target_le.setText('out')
+    window.root_le.setText('src')
+    window.top_k_sb.setValue(2)
+    inserted = []
+    window.model_updated.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    window.start_task()
+    _wait_for_threads(window)
+    model = window.model_updated
+    rows = [[model.index(row, col).data() for col in range(model.columnCount())] for row in range(model.rowCount())]
+    return inserted, rows
+
+
+def test_rows_stream_in_and_report_replaces_them(window, monkeypatch):
+    found, missing = '✅ 已找到', '❌ 未找到或复制失败'
+    streamed = [[['b.txt', found, '/src/b.txt', '']], [['a.txt', found, '/src/a.txt', '/src/x/a.txt']]]
+    report = [['a.txt', found, '/src/a.txt', '/src/x/a.txt'], ['b.txt', found, '/src/b.txt', ''],
+              ['c.txt', missing, '', '']]
+    inserted, rows = _run_scripted(window, monkeypatch,
+                                   [('on_rows', streamed[0]), ('on_rows', streamed[1]), ('on_report', report)])
+    # 复制过程中按批追加，结束时按列表顺序整体替换，不再从磁盘读取结果表
+    assert inserted == [(0, 0), (1, 1)]
+    assert window.model_updated.df.columns.tolist() == report_columns(2)
+    assert rows == report
+
+
+def test_without_report_the_result_table_is_reloaded(window, monkeypatch):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.Workbook()
+    workbook.active.append(report_columns())
+    workbook.active.append(['old.txt', '✅ 已找到'])
+    workbook.save(window.updated_excel_path)
+
+    inserted, rows = _run_scripted(window, monkeypatch, [('on_rows', [['a.txt', '✅ 已找到', '/src/a.txt', '']])])
+    assert inserted == [(0, 0)]
+    # 没有收到 report_ready（例如任务被取消）时从磁盘恢复上一次的结果表
+    assert rows == [['old.txt', '✅ 已找到']]
@@ -11,13 +11,22 @@ from pathlib import Path
 from PyQt5.QtCore import Qt, QThread, QUrl, QPropertyAnimation, QEasingCurve, pyqtProperty, QRectF, QTimer
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog,
-    QTextEdit, QLabel, QSplitter, QGroupBox, QLineEdit, QTabWidget,
-    QProgressBar, QHeaderView, QTabBar, QAbstractItemView, QComboBox, QApplication
+    QTextEdit, QPlainTextEdit, QLabel, QSplitter, QGroupBox, QLineEdit, QTabWidget,
+    QProgressBar, QHeaderView, QTabBar, QAbstractItemView, QComboBox, QApplication,
+    QCheckBox, QSpinBox
 )
 from PyQt5.QtGui import QDesktopServices, QPainter, QColor, QIcon, QFontMetrics
-from excel_model import ExcelTableModel, CustomTableView
-from file_operations import SearchWorker, resource_path
-from utils import setup_excel_files
+from excel_model import ExcelTableModel, CustomTableView, TableFilterProxyModel, ExcelLoadWorker
+from file_operations import resource_path, report_columns
+from search_worker import SearchWorker
+from scan_pool import ScanPool
+from utils import setup_excel_files, excel_file_paths
+from log_sink import BatchedLogSink
+from index_service import IndexClient, token_path_for
+from run_metrics import format_metrics
+from file_filters import FileFilter
+from copy_plan import CopyPlan, plan_path_for
+from autotune import TuningStore
 import json
 
 # -------------------------------------------------
@@ -44,13 +53,40 @@ TRANSLATIONS = {
         'exact_match': '精确匹配 (包含)',
         'fuzzy_match': '模糊匹配 (85%)',
         'regex_match': '正则表达式',
+        'glob_match': '通配符 (* ?)',
+        'follow_links': '跟随符号链接（重复目录只扫描一次）',
+        'normalize': '忽略大小写 / 全角半角',
+        'retry_misses': '只重试未找到的名称',
+        'auto_tune': '自动调整并发',
+        'plan_only': '仅预检（保存复制计划，不复制）',
+        'from_plan': '按已保存的计划复制',
+        'plan_load_error': '❌ 无法读取复制计划: ',
+        'top_k': '每个名称的候选数:',
+        'copy_all': '复制全部候选（每个名称一个子文件夹）',
+        'filter_settings': '筛选条件（列表中的同名附加列只对所在行生效）',
+        'filter_ext': '扩展名:',
+        'filter_ext_hint': '例如 pdf, xlsx',
+        'filter_size': '大小:',
+        'filter_size_hint': '例如 10KB',
+        'filter_mtime': '修改时间:',
+        'filter_mtime_hint': 'YYYY-MM-DD',
+        'filter_error': '❌ 筛选条件有误: ',
+        'metrics_panel': '运行指标',
+        'metrics_empty': '任务完成后在此显示各阶段耗时和计数。',
+        'profile_capture': '记录 cProfile',
         'status_waiting': '当前状态: 等待任务开始...',
         'status_initializing': '当前状态: 正在初始化...',
         'preparing': '准备中... %p%',
         'file_preview': '文件预览: ',
         'save': '保存',
         'add_row': '新增一行',
+        'filter_placeholder': '筛选：输入关键字（空格分隔多个关键字）',
+        'facet_all': '全部状态',
+        'facet_found': '已找到',
+        'facet_missing': '未找到',
         'success_log': '成功日志',
+        'log_truncated': '…… 已省略 %d 条日志，请查看完整日志文件',
+        'full_log_saved': '📄 完整日志: ',
         'failure_log': '失败日志',
         'task_completed_msg': '任务完成。',
         'task_completed': '任务完成！ %p%',
@@ -59,6 +95,8 @@ TRANSLATIONS = {
         'excel_refresh_fail': '创建/刷新 Excel 表格失败: ',
         'user_cancel': '用户请求取消任务...',
         'language_settings': '语言设置:',
+        'index_settings': '索引服务:',
+        'index_url_placeholder': '可选：索引服务地址，例如 http://127.0.0.1:8765（留空则直接扫描磁盘）',
         'chinese': '简体中文',
         'english': 'English',
         'about_text': """
@@ -104,13 +142,40 @@ TRANSLATIONS = {
         'exact_match': 'Exact Match (Contains)',
         'fuzzy_match': 'Fuzzy Match (85%)',
         'regex_match': 'Regex',
+        'glob_match': 'Wildcard (* ?)',
+        'follow_links': 'Follow symlinks (scan each directory once)',
+        'normalize': 'Ignore case / width',
+        'retry_misses': 'Retry only the misses',
+        'auto_tune': 'Auto-tune concurrency',
+        'plan_only': 'Dry run (save copy plan, copy nothing)',
+        'from_plan': 'Copy from saved plan',
+        'plan_load_error': '❌ Cannot read the copy plan: ',
+        'top_k': 'Candidates per name:',
+        'copy_all': 'Copy all candidates (one subfolder per name)',
+        'filter_settings': 'Filters (list columns with the same names apply to their row only)',
+        'filter_ext': 'Extensions:',
+        'filter_ext_hint': 'e.g. pdf, xlsx',
+        'filter_size': 'Size:',
+        'filter_size_hint': 'e.g. 10KB',
+        'filter_mtime': 'Modified:',
+        'filter_mtime_hint': 'YYYY-MM-DD',
+        'filter_error': '❌ Invalid filter: ',
+        'metrics_panel': 'Run Metrics',
+        'metrics_empty': 'Per-phase timings and counters appear here after a task finishes.',
+        'profile_capture': 'Capture cProfile',
         'status_waiting': 'Status: Waiting to start...',
         'status_initializing': 'Status: Initializing...',
         'preparing': 'Preparing... %p%',
         'file_preview': 'File Preview: ',
         'save': 'Save',
         'add_row': 'Add Row',
+        'filter_placeholder': 'Filter: type keywords (separate with spaces)',
+        'facet_all': 'All statuses',
+        'facet_found': 'Found',
+        'facet_missing': 'Not found',
         'success_log': 'Success Log',
+        'log_truncated': '... %d log lines omitted, see the full log file',
+        'full_log_saved': '📄 Full log: ',
         'failure_log': 'Failure Log',
         'task_completed_msg': 'Task completed.',
         'task_completed': 'Task Completed! %p%',
@@ -119,6 +184,8 @@ TRANSLATIONS = {
         'excel_refresh_fail': 'Failed to create/refresh Excel tables: ',
         'user_cancel': 'User requested to cancel task...',
         'language_settings': 'Language Settings:',
+        'index_settings': 'Index Service:',
+        'index_url_placeholder': 'Optional: index service URL, e.g. http://127.0.0.1:8765 (leave empty to scan the disk)',
         'chinese': '简体中文',
         'english': 'English',
         'about_text': """
@@ -234,6 +301,9 @@ class UniApp(QWidget):
     """
     SETTINGS_FILE = "last_paths.ini"
     CONFIG_FILE = "settings.json"
+    LOG_MAX_BLOCKS = 5000
+    LOG_FLUSH_INTERVAL_MS = 200
+    FACETS = [TableFilterProxyModel.FACET_ALL, TableFilterProxyModel.FACET_FOUND, TableFilterProxyModel.FACET_MISSING]
 
     def __init__(self):
         """初始化应用程序主窗口。"""
@@ -257,6 +327,33 @@ class UniApp(QWidget):
         self.create_refresh_excels_btn = QPushButton(self)
         self.cancel_btn = QPushButton(self)
         self.match_mode_combo = QComboBox(self)
+        self.follow_links_cb = QCheckBox(self)
+        self.normalize_cb = QCheckBox(self)
+        self.retry_misses_cb = QCheckBox(self)
+        self.plan_only_cb = QCheckBox(self)
+        self.from_plan_cb = QCheckBox(self)
+        self.top_k_label = QLabel()
+        self.top_k_sb = QSpinBox(self)
+        self.top_k_sb.setRange(1, 20)
+        self.copy_all_cb = QCheckBox(self)
+        self.filter_group = QGroupBox()
+        self.filter_ext_label = QLabel()
+        self.filter_ext_le = QLineEdit(self)
+        self.filter_size_label = QLabel()
+        self.filter_min_size_le = QLineEdit(self)
+        self.filter_max_size_le = QLineEdit(self)
+        self.filter_mtime_label = QLabel()
+        self.filter_mtime_from_le = QLineEdit(self)
+        self.filter_mtime_to_le = QLineEdit(self)
+        self.metrics_toggle_btn = QPushButton(self)
+        self.metrics_toggle_btn.setCheckable(True)
+        self.profile_cb = QCheckBox(self)
+        self.auto_tune_cb = QCheckBox(self)
+        self.auto_tune_cb.setChecked(self._auto_tune)
+        self.metrics_edit = QPlainTextEdit(self)
+        self.metrics_edit.setReadOnly(True)
+        self.metrics_edit.setMaximumHeight(180)
+        self.metrics_edit.setVisible(False)
         
         self.tab_work_label = QLabel()
         self.tab_excel_label = QLabel()
@@ -274,20 +371,33 @@ class UniApp(QWidget):
         self.excel_add_row_btn = QPushButton(self)
         self.updated_excel_label = QLabel()
         self.origin_excel_label = QLabel()
+        self.origin_filter_le = QLineEdit(self)
+        self.updated_filter_le = QLineEdit(self)
+        self.updated_facet_combo = QComboBox(self)
 
         # settings tab widgets
         self.lang_label = QLabel()
         self.lang_combo = QComboBox(self)
+        self.index_label = QLabel()
+        self.index_url_le = QLineEdit(self)
 
-        # === 关键修改点1：在UI初始化之前调用 setup_excel_files，并保存路径 ===
-        self.excel_file_path, self.updated_excel_path = setup_excel_files()
+        # === 关键修改点1：启动时只计算路径，默认文件的创建和读取放到后台线程（见 load_excels） ===
+        self.excel_file_path, self.updated_excel_path = excel_file_paths()
+        self._excel_loaders = []
 
         self.model_origin = ExcelTableModel(is_read_only=False)
         self.model_updated = ExcelTableModel(is_read_only=True)
+        self.proxy_origin = TableFilterProxyModel(self)
+        self.proxy_origin.setSourceModel(self.model_origin)
+        self.proxy_updated = TableFilterProxyModel(self)
+        self.proxy_updated.setSourceModel(self.model_updated)
         self.view_origin = CustomTableView(self)
         self.view_updated = CustomTableView(self)
-        self.success_edit = QTextEdit(self)
-        self.fail_edit = QTextEdit(self)
+        # 日志面板使用有行数上限的纯文本控件，完整日志写入磁盘文件
+        self.success_edit = self._log_edit()
+        self.fail_edit = self._log_edit()
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(self.LOG_FLUSH_INTERVAL_MS)
         self.progress_bar = QProgressBar(self)
         self.progress_bar.setTextVisible(True)
         self.progress_label = QLabel(self)
@@ -297,6 +407,10 @@ class UniApp(QWidget):
         self.tab.setTabBar(SlidingTabBar())
         self.thread = None
         self.worker = None
+        self._report_received = False
+        self._report_columns = report_columns()
+        # 扫描进程池由应用程序持有，在多次任务之间保持预热
+        self.scan_pool = ScanPool()
         
         # about tab widgets
         self.about_text_edit = QTextEdit(self)
@@ -305,8 +419,8 @@ class UniApp(QWidget):
         self._retranslate_ui() # 启动时进行一次UI翻译
         self._signals()
         self._apply_styles()
-        # 延迟加载和调整，确保UI完全可见后再执行
-        QTimer.singleShot(0, self.load_excels)
+        # 延迟加载和调整，确保UI完全可见后再执行；缺失的默认 Excel 文件也在后台创建
+        QTimer.singleShot(0, lambda: self.load_excels(create=True))
         self.load_paths()
         self._initial_ui_state()
         self.excel_le.dragEnterEvent = self.dragEnterEvent
@@ -323,6 +437,15 @@ class UniApp(QWidget):
         self.root_btn.setIcon(QIcon(down_arrow_path))
 
 
+    def closeEvent(self, event):
+        """关闭窗口时取消任务并回收扫描进程。"""
+        if self.worker and self.thread and self.thread.isRunning():
+            self.worker.stop()
+            self.thread.quit()
+            self.thread.wait(3000)
+        self.scan_pool.shutdown()
+        super().closeEvent(event)
+
     def dragEnterEvent(self, event):
       if event.mimeData().hasUrls():
         event.acceptProposedAction()
@@ -356,14 +479,38 @@ class UniApp(QWidget):
         match_mode_layout = QHBoxLayout(match_mode_group)
         self.match_mode_label = QLabel()
         self.match_mode_combo.setObjectName('match_mode_combo') # 为匹配模式下拉框添加对象名
-        self.match_mode_combo.addItems([get_translation('exact_match', self._language), get_translation('fuzzy_match', self._language), get_translation('regex_match', self._language)])
+        self.match_mode_combo.addItems([get_translation('exact_match', self._language), get_translation('fuzzy_match', self._language), get_translation('regex_match', self._language), get_translation('glob_match', self._language)])
         
         match_mode_layout.addWidget(self.match_mode_label)
         match_mode_layout.addWidget(self.match_mode_combo)
+        match_mode_layout.addWidget(self.normalize_cb)
+        match_mode_layout.addWidget(self.follow_links_cb)
+        match_mode_layout.addWidget(self.top_k_label)
+        match_mode_layout.addWidget(self.top_k_sb)
+        match_mode_layout.addWidget(self.copy_all_cb)
         layout.addWidget(match_mode_group)
         self.tab_match_group_label = match_mode_group
 
+        filter_layout = QHBoxLayout(self.filter_group)
+        filter_layout.addWidget(self.filter_ext_label)
+        filter_layout.addWidget(self.filter_ext_le)
+        filter_layout.addWidget(self.filter_size_label)
+        filter_layout.addWidget(self.filter_min_size_le)
+        filter_layout.addWidget(QLabel('~'))
+        filter_layout.addWidget(self.filter_max_size_le)
+        filter_layout.addWidget(self.filter_mtime_label)
+        filter_layout.addWidget(self.filter_mtime_from_le)
+        filter_layout.addWidget(QLabel('~'))
+        filter_layout.addWidget(self.filter_mtime_to_le)
+        layout.addWidget(self.filter_group)
+
         button_layout = QHBoxLayout()
+        button_layout.addWidget(self.retry_misses_cb)
+        button_layout.addWidget(self.plan_only_cb)
+        button_layout.addWidget(self.from_plan_cb)
+        # 试运行和按计划复制不能同时选择
+        self.plan_only_cb.toggled.connect(lambda checked: checked and self.from_plan_cb.setChecked(False))
+        self.from_plan_cb.toggled.connect(lambda checked: checked and self.plan_only_cb.setChecked(False))
         button_layout.addWidget(self.create_refresh_excels_btn)
         button_layout.addWidget(self.start_btn)
         button_layout.addWidget(self.cancel_btn)
@@ -371,10 +518,26 @@ class UniApp(QWidget):
 
         layout.addWidget(self.progress_label)
         layout.addWidget(self.progress_bar)
+
+        # 可折叠的运行指标面板
+        metrics_layout = QHBoxLayout()
+        metrics_layout.addWidget(self.metrics_toggle_btn)
+        metrics_layout.addStretch()
+        metrics_layout.addWidget(self.auto_tune_cb)
+        metrics_layout.addWidget(self.profile_cb)
+        layout.addLayout(metrics_layout)
+        layout.addWidget(self.metrics_edit)
+        self.metrics_toggle_btn.toggled.connect(self._toggle_metrics_panel)
+        self.auto_tune_cb.toggled.connect(self.save_settings)
         
         return widget
 
-    def _build_excel_tab(self, model, title, view_instance):
+    def _toggle_metrics_panel(self, expanded):
+        """展开或折叠运行指标面板。"""
+        self.metrics_edit.setVisible(expanded)
+        self.metrics_toggle_btn.setText(("▼ " if expanded else "▶ ") + get_translation('metrics_panel', self._language))
+
+    def _build_excel_tab(self, model, title, view_instance, proxy, filter_le):
         """构建 Excel 预览页签。"""
         widget = QWidget()
         layout = QVBoxLayout(widget)
@@ -401,8 +564,20 @@ class UniApp(QWidget):
             self.updated_excel_label = header_label
         
         layout.addLayout(header_layout)
+
+        # 筛选栏：关键字输入框，结果表额外提供状态分面
+        filter_layout = QHBoxLayout()
+        filter_le.setClearButtonEnabled(True)
+        filter_le.textChanged.connect(lambda text: proxy.set_filter(text=text))
+        filter_layout.addWidget(filter_le)
+        if model.is_read_only:
+            self.updated_facet_combo.setObjectName('match_mode_combo')
+            self.updated_facet_combo.currentIndexChanged.connect(
+                lambda index: proxy.set_filter(facet=self.FACETS[index]) if index >= 0 else None)
+            filter_layout.addWidget(self.updated_facet_combo)
+        layout.addLayout(filter_layout)
         
-        view_instance.setModel(model)
+        view_instance.setModel(proxy)
         view_instance.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         view_instance.horizontalHeader().setMinimumSectionSize(120)
         view_instance.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
@@ -432,6 +607,18 @@ class UniApp(QWidget):
         lang_layout.addWidget(self.lang_combo)
         
         layout.addWidget(language_group)
+
+        # 索引服务设置
+        index_group = QGroupBox()
+        index_group.setObjectName('index_group')
+        index_layout = QHBoxLayout(index_group)
+        self.index_label.setObjectName('lang_label')
+        self.index_url_le.setText(self._index_url)
+        self.index_url_le.editingFinished.connect(self.save_settings)
+        index_layout.addWidget(self.index_label)
+        index_layout.addWidget(self.index_url_le)
+
+        layout.addWidget(index_group)
         layout.addStretch()
         
         return widget
@@ -474,8 +661,10 @@ class UniApp(QWidget):
         main.addLayout(title_bar)
 
         self.tab.addTab(self._build_work_tab(), "")
-        self.tab.addTab(self._build_excel_tab(self.model_origin, "file_list.xlsx", self.view_origin), "")
-        self.tab.addTab(self._build_excel_tab(self.model_updated, "file_list_updated.xlsx", self.view_updated), "")
+        self.tab.addTab(self._build_excel_tab(self.model_origin, "file_list.xlsx", self.view_origin,
+                                              self.proxy_origin, self.origin_filter_le), "")
+        self.tab.addTab(self._build_excel_tab(self.model_updated, "file_list_updated.xlsx", self.view_updated,
+                                              self.proxy_updated, self.updated_filter_le), "")
         self.tab.addTab(self._build_settings_tab(), "")
         self.tab.addTab(self._build_about_tab(), "")
         main.addWidget(self.tab)
@@ -487,6 +676,13 @@ class UniApp(QWidget):
         log_splitter.addWidget(self.log_group_failure)
         main.addWidget(log_splitter)
 
+    def _log_edit(self):
+        """创建一个只读、最多保留 LOG_MAX_BLOCKS 行的日志面板。"""
+        edit = QPlainTextEdit(self)
+        edit.setReadOnly(True)
+        edit.setMaximumBlockCount(self.LOG_MAX_BLOCKS)
+        return edit
+
     def _log_group(self, title, text_edit):
         """创建一个日志分组框。"""
         group = QGroupBox(title)
@@ -506,6 +702,9 @@ class UniApp(QWidget):
         # 当 tab 发生改变时，强制刷新表格行高
         self.tab.currentChanged.connect(self._handle_tab_change)
 
+        # 定时把工作线程积攒的日志批量刷新到界面
+        self.log_timer.timeout.connect(self._drain_logs)
+
     def _handle_tab_change(self, index):
         """处理标签页切换事件，并强制刷新表格布局。"""
         if index == 1:  # '目标文件列' 是第二个标签页 (索引为 1)
@@ -547,6 +746,26 @@ class UniApp(QWidget):
         self.tab_work_group_label.setTitle(get_translation('path_settings', self._language))
         self.tab_match_group_label.setTitle(get_translation('match_settings', self._language))
         self.match_mode_label.setText(get_translation('match_mode', self._language))
+        self.follow_links_cb.setText(get_translation('follow_links', self._language))
+        self.normalize_cb.setText(get_translation('normalize', self._language))
+        self.retry_misses_cb.setText(get_translation('retry_misses', self._language))
+        self.plan_only_cb.setText(get_translation('plan_only', self._language))
+        self.from_plan_cb.setText(get_translation('from_plan', self._language))
+        self.top_k_label.setText(get_translation('top_k', self._language))
+        self.copy_all_cb.setText(get_translation('copy_all', self._language))
+        self.filter_group.setTitle(get_translation('filter_settings', self._language))
+        self.filter_ext_label.setText(get_translation('filter_ext', self._language))
+        self.filter_ext_le.setPlaceholderText(get_translation('filter_ext_hint', self._language))
+        self.filter_size_label.setText(get_translation('filter_size', self._language))
+        self.filter_mtime_label.setText(get_translation('filter_mtime', self._language))
+        for le in (self.filter_min_size_le, self.filter_max_size_le):
+            le.setPlaceholderText(get_translation('filter_size_hint', self._language))
+        for le in (self.filter_mtime_from_le, self.filter_mtime_to_le):
+            le.setPlaceholderText(get_translation('filter_mtime_hint', self._language))
+        self._toggle_metrics_panel(self.metrics_toggle_btn.isChecked())
+        self.profile_cb.setText(get_translation('profile_capture', self._language))
+        self.auto_tune_cb.setText(get_translation('auto_tune', self._language))
+        self.metrics_edit.setPlaceholderText(get_translation('metrics_empty', self._language))
         self.excel_btn.setText(get_translation('browse', self._language))
         self.target_btn.setText(get_translation('browse', self._language))
         self.root_btn.setText(get_translation('browse', self._language))
@@ -560,7 +779,7 @@ class UniApp(QWidget):
         # 保存当前选择，避免重置
         current_index = self.match_mode_combo.currentIndex()
         self.match_mode_combo.clear()
-        self.match_mode_combo.addItems([get_translation('exact_match', self._language), get_translation('fuzzy_match', self._language), get_translation('regex_match', self._language)])
+        self.match_mode_combo.addItems([get_translation('exact_match', self._language), get_translation('fuzzy_match', self._language), get_translation('regex_match', self._language), get_translation('glob_match', self._language)])
         self.match_mode_combo.setCurrentIndex(current_index)
 
         # 日志分组框
@@ -572,11 +791,26 @@ class UniApp(QWidget):
         self.updated_excel_label.setText(f"<b>{get_translation('file_preview', self._language)}file_list_updated.xlsx</b>")
         self.excel_save_btn.setText(get_translation('save', self._language))
         self.excel_add_row_btn.setText(get_translation('add_row', self._language))
+        self.origin_filter_le.setPlaceholderText(get_translation('filter_placeholder', self._language))
+        self.updated_filter_le.setPlaceholderText(get_translation('filter_placeholder', self._language))
+
+        # 状态分面下拉框，重建选项时阻止信号以保留当前筛选
+        self.updated_facet_combo.blockSignals(True)
+        current_facet_index = max(self.updated_facet_combo.currentIndex(), 0)
+        self.updated_facet_combo.clear()
+        self.updated_facet_combo.addItems([get_translation('facet_all', self._language),
+                                           get_translation('facet_found', self._language),
+                                           get_translation('facet_missing', self._language)])
+        self.updated_facet_combo.setCurrentIndex(current_facet_index)
+        self.updated_facet_combo.blockSignals(False)
         
         # Settings页签
         settings_group = self.findChild(QGroupBox, 'lang_group')
         settings_group.setTitle(get_translation('language_settings', self._language))
         self.lang_label.setText(get_translation('language_settings', self._language))
+        self.findChild(QGroupBox, 'index_group').setTitle(get_translation('index_settings', self._language))
+        self.index_label.setText(get_translation('index_settings', self._language))
+        self.index_url_le.setPlaceholderText(get_translation('index_url_placeholder', self._language))
         
         # 关于页签
         self.about_text_edit.setText(get_translation('about_text', self._language))
@@ -600,7 +834,7 @@ class UniApp(QWidget):
             
             self._retranslate_ui()
             
-            self.success_edit.append(get_translation('language_changed', self._language))
+            self.success_edit.appendPlainText(get_translation('language_changed', self._language))
             
     def choose_file(self, line_edit, filt):
         """选择文件。"""
@@ -623,15 +857,53 @@ class UniApp(QWidget):
         """打开 Excel 文件。"""
         QDesktopServices.openUrl(QUrl.fromLocalFile(self.updated_excel_path if updated else self.excel_file_path))
 
-    def load_excels(self):
-        """加载 Excel 文件到模型中。"""
+    def load_excels(self, create=False, announce=False):
+        """
+        在后台线程中加载 Excel 文件到模型中。
+
+        Args:
+            create (bool): 读取前先创建缺失的默认 Excel 文件
+            announce (bool): 完成后在日志面板中提示刷新成功
+        """
         # === 关键修改点2：直接使用已存储的路径来加载模型 ===
-        self.model_origin.load(self.excel_file_path)
-        self.model_updated.load(self.updated_excel_path)
+        self._start_excel_loader([(self.model_origin, self.excel_file_path),
+                                  (self.model_updated, self.updated_excel_path)],
+                                 setup=setup_excel_files if create else None, announce=announce)
+
+    def _start_excel_loader(self, jobs, setup=None, announce=False):
+        """启动后台线程读取表格，pandas 等重量级模块也在该线程中首次导入。"""
+        thread = QThread(self)
+        worker = ExcelLoadWorker(jobs, setup)
+        worker.moveToThread(thread)
+        state = {'failed': False}
+
+        def on_failed(message):
+            state['failed'] = True
+            self.fail_edit.appendPlainText(f"❌ {get_translation('excel_refresh_fail', self._language)}{message}")
+
+        def on_finished():
+            self._excel_loaders.remove((thread, worker))
+            if announce and not state['failed']:
+                self.success_edit.appendPlainText(f"✅ {get_translation('excel_refreshed_success', self._language)}")
+
+        thread.started.connect(worker.run)
+        worker.loaded.connect(self._on_excel_loaded)
+        worker.failed.connect(on_failed)
+        worker.finished.connect(on_finished)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        # 保存引用，防止线程对象在运行期间被回收
+        self._excel_loaders.append((thread, worker))
+        thread.start()
+
+    def _on_excel_loaded(self, model, df):
+        """后台读取完成后在界面线程中替换模型数据。"""
+        model.set_dataframe(df)
 
         # 在加载数据后强制刷新表格视图的行高
-        self.view_origin.resizeRowsToContents()
-        self.view_updated.resizeRowsToContents()
+        view = self.view_origin if model is self.model_origin else self.view_updated
+        view.resizeRowsToContents()
 
 
     def save_excel(self, model, title):
@@ -639,19 +911,18 @@ class UniApp(QWidget):
         # === 关键修改点3：直接使用已存储的路径来保存 ===
         path = self.excel_file_path if "file_list.xlsx" in title else self.updated_excel_path
         model.save(path)
-        self.success_edit.append(f"✅ {title} {get_translation('save', self._language)}")
+        self.success_edit.appendPlainText(f"✅ {title} {get_translation('save', self._language)}")
 
     def _create_and_refresh_excels(self):
         """创建或刷新 Excel 文件并加载。"""
         try:
-            # === 关键修改点4：调用新函数并更新路径，确保同步 ===
-            self.excel_file_path, self.updated_excel_path = setup_excel_files()
-            self.load_excels()
-            self.success_edit.append(f"✅ {get_translation('excel_refreshed_success', self._language)}")
+            # === 关键修改点4：重置为默认路径，创建和读取在后台完成 ===
+            self.excel_file_path, self.updated_excel_path = excel_file_paths()
+            self.load_excels(create=True, announce=True)
             self.excel_le.setText(self.excel_file_path)
         except Exception as e:
             traceback.print_exc()
-            self.fail_edit.append(f"❌ {get_translation('excel_refresh_fail', self._language)}{e}")
+            self.fail_edit.appendPlainText(f"❌ {get_translation('excel_refresh_fail', self._language)}{e}")
 
     def _initial_ui_state(self):
         """设置初始 UI 状态。"""
@@ -666,8 +937,26 @@ class UniApp(QWidget):
         excel = self.excel_le.text()
         target = self.target_le.text()
         root = self.root_le.text()
-        if not all([excel, target, root]):
-            self.fail_edit.append(get_translation('path_not_set_error', self._language))
+        # 复制计划与结果表放在一起；按计划复制时不读取列表、不扫描，只检查计划文件，
+        # 目标文件夹和根目录为空时沿用计划中的设置
+        plan_path = plan_path_for(self.updated_excel_path)
+        from_plan = None
+        if self.from_plan_cb.isChecked():
+            try:
+                from_plan = CopyPlan.load(plan_path)
+            except (OSError, ValueError, KeyError) as e:
+                self.fail_edit.appendPlainText(f"{get_translation('plan_load_error', self._language)}{e}")
+                return
+        elif not all([excel, target, root]):
+            self.fail_edit.appendPlainText(get_translation('path_not_set_error', self._language))
+            return
+        try:
+            file_filter = FileFilter.from_fields(
+                self.filter_ext_le.text(), self.filter_min_size_le.text().strip(),
+                self.filter_max_size_le.text().strip(), self.filter_mtime_from_le.text().strip(),
+                self.filter_mtime_to_le.text().strip())
+        except ValueError as e:
+            self.fail_edit.appendPlainText(f"{get_translation('filter_error', self._language)}{e}")
             return
         
         self.start_btn.setEnabled(False)
@@ -686,16 +975,32 @@ class UniApp(QWidget):
             match_mode = 'fuzzy'
         elif get_translation('regex_match', self._language) in match_mode_text:
             match_mode = 'regex'
+        elif get_translation('glob_match', self._language) in match_mode_text:
+            match_mode = 'glob'
         else:
             match_mode = 'exact'
             
         self.worker = SearchWorker(
             excel_path=self.excel_file_path,
             target_dir=target,
-            roots=[root],
+            roots=[root] if root else [],
             updated_excel_path=self.updated_excel_path,
             match_mode=match_mode,
-            min_fuzzy_score=85
+            min_fuzzy_score=85,
+            scan_pool=self.scan_pool,
+            index=IndexClient(self._index_url, token_path=token_path_for(self.CONFIG_FILE))
+            if self._index_url else None,
+            follow_links=self.follow_links_cb.isChecked(),
+            profile=self.profile_cb.isChecked(),
+            top_k=self.top_k_sb.value(),
+            copy_all=self.copy_all_cb.isChecked(),
+            file_filter=file_filter,
+            normalize=self.normalize_cb.isChecked(),
+            # 上一次的结果表即本次要覆盖的更新表，引擎在写入新报告之前读取它
+            retry_from=self.updated_excel_path if self.retry_misses_cb.isChecked() else None,
+            autotune=TuningStore(self.CONFIG_FILE) if self.auto_tune_cb.isChecked() else None,
+            plan_path=plan_path if self.plan_only_cb.isChecked() else None,
+            from_plan=from_plan
         )
         
         self.thread = QThread(self)
@@ -706,10 +1011,17 @@ class UniApp(QWidget):
         self.worker.finished.connect(self.thread.quit)
         self.worker.finished.connect(self.worker.deleteLater)
         self.thread.finished.connect(self.thread.deleteLater)
+        self.thread.finished.connect(self._on_thread_finished)
 
-        self.worker.success.connect(lambda s: self.success_edit.append(s))
-        self.worker.failed.connect(lambda s: self.fail_edit.append(s))
         self.worker.progress.connect(self.update_progress)
+        self.worker.rows_ready.connect(self.model_updated.append_rows)
+        self.worker.report_ready.connect(self._on_report_ready)
+
+        # 结果表在运行过程中实时追加，先清空上一次的结果
+        self._report_received = False
+        self._report_columns = report_columns(self.worker.engine.top_k)
+        self.model_updated.set_rows([], self._report_columns)
+        self.log_timer.start()
         self.thread.start()
 
     def cancel_task(self):
@@ -718,7 +1030,7 @@ class UniApp(QWidget):
             self.worker.stop()
             self.cancel_btn.setEnabled(False)
             self.progress_label.setText(get_translation('user_cancel', self._language))
-            self.fail_edit.append(get_translation('user_cancel', self._language))
+            self.fail_edit.appendPlainText(get_translation('user_cancel', self._language))
 
     def update_progress(self, current, total, message):
         """更新进度条和标签。"""
@@ -733,15 +1045,46 @@ class UniApp(QWidget):
         self.progress_bar.setFormat(f"{get_translation('status_prefix', self._language)} {display_message} %p%")
         self.progress_label.setText(f"{get_translation('status_prefix', self._language)} {display_message}")
 
+    def _drain_logs(self):
+        """取走工作线程积攒的日志，每类日志一次性追加到面板。"""
+        if not self.worker:
+            return
+        batches, dropped = self.worker.log_sink.drain()
+        for kind, edit in ((BatchedLogSink.SUCCESS, self.success_edit), (BatchedLogSink.FAILED, self.fail_edit)):
+            messages = batches.get(kind)
+            if dropped.get(kind):
+                edit.appendPlainText(get_translation('log_truncated', self._language) % dropped[kind])
+            if messages:
+                # 面板最多显示 LOG_MAX_BLOCKS 行，更早的内容无需再插入
+                edit.appendPlainText("\n".join(messages[-self.LOG_MAX_BLOCKS:]))
+
     def _on_task_finished(self):
         """任务完成后的处理。"""
+        self.log_timer.stop()
+        self._drain_logs()
+        self.success_edit.appendPlainText(f"{get_translation('full_log_saved', self._language)}{os.path.abspath(self.worker.log_sink.log_path)}")
+        self.metrics_edit.setPlainText(format_metrics(self.worker.metrics.to_dict()))
         self.start_btn.setEnabled(True)
         self.cancel_btn.setEnabled(False)
         self.progress_label.setText(get_translation('task_completed_msg', self._language))
         self.progress_bar.setValue(self.progress_bar.maximum())
         self.progress_bar.setFormat(get_translation('task_completed', self._language))
         
-        self.load_excels()
+        # 正常结束时结果已通过 report_ready 移交；否则从磁盘恢复上一次的结果表
+        if not self._report_received:
+            self._start_excel_loader([(self.model_updated, self.updated_excel_path)])
+        else:
+            self.view_updated.resizeRowsToContents()
+
+    def _on_thread_finished(self):
+        """任务线程结束后连同工作者一起被回收，清除引用，取消或关闭窗口时不再访问已删除的对象。"""
+        self.thread = None
+        self.worker = None
+
+    def _on_report_ready(self, rows):
+        """接收工作线程整理好的完整结果，直接替换结果表模型。"""
+        self._report_received = True
+        self.model_updated.set_rows(rows, self._report_columns)
 
     def load_paths(self):
         """加载上次的路径设置。"""
@@ -762,17 +1105,29 @@ class UniApp(QWidget):
             f.write("\n".join([self.excel_le.text(), self.target_le.text(), self.root_le.text()]))
 
     def load_settings(self):
-        """加载配置文件中的设置，包括语言。"""
+        """加载配置文件中的设置，包括语言和索引服务地址。"""
         try:
             with open(self.CONFIG_FILE, 'r', encoding='utf-8') as f:
                 config = json.load(f)
                 self._language = config.get('language', 'zh')
+                self._index_url = config.get('index_url', '')
+                self._auto_tune = bool(config.get('auto_tune', False))
         except (FileNotFoundError, json.JSONDecodeError):
             self._language = 'zh'
+            self._index_url = ''
+            self._auto_tune = False
     
     def save_settings(self):
         """保存设置到配置文件。"""
-        config = {'language': self._language}
+        self._index_url = self.index_url_le.text().strip()
+        self._auto_tune = self.auto_tune_cb.isChecked()
+        # 保留文件中的其他字段（例如 autotune 记录的并发调整结果）
+        try:
+            with open(self.CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            config = {}
+        config.update(language=self._language, index_url=self._index_url, auto_tune=self._auto_tune)
         try:
             with open(self.CONFIG_FILE, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=4)
@@ -827,7 +1182,7 @@ QGroupBox::title {
 }
 
 /* 输入框 - 终端风格 */
-QLineEdit {
+QLineEdit, QSpinBox {
     border: 1px solid #00FFFF;
     border-radius: 4px;
     padding: 4px;
@@ -836,7 +1191,7 @@ QLineEdit {
 }
 
 /* 日志输出框 - 经典绿色荧光字 */
-QTextEdit {
+QTextEdit, QPlainTextEdit {
     background: #1A1F36;
     border: 1px solid #00FFFF;
     border-radius: 6px;
@@ -957,6 +1312,10 @@ QComboBox {
     color: #00FFFF;
 }
 
+QCheckBox {
+    color: #00FFFF;
+}
+
 /* 确保匹配模式下拉框的样式与语言下拉框一致 */
 QComboBox#match_mode_combo {
     font-size: 9pt; /* 保持与之前的一致性 */
@@ -8,8 +8,6 @@ import os
 import sys
 import shutil
 from pathlib import Path
-import pandas as pd  # 新增导入 pandas
-from openpyxl import Workbook  # 新增导入 openpyxl
 
 def resource_path(relative_path):
     """
@@ -19,14 +17,30 @@ def resource_path(relative_path):
         return os.path.join(sys._MEIPASS, relative_path)
     return os.path.join(os.path.abspath('.'), relative_path)
 
+def excel_file_paths():
+    """
+    返回默认 Excel 列表和结果表的路径，不做任何文件操作。
+    """
+    resources_dir = resource_path('resources')
+    return (os.path.join(resources_dir, 'file_list.xlsx'),
+            os.path.join(resources_dir, 'file_list_updated.xlsx'))
+
+
+def _create_excel(path, headers):
+    """创建只包含表头的 Excel 文件。"""
+    from openpyxl import Workbook  # 延迟导入，避免拖慢程序启动
+    wb = Workbook()
+    wb.active.append(headers)
+    wb.save(path)
+
+
 def setup_excel_files():
     """
     检查并创建程序所需的 resources 文件夹和默认 Excel 文件。
     如果文件不存在，将创建包含默认表头的空文件。
     """
     resources_dir = resource_path('resources')
-    file_list_path = os.path.join(resources_dir, 'file_list.xlsx')
-    file_list_updated_path = os.path.join(resources_dir, 'file_list_updated.xlsx')
+    file_list_path, file_list_updated_path = excel_file_paths()
 
     # 1. 检查并创建 resources 文件夹
     if not os.path.exists(resources_dir):
@@ -36,15 +50,13 @@ def setup_excel_files():
     # 2. 检查并创建 file_list.xlsx
     if not os.path.exists(file_list_path):
         print(f"File not found: {file_list_path}. Creating new file...")
-        df = pd.DataFrame(columns=['文件名'])
-        df.to_excel(file_list_path, index=False)
+        _create_excel(file_list_path, ['文件名'])
         print("Created default file_list.xlsx with a header.")
 
     # 3. 检查并创建 file_list_updated.xlsx
     if not os.path.exists(file_list_updated_path):
         print(f"File not found: {file_list_updated_path}. Creating new file...")
-        df = pd.DataFrame(columns=['文件名'])
-        df.to_excel(file_list_updated_path, index=False)
+        _create_excel(file_list_updated_path, ['文件名', '状态'])
         print("Created default file_list_updated.xlsx with a header.")
     
     return file_list_path, file_list_updated_path